@@ -0,0 +1,65 @@
+"""
+Search Fan-out Benchmark
+
+Compares sequential and concurrent TechSearchTool.search_multiple against a
+local fake search backend (no network), so the wall-clock speedup of the
+concurrent mode can be measured in isolation.
+Usage: python bench_search.py [--queries 8] [--latency 0.3] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from src.mock.search_backend import FakeSearchBackend
+from src.tools.search import TechSearchTool
+
+console = Console()
+
+
+def run_benchmark(num_queries: int, latency: float, concurrency: int) -> None:
+    """Run each mode once and print a comparison table."""
+    # delay=0 disables rate limiting so only the fan-out itself is measured
+    queries = [f"frontend keyword {i}" for i in range(num_queries)]
+    backend = FakeSearchBackend(latency=latency)
+    
+    modes = [
+        ("sequential (delay=0)", TechSearchTool(delay=0, concurrency=1, backend=backend), False),
+        (f"threads (cap={concurrency})", TechSearchTool(delay=0, concurrency=concurrency, backend=backend), False),
+        (f"asyncio (cap={concurrency})", TechSearchTool(delay=0, concurrency=concurrency, backend=backend), True),
+    ]
+    
+    table = Table(title=f"{num_queries} queries × {latency:.2f}s fake latency")
+    table.add_column("模式")
+    table.add_column("耗时 (s)", justify="right")
+    table.add_column("结果数", justify="right")
+    table.add_column("加速比", justify="right")
+    
+    baseline = None
+    for label, tool, use_async in modes:
+        start = time.perf_counter()
+        if use_async:
+            results = asyncio.run(tool.asearch_multiple(queries, max_results_per_query=3))
+        else:
+            results = tool.search_multiple(queries, max_results_per_query=3)
+        elapsed = time.perf_counter() - start
+        
+        # Merge order must match keyword priority order
+        assert [r["href"].split("/")[3] for r in results[::3]] == [q.replace(" ", "-") for q in queries]
+        
+        baseline = baseline or elapsed
+        table.add_row(label, f"{elapsed:.2f}", str(len(results)), f"{baseline / elapsed:.1f}x")
+    
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent search fan-out")
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    
+    run_benchmark(args.queries, args.latency, args.concurrency)
@@ -1,12 +1,40 @@
 """
 Command Line Interface for Tech Stack Agent - 表单式重构版
 """
+import argparse
+import asyncio
+import os
 import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
 from rich.console import Console
 from rich.panel import Panel
+from rich.prompt import Prompt
+from rich.table import Table
 from rich.traceback import install
 
-from src.agent.graph import get_workflow_app
+from src.agent.batch import arun_batch, batch_output_dir, summarize_batch, write_batch_summary
+from src.agent.graph import (
+    ANALYSIS_MODES,
+    GENERATION_MODES,
+    load_run,
+    new_run_id,
+    resume_workflow,
+    run_edit_workflow,
+    run_workflow,
+)
+from src.forms.diff import diff_form_data
+from src.forms.loader import load_form_records, validate_form_data
+from src.forms.schema import FIELD_DEFINITIONS
+from src.utils.file_manager import get_file_manager
+from src.utils.cassette import Cassette, use_cassette
+from src.utils.checkpoint import get_checkpointer
+from src.utils.node_cache import get_node_cache
+from src.utils.search_cache import get_search_cache
+from src.utils.tracing import Tracer, configure_tracing
 
 # Install rich traceback handler
 install(show_locals=True)
@@ -23,9 +51,17 @@ def initialize_state() -> dict:
         "extracted_requirements": [],
         "tech_constraints": [],
         "needs_search": False,
+        "search_keywords": [],
+        "speculation_id": "",
         "search_results": [],
-        "final_document": "",
+        "document_name": "",
+        "document_path": "",
+        "repaired_sections": [],
+        "base_form_data": {},
+        "base_document": "",
+        "revised_sections": [],
         "current_step": "",
+        "interactive": True,
         "messages": [],
         "output_path": "",
         "project_type": "",
@@ -35,9 +71,371 @@ def initialize_state() -> dict:
     }
 
 
-def main():
+def _add_workflow_options(parser: argparse.ArgumentParser, suppress_defaults: bool = False) -> None:
+    """单次运行与批量运行共用的选项（子命令中不设默认值，避免覆盖主命令已解析的值）"""
+    default = argparse.SUPPRESS if suppress_defaults else None
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=argparse.SUPPRESS if suppress_defaults else False,
+        help="记录各节点 / LLM 调用 / 搜索的耗时、token 与成本，写入 JSONL trace 并在结束时打印汇总",
+    )
+    parser.add_argument(
+        "--analysis-mode",
+        choices=ANALYSIS_MODES,
+        default=default,
+        help="separate：分析与关键词生成两次调用；fused：一次调用同时完成（默认读取 ANALYSIS_MODE，缺省 separate）",
+    )
+    parser.add_argument(
+        "--generation-mode",
+        choices=GENERATION_MODES,
+        default=default,
+        help=(
+            "single：等待搜索完成后一次生成；anytime：草稿与搜索并行，截止时间内拿到结果则精修 3.1 章节；"
+            "sectioned：模版各章节并行生成后拼接；skeleton：LLM 只输出结构化内容，骨架本地渲染"
+            "（默认读取 GENERATION_MODE，缺省 single）"
+        ),
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="前端技术栈选型 Agent")
+    _add_workflow_options(parser)
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="PATH",
+        help="录制本次运行的表单、LLM 响应（含流式分片时序）与搜索结果到 cassette 文件",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="从 cassette 文件离线回放一次运行（不访问网络、无需 API Key、无交互）",
+    )
+    parser.add_argument(
+        "--replay-realtime",
+        action="store_true",
+        help="回放时按录制时的分片间隔输出流式响应（默认立即回放）",
+    )
+    
+    subparsers = parser.add_subparsers(dest="command")
+    batch = subparsers.add_parser(
+        "batch",
+        help="无交互地批量处理表单文件",
+        description="读取 JSONL 文件或目录中的表单，并发生成技术方案文档并输出汇总",
+    )
+    batch.add_argument("input", help="JSONL 文件（每行一份表单），或包含 *.json / *.jsonl 表单文件的目录")
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BATCH_WORKERS", 4)),
+        help="同时运行的会话数（默认读取 BATCH_WORKERS，缺省 4）",
+    )
+    _add_workflow_options(batch, suppress_defaults=True)
+    
+    resume = subparsers.add_parser(
+        "resume",
+        help="从检查点继续一次中断的运行",
+        description="从第一个未完成的节点继续运行（表单、分析、搜索等已完成的步骤不再执行）",
+    )
+    resume.add_argument("run_id", help="运行 ID（运行开始时打印）")
+    
+    edit = subparsers.add_parser(
+        "edit",
+        help="修改一次已完成运行的表单并增量重新生成文档",
+        description="只重新分析、重写依赖于变更字段的分析项与章节，其余内容沿用上一版本，并记入 ChangeLog",
+    )
+    edit.add_argument("run_id", help="上一版本的运行 ID")
+    edit.add_argument(
+        "--set",
+        dest="changes",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="修改一个表单字段（可重复）；不提供时逐项交互修改",
+    )
+    
+    args = parser.parse_args(argv)
+    if args.command in ("batch", "resume", "edit") and (args.record or args.replay):
+        mode = {"batch": "批量模式", "resume": "恢复运行", "edit": "编辑运行"}[args.command]
+        parser.error(f"{mode}不支持 --record / --replay")
+    return args
+
+
+def print_profile_report(tracer: Tracer) -> None:
+    """打印 --profile 汇总表"""
+    rows = tracer.summary()
+    if not rows:
+        return
+    
+    table = Table(title="性能分析（--profile）")
+    table.add_column("类型")
+    table.add_column("名称")
+    table.add_column("次数", justify="right")
+    table.add_column("总耗时(s)", justify="right")
+    table.add_column("平均(s)", justify="right")
+    table.add_column("首token(s)", justify="right")
+    table.add_column("提示字符", justify="right")
+    table.add_column("输入tok", justify="right")
+    table.add_column("输出tok", justify="right")
+    table.add_column("重试(+s)", justify="right")
+    table.add_column("成本(¥)", justify="right")
+    
+    for row in rows:
+        ttft = row["avg_ttft"]
+        table.add_row(
+            row["kind"],
+            row["name"],
+            str(row["count"]),
+            f"{row['total_time']:.2f}",
+            f"{row['avg_time']:.2f}",
+            f"{ttft:.2f}" if ttft is not None else "-",
+            str(row["prompt_chars"]) if row["prompt_chars"] else "-",
+            str(row["prompt_tokens"]) if row["prompt_tokens"] else "-",
+            str(row["completion_tokens"]) if row["completion_tokens"] else "-",
+            f"{row['retries']} (+{row['retry_delay']:.1f})" if row["retries"] else "-",
+            f"{row['cost']:.4f}" if row["cost"] else "-",
+        )
+    
+    node_time = sum(r["total_time"] for r in rows if r["kind"] == "node")
+    total_cost = sum(r["cost"] for r in rows)
+    console.print("\n")
+    console.print(table)
+    console.print(
+        f"[dim]节点总耗时 {node_time:.2f}s · 预估成本 ¥{total_cost:.4f}"
+        + (f" · trace: {tracer.trace_path}" if tracer.trace_path else "")
+        + "[/dim]"
+    )
+
+
+def print_node_cache_report() -> None:
+    """打印节点缓存命中与节省的调用次数（本进程内）"""
+    node_cache = get_node_cache()
+    if node_cache is None:
+        return
+    stats = node_cache.stats()
+    totals = stats["totals"]
+    lookups = totals.get("hits", 0) + totals.get("misses", 0)
+    if not lookups:
+        return
+    
+    hit_nodes = [node for node, counters in stats["nodes"].items() if counters.get("hits")]
+    saved = []
+    if totals.get("saved_llm_calls"):
+        saved.append(f"{totals['saved_llm_calls']} 次 LLM 调用")
+    if totals.get("saved_searches"):
+        saved.append(f"{totals['saved_searches']} 次搜索")
+    console.print(
+        f"[dim]节点缓存: 命中 {totals.get('hits', 0)}/{lookups}"
+        + (f"（{'、'.join(hit_nodes)}）" if hit_nodes else "")
+        + (f" · 节省 {'、'.join(saved)}" if saved else "")
+        + "[/dim]"
+    )
+
+
+def print_search_cache_report() -> None:
+    """打印搜索结果缓存命中率（本进程内）"""
+    search_cache = get_search_cache()
+    if search_cache is None:
+        return
+    stats = search_cache.stats()
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    if not lookups:
+        return
+    console.print(
+        f"[dim]搜索缓存: 命中 {stats['hits'] + stats['stale_hits']}/{lookups}"
+        f"（{stats['hit_rate']:.0%}）"
+        + (f" · 其中过期 {stats['stale_hits']} 条已后台刷新" if stats["stale_hits"] else "")
+        + "[/dim]"
+    )
+
+
+def print_batch_summary(summary: dict) -> None:
+    """打印批量运行结果表与吞吐汇总"""
+    table = Table(title="批量运行结果")
+    table.add_column("表单")
+    table.add_column("状态")
+    table.add_column("耗时(s)", justify="right")
+    table.add_column("修复章节")
+    table.add_column("输出 / 错误")
+    
+    styles = {"ok": "green", "failed": "red", "invalid": "yellow"}
+    for item in summary["items"]:
+        table.add_row(
+            item["id"],
+            f"[{styles[item['status']]}]{item['status']}[/{styles[item['status']]}]",
+            f"{item['latency']:.2f}" if item["latency"] else "-",
+            ", ".join(item["repaired_sections"]) or "-",
+            item["output_path"] or item["error"],
+        )
+    
+    latency = summary["latency"]
+    console.print("\n")
+    console.print(table)
+    console.print(
+        f"[dim]成功 {summary['succeeded']}/{summary['total']}"
+        f"（失败 {summary['failed']}，无效 {summary['invalid']}）· 并发 {summary['workers']}"
+        f" · 总耗时 {summary['wall_time']:.2f}s"
+        + (f" · 吞吐 {summary['throughput_per_minute']} 份/分钟" if summary["throughput_per_minute"] else "")
+        + (f" · 单份 p50 {latency['p50']:.2f}s / p95 {latency['p95']:.2f}s" if latency["p50"] is not None else "")
+        + "[/dim]"
+    )
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """批量模式：加载并校验表单，并发运行工作流，写出每份文档与汇总"""
+    try:
+        records = load_form_records(args.input)
+    except FileNotFoundError as e:
+        console.print(f"[red]{str(e)}[/red]")
+        return 1
+    
+    invalid = [r for r in records if not r.valid]
+    console.print(f"[bold green]📦 批量模式[/bold green] 读取 {len(records)} 份表单"
+                  + (f"，其中 {len(invalid)} 份未通过校验" if invalid else "")
+                  + f"，并发 {args.workers}")
+    for record in invalid:
+        console.print(f"[yellow]  - {record.id}（{record.source}）: {'；'.join(record.errors)}[/yellow]")
+    
+    output_dir = batch_output_dir()
+    started = time.monotonic()
+    results = asyncio.run(arun_batch(
+        records,
+        initialize_state(),
+        output_dir,
+        workers=args.workers,
+        analysis_mode=args.analysis_mode,
+        generation_mode=args.generation_mode,
+    ))
+    summary = summarize_batch(results, time.monotonic() - started, args.workers)
+    node_cache = get_node_cache()
+    if node_cache is not None:
+        summary["node_cache"] = node_cache.stats()["totals"]
+    search_cache = get_search_cache()
+    if search_cache is not None:
+        summary["search_cache"] = search_cache.stats()
+    summary_path = write_batch_summary(
+        summary, get_file_manager().output_dir / output_dir / "summary.json"
+    )
+    
+    print_batch_summary(summary)
+    print_node_cache_report()
+    print_search_cache_report()
+    console.print(f"[dim]汇总已保存: {summary_path}[/dim]")
+    return 0 if summary["succeeded"] == summary["total"] else 1
+
+
+def print_resume_hint(run_id: Optional[str]) -> None:
+    """运行中断时提示恢复命令（只有已保存过检查点的运行才能恢复）"""
+    if not run_id:
+        return
+    try:
+        run = load_run(run_id)
+    except ValueError:
+        return
+    if run["pending"]:
+        console.print(
+            f"[dim]已完成的步骤已保存，可用 `python cli.py resume {run_id}` "
+            f"从 {', '.join(run['pending'])} 继续[/dim]"
+        )
+
+
+def run_resume(args: argparse.Namespace) -> Optional[dict]:
+    """恢复模式：从检查点继续指定运行，返回最终状态（找不到运行时返回 None）"""
+    try:
+        run = load_run(args.run_id)
+    except ValueError as e:
+        console.print(f"[red]{str(e)}[/red]")
+        return None
+    if not run["pending"]:
+        console.print(f"[yellow]运行 {args.run_id} 已完成，无需恢复[/yellow]")
+        return run["values"]
+    
+    console.print(
+        f"[bold green]↻ 恢复运行[/bold green] {args.run_id}"
+        f"（{run['analysis_mode']} / {run['generation_mode']}），"
+        f"从 [cyan]{', '.join(run['pending'])}[/cyan] 继续"
+    )
+    return resume_workflow(args.run_id)
+
+
+def _edited_form_data(base_form_data: dict, changes: List[str]) -> dict:
+    """按 --set FIELD=VALUE 修改表单；未提供时逐项交互修改（回车保留原值）"""
+    form_data = dict(base_form_data)
+    if not changes:
+        for field_id, defn in FIELD_DEFINITIONS.items():
+            current = form_data.get(field_id, "")
+            value = Prompt.ask(
+                defn.get("message", field_id),
+                choices=defn.get("choices") or None,
+                default=str(current) if current not in (None, "") else "",
+                show_default=True,
+            )
+            form_data[field_id] = value
+        return form_data
+    
+    for change in changes:
+        field_id, sep, value = change.partition("=")
+        field_id = field_id.strip()
+        if not sep:
+            raise ValueError(f"--set 参数格式应为 FIELD=VALUE: {change}")
+        if field_id not in FIELD_DEFINITIONS:
+            raise ValueError(f"未知字段: {field_id}（可选: {', '.join(FIELD_DEFINITIONS)}）")
+        form_data[field_id] = value
+    return form_data
+
+
+def run_edit(args: argparse.Namespace, run_id: str) -> Optional[dict]:
+    """编辑模式：修改表单后增量重新生成，返回最终状态（参数或运行无效时返回 None）"""
+    try:
+        base = load_run(args.run_id)
+        form_data, errors = validate_form_data(
+            _edited_form_data(base["values"].get("form_data", {}), args.changes)
+        )
+    except ValueError as e:
+        console.print(f"[red]{str(e)}[/red]")
+        return None
+    if errors:
+        for error in errors:
+            console.print(f"[red]✗ {error}[/red]")
+        return None
+    if not diff_form_data(base["values"].get("form_data", {}), form_data):
+        console.print("[yellow]表单没有变化，无需重新生成[/yellow]")
+        return base["values"]
+    
+    console.print(
+        f"[bold green]✏️  编辑运行[/bold green] {args.run_id} → 新运行 ID: {run_id}"
+        f"（中断后可用 `python cli.py resume {run_id}` 继续）"
+    )
+    try:
+        return run_edit_workflow(args.run_id, form_data, run_id)
+    except ValueError as e:
+        console.print(f"[red]{str(e)}[/red]")
+        return None
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the CLI application."""
+    args = parse_args(argv)
+    
+    tracer = None
+    if args.profile:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        tracer = configure_tracing(str(Path("outputs") / "traces" / f"trace_{timestamp}.jsonl"))
+    
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, mode="record")
+    elif args.replay:
+        cassette = Cassette(args.replay, mode="replay", realtime=args.replay_realtime)
+    use_cassette(cassette)
+    
+    run_id = None
     try:
+        if args.command == "batch":
+            return run_batch(args)
+        
         console.print("\n")
         console.print(Panel.fit(
             "[bold green]前端技术栈选型 Agent[/bold green]\n"
@@ -45,9 +443,29 @@ def main():
             border_style="green",
         ))
 
-        app = get_workflow_app()
-        initial_state = initialize_state()
-        final_state = app.invoke(initial_state)
+        if args.command == "resume":
+            run_id = args.run_id
+            final_state = run_resume(args)
+            if final_state is None:
+                return 1
+        elif args.command == "edit":
+            run_id = new_run_id()
+            final_state = run_edit(args, run_id)
+            if final_state is None:
+                return 1
+            if final_state.get("revised_sections"):
+                console.print(f"[dim]已修订章节: {', '.join(final_state['revised_sections'])}[/dim]")
+        else:
+            run_id = new_run_id()
+            if get_checkpointer() is not None:
+                console.print(f"[dim]运行 ID: {run_id}（中断后可用 `python cli.py resume {run_id}` 继续）[/dim]")
+            initial_state = initialize_state()
+            if cassette and cassette.replaying:
+                initial_state["form_data"] = cassette.form_data or {}
+                initial_state["interactive"] = False
+            final_state = run_workflow(initial_state, run_id, args.analysis_mode, args.generation_mode)
+        if cassette and cassette.recording:
+            cassette.record_form(final_state.get("form_data", {}))
 
         console.print("\n")
         console.print(Panel.fit(
@@ -56,17 +474,28 @@ def main():
             "感谢使用技术栈选型 Agent！",
             border_style="green",
         ))
+        print_node_cache_report()
+        print_search_cache_report()
 
         return 0
 
     except KeyboardInterrupt:
         console.print("\n\n[yellow]⚠️  用户取消操作[/yellow]")
+        print_resume_hint(run_id)
         return 130
 
     except Exception as e:
         console.print(f"\n\n[red]❌ 发生错误: {str(e)}[/red]")
         console.print("[dim]请检查您的配置（特别是 .env 文件中的 API Key）[/dim]")
+        print_resume_hint(run_id)
         return 1
+    
+    finally:
+        if cassette is not None and cassette.recording:
+            console.print(f"[dim]cassette 已保存: {cassette.save()}[/dim]")
+        use_cassette(None)
+        if tracer is not None:
+            print_profile_report(tracer)
 
 
 if __name__ == "__main__":
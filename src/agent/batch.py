@@ -0,0 +1,152 @@
+"""
+批量运行 - 无交互地为一组表单并发生成技术方案文档
+
+在同一个事件循环中用异步工作流并发运行多个会话，并发数由 workers 控制；
+每份表单输出一篇文档（按表单 id 命名），并汇总每项耗时与整体吞吐。
+"""
+import asyncio
+import json
+import re
+import statistics
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src.agent.graph import arun_workflow, new_run_id
+from src.forms.loader import FormRecord
+
+
+@dataclass
+class BatchResult:
+    """单份表单的运行结果"""
+
+    id: str
+    source: str
+    status: str  # "ok" | "failed" | "invalid"
+    run_id: str = ""  # 检查点运行 ID，失败的表单可用 `cli.py resume <run_id>` 继续
+    output_path: str = ""
+    latency: float = 0.0  # 秒
+    error: str = ""
+    repaired_sections: List[str] = field(default_factory=list)
+
+
+def batch_output_dir(root: str = "batch") -> str:
+    """本次批量运行的输出目录（相对文档输出目录）"""
+    return f"{root}/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def _document_name(output_dir: str, record_id: str) -> str:
+    safe_id = re.sub(r"[^\w\-]+", "_", record_id).strip("_") or "form"
+    return f"{output_dir}/{safe_id}.md"
+
+
+async def arun_batch(
+    records: List[FormRecord],
+    base_state: Dict[str, Any],
+    output_dir: str,
+    workers: int = 4,
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+) -> List[BatchResult]:
+    """
+    并发运行一批表单
+
+    Args:
+        records: 表单记录（无效记录直接记为 invalid，不运行）
+        base_state: 初始状态模板
+        output_dir: 文档输出子目录（相对文档输出目录）
+        workers: 同时运行的会话数
+        analysis_mode: 需求分析模式
+        generation_mode: 文档生成模式
+
+    Returns:
+        与 records 顺序一致的结果
+    """
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def run(record: FormRecord) -> BatchResult:
+        if not record.valid:
+            return BatchResult(record.id, record.source, "invalid", error="；".join(record.errors))
+
+        async with semaphore:
+            state = {
+                **base_state,
+                "form_data": dict(record.form_data),
+                "document_name": _document_name(output_dir, record.id),
+                "interactive": False,
+                "messages": [],
+                "search_results": [],
+            }
+            run_id = new_run_id()
+            started = time.monotonic()
+            try:
+                final_state = await arun_workflow(state, analysis_mode, generation_mode, run_id)
+            except Exception as e:
+                return BatchResult(
+                    record.id, record.source, "failed", run_id,
+                    latency=round(time.monotonic() - started, 3),
+                    error=f"{type(e).__name__}: {e}",
+                )
+            latency = round(time.monotonic() - started, 3)
+
+        output_path = final_state.get("output_path", "")
+        return BatchResult(
+            record.id,
+            record.source,
+            "ok" if output_path else "failed",
+            run_id,
+            output_path=output_path,
+            latency=latency,
+            error="" if output_path else "；".join(final_state.get("messages", [])[-1:]),
+            repaired_sections=list(final_state.get("repaired_sections", []) or []),
+        )
+
+    return await asyncio.gather(*(run(record) for record in records))
+
+
+def summarize_batch(results: List[BatchResult], wall_time: float, workers: int) -> Dict[str, Any]:
+    """
+    汇总批量运行结果
+
+    Args:
+        results: 各表单结果
+        wall_time: 整批墙钟耗时（秒）
+        workers: 并发数
+
+    Returns:
+        汇总（数量、成功率、单项耗时分位数、吞吐）与逐项结果
+    """
+    latencies = sorted(r.latency for r in results if r.status == "ok")
+    succeeded = len(latencies)
+
+    def percentile(p: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": sum(1 for r in results if r.status == "failed"),
+        "invalid": sum(1 for r in results if r.status == "invalid"),
+        "workers": workers,
+        "wall_time": round(wall_time, 3),
+        "throughput_per_minute": round(succeeded * 60 / wall_time, 2) if wall_time > 0 else None,
+        "latency": {
+            "mean": round(statistics.mean(latencies), 3) if latencies else None,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": round(latencies[-1], 3) if latencies else None,
+        },
+        "items": [asdict(r) for r in results],
+    }
+
+
+def write_batch_summary(summary: Dict[str, Any], path: Path) -> str:
+    """写出汇总 JSON，返回文件路径"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return str(path.absolute())
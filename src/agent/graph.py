@@ -1,64 +1,515 @@
 """
 LangGraph Workflow Definition - 表单式重构版
-流程：表单收集 -> 需求分析 -> 搜索(可选) -> 生成文档 -> 保存
+流程：表单收集 -> 预搜索 -> 需求分析 -> 搜索(可选) -> 生成文档 -> 校验修复 -> 保存
+
+每次运行有一个运行 ID（LangGraph thread_id），每个节点完成后状态写入
+SQLite 检查点，中断的运行可以从第一个未完成的节点继续。
 """
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
 from langgraph.graph import StateGraph, END
 from src.agent.state import TechStackState
+from src.utils.checkpoint import get_checkpointer
+from src.utils.file_manager import DocumentSink, get_file_manager
+from src.utils.tracing import traced_node
 from src.agent.nodes import (
     form_collect_node,
+    speculate_node,
     analyze_node,
+    analyze_fused_node,
     search_node,
     generate_node,
+    sectioned_generate_node,
+    skeleton_generate_node,
+    anytime_generate_node,
+    validate_node,
     save_node,
+    revise_node,
+    form_collect_node_async,
+    speculate_node_async,
+    analyze_node_async,
+    analyze_fused_node_async,
+    search_node_async,
+    generate_node_async,
+    sectioned_generate_node_async,
+    skeleton_generate_node_async,
+    anytime_generate_node_async,
+    validate_node_async,
+    save_node_async,
+    revise_node_async,
 )
 
 
+ANALYSIS_MODES = ("separate", "fused")
+GENERATION_MODES = ("single", "anytime", "sectioned", "skeleton")
+
+# 替换默认生成节点的生成模式
+_GENERATE_NODES = {
+    "sectioned": sectioned_generate_node,
+    "skeleton": skeleton_generate_node,
+}
+_ASYNC_GENERATE_NODES = {
+    "sectioned": sectioned_generate_node_async,
+    "skeleton": skeleton_generate_node_async,
+}
+
+
+def resolve_analysis_mode(analysis_mode: Optional[str] = None) -> str:
+    """
+    确定需求分析模式
+    
+    - separate：分析与搜索关键词生成为两次 LLM 调用（默认）
+    - fused：一次调用同时产出分析结果与搜索关键词，关键路径少一次往返
+    
+    Args:
+        analysis_mode: 显式指定的模式，缺省时读取 ANALYSIS_MODE 环境变量
+    """
+    mode = (analysis_mode or os.getenv("ANALYSIS_MODE") or "separate").lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"未知的分析模式: {mode}（可选: {', '.join(ANALYSIS_MODES)}）")
+    return mode
+
+
+def resolve_generation_mode(generation_mode: Optional[str] = None) -> str:
+    """
+    确定文档生成模式
+    
+    - single：等待全部搜索完成后一次性生成（默认）
+    - anytime：草稿与搜索并行，搜索在截止时间内返回则只精修 3.1 章节
+    - sectioned：共享规划 + 模版各顶层章节并行生成，按模版顺序拼接
+    - skeleton：LLM 只输出结构化内容（JSON），骨架按模版本地渲染
+    
+    Args:
+        generation_mode: 显式指定的模式，缺省时读取 GENERATION_MODE 环境变量
+    """
+    mode = (generation_mode or os.getenv("GENERATION_MODE") or "single").lower()
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"未知的生成模式: {mode}（可选: {', '.join(GENERATION_MODES)}）")
+    return mode
+
+
 def should_search(state: TechStackState) -> str:
     """判断是否需要在线搜索"""
     needs_search = state.get("needs_search", False)
     return "search" if needs_search else "generate"
 
 
-def create_workflow() -> StateGraph:
+def _build_workflow(nodes: Dict[str, Callable]) -> StateGraph:
     """
-    创建并编译 LangGraph 工作流
+    按给定的节点实现组装并编译工作流
+    
+    流程：form_collect -> speculate -> analyze -> (search | generate) -> validate -> save -> END
     
-    流程：form_collect -> analyze -> (search | generate) -> save -> END
+    speculate 只在后台提交预搜索并立即返回，搜索与 analyze 的 LLM 调用重叠。
+    提供 anytime 节点（而非 search）时，需要搜索的会话由 anytime 节点
+    并行完成草稿与搜索后直接进入 validate。validate 本地校验文档结构，
+    只对不合格的章节发起修复调用。
+    
+    启用检查点时（CHECKPOINT_ENABLED，默认开启）编译时挂上 SQLite 检查点，
+    调用时需在 config 中提供 thread_id（见 run_config）。
     """
     workflow = StateGraph(TechStackState)
     
-    workflow.add_node("form_collect", form_collect_node)
-    workflow.add_node("analyze", analyze_node)
-    workflow.add_node("search", search_node)
-    workflow.add_node("generate", generate_node)
-    workflow.add_node("save", save_node)
+    for name, node in nodes.items():
+        workflow.add_node(name, traced_node(name, node))
     
     workflow.set_entry_point("form_collect")
     
-    workflow.add_edge("form_collect", "analyze")
+    workflow.add_edge("form_collect", "speculate")
+    workflow.add_edge("speculate", "analyze")
     
+    anytime = "anytime" in nodes
     workflow.add_conditional_edges(
         "analyze",
         should_search,
         {
-            "search": "search",
+            "search": "anytime" if anytime else "search",
             "generate": "generate",
         },
     )
     
-    workflow.add_edge("search", "generate")
-    workflow.add_edge("generate", "save")
+    if anytime:
+        workflow.add_edge("anytime", "validate")
+    else:
+        workflow.add_edge("search", "generate")
+    workflow.add_edge("generate", "validate")
+    workflow.add_edge("validate", "save")
     workflow.add_edge("save", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=get_checkpointer())
 
 
-_workflow_app = None
+def create_workflow(
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+) -> StateGraph:
+    """
+    创建并编译 LangGraph 工作流（同步节点，使用 app.invoke）
+    
+    流程：form_collect -> speculate -> analyze -> (search | generate) -> validate -> save -> END
+    
+    Args:
+        analysis_mode: "separate" 或 "fused"（见 resolve_analysis_mode）
+        generation_mode: "single"、"anytime"、"sectioned" 或 "skeleton"（见 resolve_generation_mode）
+    """
+    fused = resolve_analysis_mode(analysis_mode) == "fused"
+    generation_mode = resolve_generation_mode(generation_mode)
+    nodes = {
+        "form_collect": form_collect_node,
+        "speculate": speculate_node,
+        "analyze": analyze_fused_node if fused else analyze_node,
+        "generate": _GENERATE_NODES.get(generation_mode, generate_node),
+        "validate": validate_node,
+        "save": save_node,
+    }
+    if generation_mode == "anytime":
+        nodes["anytime"] = anytime_generate_node
+    else:
+        nodes["search"] = search_node
+    return _build_workflow(nodes)
 
 
-def get_workflow_app():
+def create_async_workflow(
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+) -> StateGraph:
+    """
+    创建并编译异步 LangGraph 工作流（异步节点，使用 await app.ainvoke）
+    
+    同一事件循环中可并发运行多个会话，例如：
+        await asyncio.gather(*(app.ainvoke(state, run_config(new_run_id())) for state in states))
+    
+    Args:
+        analysis_mode: "separate" 或 "fused"（见 resolve_analysis_mode）
+        generation_mode: "single"、"anytime"、"sectioned" 或 "skeleton"（见 resolve_generation_mode）
+    """
+    fused = resolve_analysis_mode(analysis_mode) == "fused"
+    generation_mode = resolve_generation_mode(generation_mode)
+    nodes = {
+        "form_collect": form_collect_node_async,
+        "speculate": speculate_node_async,
+        "analyze": analyze_fused_node_async if fused else analyze_node_async,
+        "generate": _ASYNC_GENERATE_NODES.get(generation_mode, generate_node_async),
+        "validate": validate_node_async,
+        "save": save_node_async,
+    }
+    if generation_mode == "anytime":
+        nodes["anytime"] = anytime_generate_node_async
+    else:
+        nodes["search"] = search_node_async
+    return _build_workflow(nodes)
+
+
+def _build_edit_workflow(nodes: Dict[str, Callable]) -> StateGraph:
+    """
+    按给定的节点实现组装并编译"编辑后重新生成"工作流
+    
+    流程：revise -> validate -> save -> END
+    
+    revise 对比上一版本的表单，只重新分析受影响的分析项、修订受影响的章节，
+    搜索结果与其余章节沿用上一版本。
+    """
+    workflow = StateGraph(TechStackState)
+    
+    for name, node in nodes.items():
+        workflow.add_node(name, traced_node(name, node))
+    
+    workflow.set_entry_point("revise")
+    workflow.add_edge("revise", "validate")
+    workflow.add_edge("validate", "save")
+    workflow.add_edge("save", END)
+    
+    return workflow.compile(checkpointer=get_checkpointer())
+
+
+def create_edit_workflow() -> StateGraph:
+    """创建并编译"编辑后重新生成"工作流（同步节点，使用 app.invoke）"""
+    return _build_edit_workflow({"revise": revise_node, "validate": validate_node, "save": save_node})
+
+
+def create_async_edit_workflow() -> StateGraph:
+    """创建并编译"编辑后重新生成"工作流（异步节点，使用 await app.ainvoke）"""
+    return _build_edit_workflow(
+        {"revise": revise_node_async, "validate": validate_node_async, "save": save_node_async}
+    )
+
+
+# 按（分析模式, 生成模式）缓存的已编译工作流
+_workflow_apps: Dict[Tuple[str, str], StateGraph] = {}
+_async_workflow_apps: Dict[Tuple[str, str], StateGraph] = {}
+
+
+def get_workflow_app(
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+):
     """获取或创建编译后的工作流应用"""
-    global _workflow_app
-    if _workflow_app is None:
-        _workflow_app = create_workflow()
-    return _workflow_app
+    key = (resolve_analysis_mode(analysis_mode), resolve_generation_mode(generation_mode))
+    if key not in _workflow_apps:
+        _workflow_apps[key] = create_workflow(*key)
+    return _workflow_apps[key]
+
+
+def get_async_workflow_app(
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+):
+    """获取或创建编译后的异步工作流应用"""
+    key = (resolve_analysis_mode(analysis_mode), resolve_generation_mode(generation_mode))
+    if key not in _async_workflow_apps:
+        _async_workflow_apps[key] = create_async_workflow(*key)
+    return _async_workflow_apps[key]
+
+
+_edit_workflow_app = None
+_async_edit_workflow_app = None
+
+
+def get_edit_workflow_app():
+    """获取或创建编译后的"编辑后重新生成"工作流应用"""
+    global _edit_workflow_app
+    if _edit_workflow_app is None:
+        _edit_workflow_app = create_edit_workflow()
+    return _edit_workflow_app
+
+
+def get_async_edit_workflow_app():
+    """获取或创建编译后的异步"编辑后重新生成"工作流应用"""
+    global _async_edit_workflow_app
+    if _async_edit_workflow_app is None:
+        _async_edit_workflow_app = create_async_edit_workflow()
+    return _async_edit_workflow_app
+
+
+def new_run_id() -> str:
+    """生成运行 ID（时间戳 + 随机后缀，同时作为检查点的 thread_id）"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def run_config(
+    run_id: str,
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+    workflow: str = "full",
+    runtime: str = "sync",
+) -> Dict[str, Any]:
+    """
+    运行配置：thread_id 为运行 ID，分析 / 生成模式、工作流（"full" 或 "edit"）
+    与运行方式（"sync" 或 "async"）写入检查点元数据，以便恢复时按相同的图继续
+    """
+    return {
+        "configurable": {"thread_id": run_id},
+        "metadata": {
+            "analysis_mode": resolve_analysis_mode(analysis_mode),
+            "generation_mode": resolve_generation_mode(generation_mode),
+            "workflow": workflow,
+            "runtime": runtime,
+        },
+    }
+
+
+def _run_app(run: Dict[str, Any]):
+    """已保存运行所用的工作流应用"""
+    if run["workflow"] == "edit":
+        return get_async_edit_workflow_app() if run["runtime"] == "async" else get_edit_workflow_app()
+    if run["runtime"] == "async":
+        return get_async_workflow_app(run["analysis_mode"], run["generation_mode"])
+    return get_workflow_app(run["analysis_mode"], run["generation_mode"])
+
+
+def _durability(app) -> Optional[str]:
+    """有检查点时每个节点完成后同步落盘，进程随后崩溃也不丢失该步"""
+    return "sync" if app.checkpointer is not None else None
+
+
+def run_workflow(
+    initial_state: TechStackState,
+    run_id: str,
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+) -> TechStackState:
+    """
+    运行一次完整选型会话（同步）
+    
+    Args:
+        initial_state: 初始状态
+        run_id: 运行 ID（见 new_run_id），中断后可用 resume_workflow 继续
+        analysis_mode: "separate" 或 "fused"，缺省读取 ANALYSIS_MODE
+        generation_mode: "single"、"anytime"、"sectioned" 或 "skeleton"，缺省读取 GENERATION_MODE
+        
+    Returns:
+        最终状态
+    """
+    app = get_workflow_app(analysis_mode, generation_mode)
+    config = run_config(run_id, analysis_mode, generation_mode)
+    return app.invoke(initial_state, config, durability=_durability(app))
+
+
+def load_run(run_id: str) -> Dict[str, Any]:
+    """
+    读取已保存的运行
+    
+    Args:
+        run_id: 运行 ID
+        
+    Returns:
+        {"run_id", "analysis_mode", "generation_mode", "workflow", "runtime",
+        "pending"（待执行节点，为空表示已完成）, "values"（最近一次检查点的状态）}
+        
+    Raises:
+        ValueError: 检查点未启用或找不到该运行
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        raise ValueError("检查点未启用（CHECKPOINT_ENABLED），无法恢复运行")
+    saved = checkpointer.get_tuple({"configurable": {"thread_id": run_id}})
+    if saved is None:
+        raise ValueError(f"未找到运行: {run_id}")
+    
+    run = {
+        "run_id": run_id,
+        "analysis_mode": resolve_analysis_mode(saved.metadata.get("analysis_mode")),
+        "generation_mode": resolve_generation_mode(saved.metadata.get("generation_mode")),
+        "workflow": saved.metadata.get("workflow", "full"),
+        "runtime": saved.metadata.get("runtime", "sync"),
+    }
+    snapshot = _run_app(run).get_state({"configurable": {"thread_id": run_id}})
+    run["pending"] = list(snapshot.next)
+    run["values"] = snapshot.values
+    return run
+
+
+def resume_workflow(run_id: str) -> TechStackState:
+    """
+    从第一个未完成的节点继续一次中断的运行（已完成的节点不再执行）
+    
+    异步启动的运行（arun_workflow、arun_edit_workflow）在异步图上继续；中断在生成阶段时，
+    上次写了一半的 .part 文件先被删除，生成节点以同一文件名重新写入。
+    
+    Args:
+        run_id: 运行 ID
+        
+    Returns:
+        最终状态
+        
+    Raises:
+        ValueError: 检查点未启用或找不到该运行
+    """
+    run = load_run(run_id)
+    _discard_partial_document(run["values"])
+    app = _run_app(run)
+    config = run_config(
+        run_id, run["analysis_mode"], run["generation_mode"], run["workflow"], run["runtime"]
+    )
+    if run["runtime"] == "async":
+        return asyncio.run(app.ainvoke(None, config, durability=_durability(app)))
+    return app.invoke(None, config, durability=_durability(app))
+
+
+def _discard_partial_document(values: Dict[str, Any]) -> None:
+    """删除中断的生成节点留下的 .part 文件（文档已生成完毕时沿用 document_path）"""
+    if values.get("document_path") or not values.get("document_name"):
+        return
+    final_path = get_file_manager().document_path(filename=values["document_name"])
+    final_path.with_name(final_path.name + DocumentSink.PARTIAL_SUFFIX).unlink(missing_ok=True)
+
+
+def run_edit_workflow(base_run_id: str, form_data: Dict[str, Any], run_id: str) -> TechStackState:
+    """
+    修改一次已完成运行的表单并增量重新生成文档
+    
+    只重跑依赖于变更字段的分析项与章节（见 FIELD_DEPENDENCIES），其余内容
+    与搜索结果沿用上一版本；结果作为新的运行保存，可再次恢复或编辑。
+    
+    Args:
+        base_run_id: 上一版本的运行 ID
+        form_data: 修改后的表单数据
+        run_id: 本次运行 ID（见 new_run_id）
+        
+    Returns:
+        最终状态
+        
+    Raises:
+        ValueError: 检查点未启用、找不到该运行、运行未完成或其文档已不存在
+    """
+    base, initial_state = _edit_initial_state(base_run_id, form_data)
+    app = get_edit_workflow_app()
+    config = run_config(run_id, base["analysis_mode"], base["generation_mode"], "edit")
+    return app.invoke(initial_state, config, durability=_durability(app))
+
+
+async def arun_edit_workflow(
+    base_run_id: str,
+    form_data: Dict[str, Any],
+    run_id: Optional[str] = None,
+) -> TechStackState:
+    """
+    异步修改一次已完成运行的表单并增量重新生成文档（见 run_edit_workflow）
+    
+    Args:
+        base_run_id: 上一版本的运行 ID
+        form_data: 修改后的表单数据
+        run_id: 本次运行 ID，缺省时新生成
+        
+    Returns:
+        最终状态
+    """
+    base, initial_state = await asyncio.to_thread(_edit_initial_state, base_run_id, form_data)
+    app = get_async_edit_workflow_app()
+    config = run_config(
+        run_id or new_run_id(), base["analysis_mode"], base["generation_mode"], "edit", "async"
+    )
+    return await app.ainvoke(initial_state, config, durability=_durability(app))
+
+
+def _edit_initial_state(base_run_id: str, form_data: Dict[str, Any]) -> Tuple[Dict[str, Any], TechStackState]:
+    """读取上一版本的运行并构建 edit 流程的初始状态，返回 (上一版本的运行, 初始状态)"""
+    base = load_run(base_run_id)
+    values = base["values"]
+    if base["pending"]:
+        raise ValueError(f"运行 {base_run_id} 尚未完成，请先恢复（resume）")
+    base_document = values.get("output_path", "")
+    if not base_document or not os.path.exists(base_document):
+        raise ValueError(f"运行 {base_run_id} 的文档不存在: {base_document or '未保存'}")
+    
+    initial_state = {
+        **values,
+        "form_data": form_data,
+        "base_form_data": values.get("form_data", {}),
+        "base_document": base_document,
+        "document_name": get_file_manager().document_path(values.get("project_type")).name,
+        "document_path": "",
+        "repaired_sections": [],
+        "revised_sections": [],
+        "output_path": "",
+        "interactive": False,
+        "messages": [],
+    }
+    return base, initial_state
+
+
+async def arun_workflow(
+    initial_state: TechStackState,
+    analysis_mode: Optional[str] = None,
+    generation_mode: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> TechStackState:
+    """
+    异步运行一次完整选型会话
+    
+    Args:
+        initial_state: 初始状态（预先填好 form_data 可跳过交互式表单）
+        analysis_mode: "separate" 或 "fused"，缺省读取 ANALYSIS_MODE
+        generation_mode: "single"、"anytime"、"sectioned" 或 "skeleton"，缺省读取 GENERATION_MODE
+        run_id: 运行 ID，缺省时新生成
+        
+    Returns:
+        最终状态
+    """
+    app = get_async_workflow_app(analysis_mode, generation_mode)
+    config = run_config(run_id or new_run_id(), analysis_mode, generation_mode, runtime="async")
+    return await app.ainvoke(initial_state, config, durability=_durability(app))
@@ -1,156 +1,829 @@
 """
 LangGraph Node Implementations - 表单式重构版
-实现 表单填充 -> 需求分析 -> 搜索(可选) -> 生成文档 -> 保存
+实现 表单填充 -> 需求分析 -> 搜索(可选) -> 生成文档 -> 校验修复 -> 保存
+
+每个节点同时提供同步版本与 asyncio 版本（*_async），后者供异步工作流使用，
+使单个事件循环可以并发运行多个选型会话。两者共用同一份节点步骤（*_steps，
+见 _run_steps / _arun_steps），只在 LLM / 搜索调用的执行方式上不同。
 """
+import asyncio
+import contextvars
 import json
-from typing import Dict, Any
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Iterator, AsyncIterator, Awaitable, Callable, Generator
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm
 
 from src.agent.state import TechStackState
+from src.agent.speculation import (
+    SpeculativeSearch,
+    cancel_speculation,
+    speculation_enabled,
+    start_speculation,
+    take_speculation,
+)
 from src.utils.llm_client import get_llm_client
+from src.tools.dedupe import dedupe_results
+from src.tools.ranking import rank_results, select_within_budget
 from src.tools.search import get_search_tool
-from src.utils.file_manager import get_file_manager
+from src.tools.sections import (
+    Chapter,
+    continuation_overlap,
+    extract_section,
+    iter_headings,
+    normalize_chapter,
+    replace_section,
+    section_titles,
+    split_chapters,
+    strip_code_fence,
+)
+from src.utils.file_manager import DocumentSink, get_file_manager
+from src.utils.live_preview import LivePreview
+from src.utils.node_cache import fingerprint, get_node_cache
+from src.utils.resilience import RetryEvent, add_retry_listener
 from src.forms.collector import collect_form, form_data_to_project_info
+from src.forms.diff import FieldChange, affected_analysis_items, affected_sections, diff_form_data
 from src.prompts.analyzer import (
+    ANALYSIS_PROMPT_TEMPLATE,
     ANALYSIS_SYSTEM_PROMPT,
+    FUSED_ANALYSIS_PROMPT_TEMPLATE,
+    PACKAGE_JSON_TOKENS,
     get_analysis_prompt,
+    get_fused_analysis_prompt,
+)
+from src.prompts.budget import PromptBudget, allocate_prompt_budget, prompt_token_target
+from src.prompts.guide_index import (
+    GUIDE_SLOT,
+    SELECTION_GUIDE,
+    guide_token_budget,
+    select_guide,
+    with_selection_guide,
 )
 from src.prompts.searcher import (
+    SEARCH_KEYWORDS_PROMPT_TEMPLATE,
     SEARCH_SYSTEM_PROMPT,
     get_search_keywords_prompt,
 )
 from src.prompts.generator import (
     GENERATOR_SYSTEM_PROMPT,
+    SEARCH_SUMMARY_TOKENS,
+    SECTIONED_SYSTEM_PROMPT,
+    SECTION_REPAIR_SYSTEM_PROMPT,
+    SECTION_REVISION_SYSTEM_PROMPT,
+    SKELETON_SYSTEM_PROMPT,
+    TECH_SOLUTION_TEMPLATE,
+    TEMPLATE_SLOT,
+    get_chapter_prompt,
+    get_continuation_prompt,
+    get_document_plan_prompt,
     get_generation_prompt,
+    get_research_refinement_prompt,
+    get_section_repair_prompt,
+    get_section_revision_prompt,
+    get_skeleton_content_prompt,
+    search_result_cost,
+    with_solution_template,
 )
+from src.tools.document import DocumentGenerator
+from src.tools.validator import ValidationIssue, splice_section, validate_document
+from src.utils.tokens import count_tokens
+from src.utils.tracing import current_span, get_tracer
 
 console = Console()
 
+MAX_SEARCH_KEYWORDS = 8
+SEARCH_RESULTS_PER_QUERY = 3
+
+# 分章节生成：模版顶层章节（过短的章节并入前一组）与全文目标篇幅
+TEMPLATE_CHAPTERS = split_chapters(TECH_SOLUTION_TEMPLATE, min_chars=200)
+DOCUMENT_TARGET_CHARS = 3000
+
+
+def _report_retry(event: RetryEvent) -> None:
+    """在终端提示 LLM 调用重试及其带来的额外等待"""
+    if event.will_retry:
+        console.print(
+            f"[dim]  ↻ {event.operation} 第 {event.attempt} 次调用失败（{event.error}），"
+            f"{event.delay:.1f}s 后重试（已耗时 {event.elapsed:.1f}s）[/dim]"
+        )
+
+
+add_retry_listener(_report_retry)
+
+
+# ===== 同步 / 异步共用的节点步骤 =====
+
+@dataclass
+class _Call:
+    """节点步骤中的一次 I/O 调用：同步执行 sync，异步执行 await async_（为空时在线程中执行 sync）"""
+
+    sync: Callable[..., Any]
+    async_: Optional[Callable[..., Awaitable[Any]]]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+# 节点步骤：生成器在需要 I/O 时 yield 一个 _Call，收到其结果（或在 yield 处
+# 收到其异常），最终返回状态更新
+Steps = Generator[_Call, Any, Dict[str, Any]]
+
+
+def _run_steps(steps: Steps) -> Dict[str, Any]:
+    """同步执行节点步骤"""
+    try:
+        call = next(steps)
+        while True:
+            try:
+                result = call.sync(*call.args, **call.kwargs)
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+async def _arun_steps(steps: Steps) -> Dict[str, Any]:
+    """在事件循环中执行节点步骤（被取消时生成器随之关闭，finally 中的清理照常执行）"""
+    try:
+        call = next(steps)
+        while True:
+            try:
+                if call.async_ is None:
+                    result = await asyncio.to_thread(call.sync, *call.args, **call.kwargs)
+                else:
+                    result = await call.async_(*call.args, **call.kwargs)
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+def _llm_call(llm_client, prompt: str, system_prompt: str) -> _Call:
+    """一次非流式 LLM 调用"""
+    return _Call(llm_client.invoke, llm_client.ainvoke, (prompt,), {"system_message": system_prompt})
+
+
+def _stream_call(llm_client, prompt: str, system_prompt: str, feed: Callable[[str], None], tail: str = "") -> _Call:
+    """一次流式 LLM 调用，逐块交给 feed（tail 非空时为续写，去掉开头与其重复的部分）"""
+    return _Call(_stream_into, _astream_into, (llm_client, prompt, system_prompt, feed, tail))
+
+
+def _stream_into(llm_client, prompt: str, system_prompt: str, feed: Callable[[str], None], tail: str) -> None:
+    chunks = llm_client.stream(prompt, system_message=system_prompt)
+    for chunk in _skip_overlap(chunks, tail) if tail else chunks:
+        feed(chunk)
+
+
+async def _astream_into(llm_client, prompt: str, system_prompt: str, feed: Callable[[str], None], tail: str) -> None:
+    chunks = llm_client.astream(prompt, system_message=system_prompt)
+    async for chunk in _askip_overlap(chunks, tail) if tail else chunks:
+        feed(chunk)
+
+
+class _FanOut:
+    """
+    节点步骤中并行执行的一组调用：同步执行时在线程池中运行 sync，异步执行时
+    为每组参数创建任务（并发数相同）；按提交顺序逐个取结果，close 取消未完成的调用
+    """
+    
+    def __init__(
+        self,
+        sync: Callable[..., Any],
+        async_: Callable[..., Awaitable[Any]],
+        calls: List[Tuple[Any, ...]],
+        concurrency: int,
+        name: str,
+    ):
+        self.sync = sync
+        self.async_ = async_
+        self.calls = calls
+        self.concurrency = max(1, concurrency)
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Any] = []
+    
+    def start_call(self) -> _Call:
+        """提交全部调用"""
+        return _Call(self._start, self._astart)
+    
+    def result_call(self, index: int, timeout: Optional[float] = None) -> _Call:
+        """等待第 index 个调用的结果（超时抛出 TimeoutError，调用本身不取消）"""
+        return _Call(self._result, self._aresult, (index, timeout))
+    
+    def close(self) -> None:
+        for pending in self._pending:
+            pending.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=self.name)
+        # 复制当前上下文，使各调用的 span 归属于本节点
+        self._pending = [
+            self._executor.submit(contextvars.copy_context().run, self.sync, *args)
+            for args in self.calls
+        ]
+    
+    async def _astart(self) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(args: Tuple[Any, ...]) -> Any:
+            async with semaphore:
+                return await self.async_(*args)
+        
+        self._pending = [asyncio.create_task(run(args)) for args in self.calls]
+    
+    def _result(self, index: int, timeout: Optional[float]) -> Any:
+        return self._pending[index].result(timeout=timeout)
+    
+    async def _aresult(self, index: int, timeout: Optional[float]) -> Any:
+        return await asyncio.wait_for(asyncio.shield(self._pending[index]), timeout)
+
+
+def _fan_out_steps(fan_out: _FanOut) -> Generator[_Call, Any, List[Any]]:
+    """执行全部并行调用，按提交顺序返回结果（失败的调用以其异常占位）"""
+    responses: List[Any] = []
+    try:
+        yield fan_out.start_call()
+        for index in range(len(fan_out.calls)):
+            try:
+                responses.append((yield fan_out.result_call(index)))
+            except Exception as e:
+                responses.append(e)
+    finally:
+        fan_out.close()
+    return responses
+
 
 # ===== 表单收集节点 =====
 
 def form_collect_node(state: TechStackState) -> Dict[str, Any]:
     """
     表单收集节点 - 用户通过结构化表单填写需求
+    
+    若初始状态中已带有 form_data（如程序化调用），则跳过交互式收集。
     """
-    console.print("\n")
-    console.print(Panel.fit(
-        "[bold green]前端技术栈选型 Agent[/bold green]\n"
-        "[dim]请按提示填写，可回车跳过使用默认值[/dim]",
-        border_style="green"
-    ))
+    form_data = state.get("form_data") or {}
     
-    form_data = collect_form()
-    project_info = form_data_to_project_info(form_data)
+    if not form_data:
+        console.print("\n")
+        console.print(Panel.fit(
+            "[bold green]前端技术栈选型 Agent[/bold green]\n"
+            "[dim]请按提示填写，可回车跳过使用默认值[/dim]",
+            border_style="green"
+        ))
+        form_data = collect_form()
     
+    fields = _project_fields(form_data)
     return {
         "form_data": form_data,
+        **fields,
+        # 文件名在此确定并写入检查点，恢复时可找到中断的生成留下的 .part 文件
+        "document_name": state.get("document_name")
+        or get_file_manager().document_path(fields["project_type"]).name,
+        "current_step": "form_collect",
+        "messages": ["表单收集完成"],
+    }
+
+
+def _project_fields(form_data: Dict[str, Any]) -> Dict[str, Any]:
+    """由 form_data 派生的兼容性字段"""
+    project_info = form_data_to_project_info(form_data)
+    return {
         "project_type": project_info.get("project_type", "Web-C端"),
         "team_size": project_info.get("team_size", "1人"),
         "timeline": project_info.get("timeline", "未指定"),
         "special_requirements": project_info.get("special_requirements", ""),
-        "current_step": "form_collect",
-        "messages": ["表单收集完成"],
     }
 
 
+async def form_collect_node_async(state: TechStackState) -> Dict[str, Any]:
+    """表单收集节点（异步）- 交互式输入在线程中执行，不阻塞事件循环"""
+    return await asyncio.to_thread(form_collect_node, state)
+
+
+# ===== 预搜索节点 =====
+
+def speculate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    预搜索节点 - 根据表单推断关键词并在后台开始搜索，随即返回
+    
+    搜索与随后的需求分析 LLM 调用并行进行，由搜索节点对账复用。
+    """
+    if not speculation_enabled():
+        return {"speculation_id": ""}
+    
+    speculation_id, queries = start_speculation(state.get("form_data", {}), get_search_tool())
+    if not queries:
+        return {"speculation_id": ""}
+    
+    console.print(f"[dim]⚡ 预搜索 {len(queries)} 个由表单推断的关键词（与需求分析并行）[/dim]")
+    return {
+        "speculation_id": speculation_id,
+        "current_step": "speculate",
+        "messages": [f"预搜索已启动: {len(queries)} 个关键词"],
+    }
+
+
+async def speculate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """预搜索节点（异步）- 只提交后台任务，不阻塞事件循环"""
+    return speculate_node(state)
+
+
+def _settle_speculation(state: TechStackState, update: Dict[str, Any]) -> Dict[str, Any]:
+    """分析判定无需搜索时取消预搜索"""
+    if not update.get("needs_search"):
+        cancel_speculation(state.get("speculation_id"))
+    return update
+
+
+# ===== 节点缓存 =====
+
+# 缓存条目的组成：(节点名, 指纹, 输入)。指纹覆盖提示词模版（系统提示词内嵌
+# selection_guide.md）与模型参数，任何一项变化都会使该节点的旧缓存失效。
+Memo = Tuple[str, str, Any]
+
+
+def _model_settings(llm_client) -> Tuple[str, float, int]:
+    return llm_client.model, llm_client.temperature, llm_client.max_tokens
+
+
+def _analysis_memo(llm_client, project_info: Dict[str, Any], fused: bool) -> Memo:
+    """需求分析：输入为规范化的 project_info（系统提示词中的指南片段也由它决定）"""
+    if fused:
+        return (
+            "analyze_fused",
+            fingerprint(ANALYSIS_SYSTEM_PROMPT, SELECTION_GUIDE, guide_token_budget(),
+                        prompt_token_target(llm_client.max_tokens),
+                        FUSED_ANALYSIS_PROMPT_TEMPLATE, *_model_settings(llm_client)),
+            project_info,
+        )
+    return (
+        "analyze",
+        fingerprint(ANALYSIS_SYSTEM_PROMPT, SELECTION_GUIDE, guide_token_budget(),
+                    prompt_token_target(llm_client.max_tokens),
+                    ANALYSIS_PROMPT_TEMPLATE, *_model_settings(llm_client)),
+        project_info,
+    )
+
+
+def _keywords_memo(llm_client, state: TechStackState) -> Memo:
+    """搜索关键词生成：输入为 project_info 与分析结果"""
+    return (
+        "search_keywords",
+        fingerprint(SEARCH_SYSTEM_PROMPT, SEARCH_KEYWORDS_PROMPT_TEMPLATE, *_model_settings(llm_client)),
+        {
+            "project_info": form_data_to_project_info(state.get("form_data", {})),
+            "extracted_requirements": state.get("extracted_requirements", []),
+            "tech_constraints": state.get("tech_constraints", []),
+        },
+    )
+
+
+def _search_memo(
+    search_tool,
+    keywords: List[str],
+    speculation: Optional[SpeculativeSearch],
+    state: TechStackState,
+) -> Memo:
+    """
+    搜索结果：输入为关键词列表；有预搜索时还包括预搜索查询与对账所用的需求，
+    二者决定了复用哪些预搜索结果
+    """
+    inputs: Dict[str, Any] = {"keywords": keywords}
+    if speculation is not None:
+        inputs["speculative_queries"] = [q.query for q in speculation.queries]
+        inputs["extracted_requirements"] = state.get("extracted_requirements", [])
+    return (
+        "search",
+        fingerprint(type(search_tool.backend).__name__, search_tool.region,
+                    SEARCH_RESULTS_PER_QUERY, MAX_SEARCH_KEYWORDS),
+        inputs,
+    )
+
+
+def _memo_lookup(node: str, node_fingerprint: str, inputs: Any) -> Tuple[Optional[str], Any]:
+    """
+    查询节点缓存
+    
+    Returns:
+        (缓存键, 缓存值)；未启用缓存时缓存键为 None，未命中时缓存值为 None
+    """
+    cache = get_node_cache()
+    if cache is None:
+        return None, None
+    key, value = cache.get(node, node_fingerprint, inputs)
+    if value is not None:
+        console.print(f"[dim]⚡ 节点缓存命中（{node}），跳过重复的调用[/dim]")
+    return key, value
+
+
+def _memo_store(
+    node: str,
+    node_fingerprint: str,
+    inputs: Any,
+    key: Optional[str],
+    value: Any,
+    cost: Dict[str, int],
+) -> None:
+    """写入节点缓存（cost 为该结果代表的调用次数，命中时计入节省）"""
+    cache = get_node_cache()
+    if cache is not None and key is not None and value:
+        cache.set(node, node_fingerprint, key, value, cost)
+
+
+def _memo_lookup_call(memo: Memo) -> _Call:
+    """节点步骤中的缓存查询（SQLite 读取，异步节点中在线程里执行）"""
+    return _Call(_memo_lookup, None, memo)
+
+
+def _memo_store_call(memo: Memo, key: Optional[str], value: Any, cost: Dict[str, int]) -> _Call:
+    """节点步骤中的缓存写入（SQLite 写入，异步节点中在线程里执行）"""
+    return _Call(_memo_store, None, (*memo, key, value, cost))
+
+
 # ===== 分析节点 =====
 
 def analyze_node(state: TechStackState) -> Dict[str, Any]:
     """
     分析节点 - 基于 form_data 进行技术需求分析
     """
-    console.print("\n[bold green]🔍 正在分析技术需求...[/bold green]")
-    
-    form_data = state.get("form_data", {})
-    project_info = form_data_to_project_info(form_data)
+    return _run_steps(_analysis_steps(state, fused=False))
+
+
+async def analyze_node_async(state: TechStackState) -> Dict[str, Any]:
+    """分析节点（异步）"""
+    return await _arun_steps(_analysis_steps(state, fused=False))
+
+
+def analyze_fused_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    合并分析节点 - 一次 LLM 调用同时完成需求分析并生成搜索关键词
     
-    llm_client = get_llm_client()
+    省去搜索节点中单独的关键词生成调用（ANALYSIS_MODE=fused）。
+    """
+    return _run_steps(_analysis_steps(state, fused=True))
+
+
+async def analyze_fused_node_async(state: TechStackState) -> Dict[str, Any]:
+    """合并分析节点（异步）"""
+    return await _arun_steps(_analysis_steps(state, fused=True))
+
+
+def _analysis_steps(state: TechStackState, fused: bool) -> Steps:
+    """分析节点步骤：节点缓存未命中时调用一次 LLM，失败时使用默认分析结果"""
+    if fused:
+        console.print("\n[bold green]🔍 正在分析技术需求（含搜索关键词）...[/bold green]")
+    else:
+        console.print("\n[bold green]🔍 正在分析技术需求...[/bold green]")
     
     try:
-        prompt = get_analysis_prompt(project_info)
-        response = llm_client.invoke(prompt, system_message=ANALYSIS_SYSTEM_PROMPT)
+        update = _analysis_update((yield from _analysis_result_steps(state, fused)))
+    except Exception as e:
+        update = _analysis_fallback(e)
+    
+    return _settle_speculation(state, update)
+
+
+def _analysis_result_steps(state: TechStackState, fused: bool) -> Generator[_Call, Any, Dict[str, Any]]:
+    """需求分析结果：节点缓存未命中时调用一次 LLM 并解析（失败时抛出异常）"""
+    project_info = form_data_to_project_info(state.get("form_data", {}))
+    llm_client = get_llm_client()
+    memo = _analysis_memo(llm_client, project_info, fused=fused)
+    key, analysis_result = yield _memo_lookup_call(memo)
+    if analysis_result is None:
+        prompt, system_prompt = _analysis_prompts(llm_client, project_info, fused=fused)
+        response = yield _llm_call(llm_client, prompt, system_prompt)
         analysis_result = _parse_json_response(response)
-        
-        console.print("✓ 分析完成")
-        
-        return {
-            "extracted_requirements": analysis_result.get("extracted_requirements", []),
-            "tech_constraints": analysis_result.get("tech_constraints", []),
-            "needs_search": analysis_result.get("needs_search", False),
-            "current_step": "analyze",
-            "messages": ["需求分析完成"],
-        }
+        yield _memo_store_call(memo, key, analysis_result, {"llm_calls": 1})
+    return analysis_result
+
+
+def _analysis_update(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """将分析结果转换为状态更新（合并模式下同时带出搜索关键词）"""
+    console.print("✓ 分析完成")
     
-    except Exception as e:
-        console.print(f"[yellow]分析遇到错误: {str(e)}[/yellow]")
-        return {
-            "extracted_requirements": ["基于项目类型的标准需求"],
-            "tech_constraints": ["团队学习曲线"],
-            "needs_search": False,
-            "current_step": "analyze",
-            "messages": ["使用默认分析"],
-        }
+    update = {
+        "extracted_requirements": analysis_result.get("extracted_requirements", []),
+        "tech_constraints": analysis_result.get("tech_constraints", []),
+        "needs_search": analysis_result.get("needs_search", False),
+        "current_step": "analyze",
+        "messages": ["需求分析完成"],
+    }
+    if analysis_result.get("search_keywords"):
+        update["search_keywords"] = analysis_result["search_keywords"]
+    return update
+
+
+def _analysis_fallback(error: Exception) -> Dict[str, Any]:
+    """分析失败时的默认分析结果"""
+    console.print(f"[yellow]分析遇到错误: {str(error)}[/yellow]")
+    return {
+        "extracted_requirements": ["基于项目类型的标准需求"],
+        "tech_constraints": ["团队学习曲线"],
+        "needs_search": False,
+        "current_step": "analyze",
+        "messages": ["使用默认分析"],
+    }
 
 
 # ===== 搜索节点 =====
 
 def search_node(state: TechStackState) -> Dict[str, Any]:
-    """搜索节点 - 在线技术调研"""
+    """
+    搜索节点 - 在线技术调研（关键词并发搜索，结果按关键词优先级合并）
+    
+    分析阶段已给出 search_keywords（合并模式）时直接使用，不再单独调用 LLM。
+    """
+    return _run_steps(_search_steps(state))
+
+
+async def search_node_async(state: TechStackState) -> Dict[str, Any]:
+    """搜索节点（异步）- 搜索请求在线程中并发执行"""
+    return await _arun_steps(_search_steps(state))
+
+
+def _search_steps(state: TechStackState) -> Steps:
+    """搜索节点步骤：按需生成关键词，与预搜索对账后搜索其余关键词"""
     console.print("\n[bold green]🌐 正在进行技术调研...[/bold green]")
     
-    form_data = state.get("form_data", {})
-    project_info = form_data_to_project_info(form_data)
+    llm_client = get_llm_client()
+    search_tool = get_search_tool()
+    speculation = take_speculation(state.get("speculation_id"))
+    
+    try:
+        keywords = state.get("search_keywords") or []
+        if not keywords:
+            memo = _keywords_memo(llm_client, state)
+            key, keywords = yield _memo_lookup_call(memo)
+            if keywords is None:
+                prompt = _search_keywords_prompt(state)
+                response = yield _llm_call(llm_client, prompt, SEARCH_SYSTEM_PROMPT)
+                keywords = _parse_search_keywords(response)
+                if keywords:
+                    yield _memo_store_call(memo, key, keywords, {"llm_calls": 1})
+        
+        memo = _search_memo(search_tool, keywords, speculation, state)
+        key, all_results = yield _memo_lookup_call(memo)
+        if all_results is None:
+            reused, keywords = _reconcile_speculation(speculation, keywords, state)
+            keywords = _announce_keywords(keywords)
+            all_results = yield _Call(
+                search_tool.search_multiple,
+                search_tool.asearch_multiple,
+                (keywords,),
+                {"max_results_per_query": SEARCH_RESULTS_PER_QUERY},
+            )
+            if speculation is not None:
+                all_results = (yield _Call(
+                    speculation.collect, speculation.acollect, (reused, search_tool.timeout)
+                )) + all_results
+            if all_results:
+                yield _memo_store_call(memo, key, all_results, {"searches": len(reused) + len(keywords)})
+        
+        return _search_update(all_results, state)
+    
+    except Exception as e:
+        return _search_fallback(e)
     
+    finally:
+        if speculation is not None:
+            speculation.cancel()
+
+
+def _search_keywords_prompt(state: TechStackState) -> str:
+    """构建搜索关键词生成提示词"""
+    project_info = form_data_to_project_info(state.get("form_data", {}))
     analysis_result = {
         "extracted_requirements": state.get("extracted_requirements", []),
         "tech_constraints": state.get("tech_constraints", []),
     }
+    return get_search_keywords_prompt(project_info, analysis_result)
+
+
+def _parse_search_keywords(response: str) -> List[str]:
+    """从 LLM 响应中解析搜索关键词"""
+    search_data = _parse_json_response(response)
+    keywords = search_data.get("search_keywords", [])
+    
+    console.print(f"生成了 {len(keywords)} 个搜索关键词")
+    return keywords
+
+
+def _reconcile_speculation(
+    speculation: Optional[SpeculativeSearch],
+    keywords: List[str],
+    state: TechStackState,
+) -> Tuple[List[str], List[str]]:
+    """
+    预搜索对账：返回 (复用的预搜索查询, 仍需搜索的关键词)
+    
+    复用的查询占用 MAX_SEARCH_KEYWORDS 配额，其余预搜索被丢弃。
+    """
+    if speculation is None:
+        return [], keywords
+    
+    reused, remaining = speculation.reconcile(
+        keywords, state.get("extracted_requirements", []), MAX_SEARCH_KEYWORDS
+    )
+    for query in reused:
+        console.print(f"  复用预搜索: {query}")
+    discarded = len(speculation.queries) - len(reused)
+    if discarded:
+        console.print(f"[dim]  丢弃 {discarded} 个与分析结果无关的预搜索[/dim]")
+    return reused, remaining
+
+
+def _announce_keywords(keywords: List[str]) -> List[str]:
+    """截取前 MAX_SEARCH_KEYWORDS 个关键词并打印"""
+    keywords = keywords[:MAX_SEARCH_KEYWORDS]
+    for keyword in keywords:
+        console.print(f"  搜索: {keyword}")
+    return keywords
+
+
+def _search_update(all_results: List[Dict[str, Any]], state: TechStackState) -> Dict[str, Any]:
+    """
+    将搜索结果去重（同一页面的不同链接、转载副本）、按与需求的相关度排序后
+    转换为状态更新（生成提示词按此顺序在 token 预算内选取调研摘要）
+    """
+    results = dedupe_results(all_results)
+    removed = len(all_results) - len(results)
+    console.print(
+        f"✓ 找到 {len(results)} 条相关信息"
+        + (f"[dim]（去除 {removed} 条重复）[/dim]" if removed else "")
+    )
+    
+    form_data = state.get("form_data", {})
+    ranked = rank_results(
+        results,
+        state.get("extracted_requirements", [])
+        + state.get("tech_constraints", [])
+        + [form_data.get("core_features", ""), form_data.get("key_features", "")],
+    )
+    results = [result for _, result in ranked]
+    for score, result in ranked[:3]:
+        console.print(f"[dim]  {score:.2f}  {result.get('title', '')[:60]}[/dim]")
+    
+    return {
+        "search_results": results,
+        "current_step": "search",
+        "messages": ["技术调研完成"],
+    }
+
+
+def _search_fallback(error: Exception) -> Dict[str, Any]:
+    """搜索失败时的状态更新"""
+    console.print(f"[yellow]搜索失败: {str(error)}[/yellow]")
+    return {
+        "search_results": [],
+        "current_step": "search",
+        "messages": ["搜索失败"],
+    }
+
+
+# ===== 生成节点 =====
+
+def generate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    文档生成节点 - 基于 form_data + 分析结果生成技术方案文档
+    """
+    return _run_steps(_generate_steps(state))
+
+
+async def generate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """文档生成节点（异步）"""
+    return await _arun_steps(_generate_steps(state))
+
+
+def _generate_steps(state: TechStackState) -> Steps:
+    """文档生成节点步骤：流式写入文档，中断时从已写入处续写，失败时写入降级文档"""
+    console.print("\n[bold green]📝 正在生成技术方案文档...[/bold green]")
     
     llm_client = get_llm_client()
-    search_tool = get_search_tool()
+    sink = _open_document(state)
     
     try:
-        prompt = get_search_keywords_prompt(project_info, analysis_result)
-        response = llm_client.invoke(prompt, system_message=SEARCH_SYSTEM_PROMPT)
-        search_data = _parse_json_response(response)
-        keywords = search_data.get("search_keywords", [])
-        
-        console.print(f"生成了 {len(keywords)} 个搜索关键词")
-        
-        all_results = []
-        for keyword in keywords[:8]:
-            console.print(f"  搜索: {keyword}")
-            results = search_tool.search(keyword, max_results=3)
-            all_results.extend(results)
+        inputs, system_prompt = _budgeted_inputs(state, "generate", GENERATOR_SYSTEM_PROMPT, llm_client)
+        prompt = get_generation_prompt(*inputs)
         
-        console.print(f"✓ 找到 {len(all_results)} 条相关信息")
+        console.print("\n[dim]生成中...[/dim]")
+        with LivePreview(console) as preview:
+            def feed(chunk: str) -> None:
+                sink.write(chunk)
+                preview.feed(chunk)
+            
+            tail = ""
+            for resume in range(_max_stream_resumes() + 1):
+                try:
+                    yield _stream_call(llm_client, prompt, system_prompt, feed, tail)
+                    break
+                except Exception as e:
+                    prompt, tail = _continuation(inputs, sink, resume, e)
         
-        return {
-            "search_results": all_results,
-            "current_step": "search",
-            "messages": ["技术调研完成"],
-        }
+        return _generate_update(sink)
     
     except Exception as e:
-        console.print(f"[yellow]搜索失败: {str(e)}[/yellow]")
-        return {
-            "search_results": [],
-            "current_step": "search",
-            "messages": ["搜索失败"],
-        }
+        return _generate_fallback(state, sink, e)
+    
+    finally:
+        sink.close()
 
 
-# ===== 生成节点 =====
+# 续写请求携带的已输出末尾长度，及续写开头用于去重的缓冲长度
+RESUME_TAIL_CHARS = 1500
+RESUME_OVERLAP_WINDOW = 400
 
-def generate_node(state: TechStackState) -> Dict[str, Any]:
+
+def _max_stream_resumes() -> int:
+    """流式生成中断后最多发起的续写次数（STREAM_RESUME_ATTEMPTS，默认 2，0 表示不续写）"""
+    return max(0, int(os.getenv("STREAM_RESUME_ATTEMPTS", 2)))
+
+
+def _continuation(
+    inputs: Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]],
+    sink: DocumentSink,
+    resume: int,
+    error: Exception,
+) -> Tuple[str, str]:
     """
-    文档生成节点 - 基于 form_data + 分析结果生成技术方案文档
+    流式生成中断：基于已写入的部分构建续写请求
+    
+    Returns:
+        (续写提示词, 已输出内容的末尾)
+    
+    Raises:
+        Exception: 无可续写的内容或续写次数用尽时重新抛出原错误
     """
-    console.print("\n[bold green]📝 正在生成技术方案文档...[/bold green]")
+    partial = sink.read()
+    if resume >= _max_stream_resumes() or not partial.strip():
+        raise error
     
+    console.print(f"[yellow]⚠ 生成在 {len(partial)} 字符处中断（{str(error)}），"
+                  f"从中断处续写（第 {resume + 1} 次）[/yellow]")
+    tail = partial[-RESUME_TAIL_CHARS:]
+    prompt = get_continuation_prompt(section_titles(partial), tail, *inputs)
+    return prompt, tail
+
+
+def _skip_overlap(chunks: Iterator[str], tail: str) -> Iterator[str]:
+    """去掉续写开头与已输出末尾重复的部分"""
+    head = ""
+    for chunk in chunks:
+        if head is None:
+            yield chunk
+            continue
+        head += chunk
+        if len(head) >= RESUME_OVERLAP_WINDOW:
+            yield head[continuation_overlap(tail, head):]
+            head = None
+    if head:
+        yield head[continuation_overlap(tail, head):]
+
+
+async def _askip_overlap(chunks: AsyncIterator[str], tail: str) -> AsyncIterator[str]:
+    """_skip_overlap 的异步版本"""
+    head = ""
+    async for chunk in chunks:
+        if head is None:
+            yield chunk
+            continue
+        head += chunk
+        if len(head) >= RESUME_OVERLAP_WINDOW:
+            yield head[continuation_overlap(tail, head):]
+            head = None
+    if head:
+        yield head[continuation_overlap(tail, head):]
+
+
+def _open_document(state: TechStackState) -> DocumentSink:
+    """打开输出文档，生成的内容边到达边写入（保存节点再落定文件名）"""
+    return get_file_manager().open_document(
+        project_name=state.get("project_type", "unknown"),
+        filename=state.get("document_name") or None,
+    )
+
+
+def _generation_inputs(
+    state: TechStackState,
+    budget: Optional[PromptBudget] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    文档生成类提示词的输入：(project_info, analysis_result, search_results)
+    
+    给定预算时，搜索结果按排序截取到调研摘要分得的 token 数以内。
+    """
     form_data = state.get("form_data", {})
     project_info = form_data_to_project_info(form_data)
     project_info["form_data"] = form_data
@@ -161,38 +834,756 @@ def generate_node(state: TechStackState) -> Dict[str, Any]:
     }
     
     search_results = state.get("search_results", [])
+    if budget is not None and search_results:
+        evidence = budget.get("evidence")
+        search_results = (
+            select_within_budget(search_results, search_result_cost, evidence) if evidence > 0 else []
+        )
+    return project_info, analysis_result, search_results
+
+
+def _slot_free_tokens(system_template: str) -> int:
+    """系统提示词去掉指南与模版占位符后的 token 数"""
+    return count_tokens(system_template.replace(GUIDE_SLOT, "").replace(TEMPLATE_SLOT, ""))
+
+
+def _log_prompt_budget(budget: PromptBudget) -> None:
+    """输出预算分配，并记录到当前 span 的 prompt_budget 属性"""
+    console.print(f"[dim]  提示词预算: {budget.describe()}[/dim]")
+    span = current_span()
+    if span is not None:
+        span.attrs.setdefault("prompt_budget", {})[budget.call] = budget.to_dict()
+
+
+def _prompt_budget(state: TechStackState, call: str, system_template: str, llm_client) -> PromptBudget:
+    """
+    文档生成类调用的预算分配
+    
+    不可裁剪部分以系统提示词指令与文档生成提示词（表单字段、分析结果）估算；
+    方案模版、调研摘要与选型指南按 budget.PART_PRIORITY 分配剩余预算。
+    """
+    project_info, analysis_result, search_results = _generation_inputs(state)
+    fixed = _slot_free_tokens(system_template) + count_tokens(
+        get_generation_prompt(project_info, analysis_result, [])
+    )
+    desired = {}
+    if TEMPLATE_SLOT in system_template:
+        desired["template"] = count_tokens(TECH_SOLUTION_TEMPLATE)
+    if search_results:
+        desired["evidence"] = sum(
+            search_result_cost(result)
+            for result in select_within_budget(search_results, search_result_cost, SEARCH_SUMMARY_TOKENS, 5)
+        )
+    if GUIDE_SLOT in system_template:
+        desired["guide"] = count_tokens(select_guide(project_info, analysis_result))
+    
+    budget = allocate_prompt_budget(call, fixed, desired, prompt_token_target(llm_client.max_tokens))
+    _log_prompt_budget(budget)
+    return budget
+
+
+def _system_prompt(template: str, state: TechStackState, budget: PromptBudget) -> str:
+    """按预算填入方案模版与按表单、分析结果检索出的选型指南片段（见 guide_index）"""
+    project_info, analysis_result, _ = _generation_inputs(state)
+    # select_guide 的预算为 0 表示注入全文，分不到预算时只保留一级标题
+    guide_tokens = budget.get("guide") or 1
+    system_prompt = with_selection_guide(template, project_info, analysis_result, guide_tokens)
+    return with_solution_template(system_prompt, budget.get("template"))
+
+
+def _budgeted_inputs(
+    state: TechStackState,
+    call: str,
+    system_template: str,
+    llm_client,
+) -> Tuple[Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]], str]:
+    """
+    按本次调用的预算准备生成输入与系统提示词
+    
+    Returns:
+        (_generation_inputs 的结果, 填好的系统提示词)
+    """
+    budget = _prompt_budget(state, call, system_template, llm_client)
+    return _generation_inputs(state, budget), _system_prompt(system_template, state, budget)
+
+
+def _analysis_prompts(llm_client, project_info: Dict[str, Any], fused: bool) -> Tuple[str, str]:
+    """
+    需求分析的 (提示词, 系统提示词)：package.json 与选型指南片段按预算裁剪
+    """
+    build = get_fused_analysis_prompt if fused else get_analysis_prompt
+    package_json = project_info.get("package_json", "") or ""
+    fixed = _slot_free_tokens(ANALYSIS_SYSTEM_PROMPT) + count_tokens(build(project_info, package_json_tokens=0))
+    desired = {"guide": count_tokens(select_guide(project_info))}
+    if package_json:
+        desired["form"] = min(count_tokens(package_json), PACKAGE_JSON_TOKENS)
+    
+    budget = allocate_prompt_budget(
+        "analyze_fused" if fused else "analyze", fixed, desired, prompt_token_target(llm_client.max_tokens)
+    )
+    _log_prompt_budget(budget)
+    prompt = build(project_info, package_json_tokens=budget.get("form"))
+    system_prompt = with_selection_guide(
+        ANALYSIS_SYSTEM_PROMPT, project_info, token_budget=budget.get("guide") or 1
+    )
+    return prompt, system_prompt
+
+
+def _generate_update(sink: DocumentSink) -> Dict[str, Any]:
+    """将生成的文档转换为状态更新（状态中只保存文档路径）"""
+    console.print(f"✓ 文档生成完成（{sink.chars} 字符）")
+    
+    return {
+        "document_path": str(sink.path),
+        "generation_fallback": False,
+        "current_step": "generate",
+        "messages": ["技术文档生成完成"],
+    }
+
+
+def _generate_fallback(
+    state: TechStackState,
+    sink: DocumentSink,
+    error: Exception,
+) -> Dict[str, Any]:
+    """生成失败时用降级文档覆盖已写入的部分内容"""
+    console.print(f"[red]文档生成失败: {str(error)}[/red]")
+    sink.reset(_generate_fallback_document(state))
+    
+    return {
+        "document_path": str(sink.path),
+        "generation_fallback": True,
+        "current_step": "generate",
+        "messages": ["使用降级文档"],
+    }
+
+
+# ===== 分章节并行生成节点 =====
+
+def sectioned_generate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    分章节生成节点（GENERATION_MODE=sectioned）- map-reduce 式生成
+    
+    先用一次精简调用产出共享的方案规划，再把模版的各顶层章节并行交给
+    多个 LLM 调用撰写；按模版顺序、前序章节一完成即写入文档，写入前做
+    本地一致性整理（标题层级、重复标题、代码块包裹等）。
+    """
+    return _run_steps(_sectioned_generate_steps(state))
+
+
+async def sectioned_generate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """分章节生成节点（异步）"""
+    return await _arun_steps(_sectioned_generate_steps(state))
+
+
+def _sectioned_generate_steps(state: TechStackState) -> Steps:
+    """分章节生成节点步骤"""
+    console.print("\n[bold green]📝 正在分章节并行生成技术方案文档...[/bold green]")
     
     llm_client = get_llm_client()
+    sink = _open_document(state)
     
     try:
-        prompt = get_generation_prompt(project_info, analysis_result, search_results)
-        
-        console.print("\n[dim]生成中...[/dim]")
-        document_parts = []
+        inputs, system_prompt = _budgeted_inputs(state, "sectioned", SECTIONED_SYSTEM_PROMPT, llm_client)
+        try:
+            response = yield _llm_call(llm_client, get_document_plan_prompt(*inputs), system_prompt)
+            plan = _document_plan(response)
+        except Exception as e:
+            plan = _document_plan_fallback(e)
         
-        for chunk in llm_client.stream(prompt, system_message=GENERATOR_SYSTEM_PROMPT):
-            document_parts.append(chunk)
+        prompts = _chapter_prompts(plan, inputs)
+        chapters = _FanOut(
+            llm_client.invoke,
+            llm_client.ainvoke,
+            [(prompt, system_prompt) for prompt in prompts],
+            _generation_concurrency(len(prompts)),
+            "chapter",
+        )
+        try:
+            yield chapters.start_call()
+            with LivePreview(console, title="分章节生成") as preview:
+                for index in range(len(prompts)):
+                    try:
+                        text = _chapter_text(index, (yield chapters.result_call(index)))
+                    except Exception as e:
+                        text = _chapter_fallback(index, e)
+                    sink.write(text)
+                    preview.feed(text)
+        finally:
+            chapters.close()
         
-        final_document = "".join(document_parts)
+        return _generate_update(sink)
+    
+    except Exception as e:
+        return _generate_fallback(state, sink, e)
+    
+    finally:
+        sink.close()
+
+
+def _generation_concurrency(chapters: int) -> int:
+    """同时进行的章节调用数（GENERATION_CONCURRENCY，默认 6）"""
+    return max(1, min(chapters, int(os.getenv("GENERATION_CONCURRENCY", 6))))
+
+
+def _document_plan(response: str) -> Dict[str, Any]:
+    """解析共享的方案规划"""
+    plan = _parse_json_response(response)
+    console.print(f"✓ 方案规划完成: {plan.get('solution_name') or '未命名方案'}")
+    return plan
+
+
+def _document_plan_fallback(error: Exception) -> Dict[str, Any]:
+    """规划失败时各章节仅依据分析结果撰写"""
+    console.print(f"[yellow]方案规划失败，各章节将独立撰写: {str(error)}[/yellow]")
+    return {}
+
+
+def _chapter_prompts(
+    plan: Dict[str, Any],
+    inputs: Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]],
+) -> List[str]:
+    """为每个模版章节组构建撰写提示词（篇幅按模版长度分配）"""
+    template_chars = sum(len(chapter.text) for chapter in TEMPLATE_CHAPTERS)
+    prompts = []
+    for chapter in TEMPLATE_CHAPTERS:
+        first = next(iter_headings(chapter.text))
+        prompts.append(get_chapter_prompt(
+            chapter_title=chapter.title,
+            chapter_template=chapter.text,
+            first_heading=f"{'#' * first.level} {first.title}",
+            plan=plan,
+            project_info=inputs[0],
+            analysis_result=inputs[1],
+            search_results=inputs[2],
+            target_chars=max(200, DOCUMENT_TARGET_CHARS * len(chapter.text) // template_chars),
+        ))
+    console.print(f"[dim]  {len(prompts)} 个章节组并行撰写: "
+                  + "、".join(chapter.title for chapter in TEMPLATE_CHAPTERS) + "[/dim]")
+    return prompts
+
+
+def _chapter_text(index: int, response: str) -> str:
+    """章节一致性整理"""
+    return normalize_chapter(response, TEMPLATE_CHAPTERS[index], first=index == 0)
+
+
+def _chapter_fallback(index: int, error: Exception) -> str:
+    """章节生成失败时保留模版原文并标注"""
+    chapter: Chapter = TEMPLATE_CHAPTERS[index]
+    console.print(f"[yellow]章节「{chapter.title}」生成失败，保留模版: {str(error)}[/yellow]")
+    return normalize_chapter(
+        chapter.text + "\n\n> 本部分自动生成失败，以上为模版原文，请人工补充。",
+        chapter,
+        first=index == 0,
+    )
+
+
+# ===== 骨架渲染生成节点 =====
+
+def skeleton_generate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    骨架渲染生成节点（GENERATION_MODE=skeleton）
+    
+    标题、ChangeLog、模版声明、全部章节标题与固定检查项由本地按模版渲染，
+    LLM 只输出可变内容（候选方案、对比、风险等）的结构化 JSON，
+    大幅减少输出 token。
+    """
+    return _run_steps(_skeleton_generate_steps(state))
+
+
+async def skeleton_generate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """骨架渲染生成节点（异步）"""
+    return await _arun_steps(_skeleton_generate_steps(state))
+
+
+def _skeleton_generate_steps(state: TechStackState) -> Steps:
+    """骨架渲染生成节点步骤"""
+    console.print("\n[bold green]📝 正在生成技术方案内容（骨架本地渲染）...[/bold green]")
+    
+    llm_client = get_llm_client()
+    sink = _open_document(state)
+    
+    try:
+        inputs, system_prompt = _budgeted_inputs(state, "skeleton", SKELETON_SYSTEM_PROMPT, llm_client)
+        prompt = get_skeleton_content_prompt(*inputs)
         
-        console.print("✓ 文档生成完成")
+        chunks = []
+        with LivePreview(console, title="生成结构化内容") as preview:
+            def feed(chunk: str) -> None:
+                chunks.append(chunk)
+                preview.feed(chunk)
+            
+            yield _stream_call(llm_client, prompt, system_prompt, feed)
         
-        return {
-            "final_document": final_document,
-            "current_step": "generate",
-            "messages": ["技术文档生成完成"],
-        }
+        sink.write(_render_skeleton(inputs[0], "".join(chunks)))
+        return _generate_update(sink)
     
     except Exception as e:
-        console.print(f"[red]文档生成失败: {str(e)}[/red]")
+        return _generate_fallback(state, sink, e)
+    
+    finally:
+        sink.close()
+
+
+def _render_skeleton(project_info: Dict[str, Any], response: str) -> str:
+    """解析结构化内容并按模版渲染完整文档"""
+    content = _parse_json_response(response)
+    if not content:
+        raise ValueError("结构化内容为空或无法解析")
+    console.print(f"[dim]  结构化内容 {len(response)} 字符，本地渲染骨架[/dim]")
+    return DocumentGenerator.render_solution_document(content, project_info, TECH_SOLUTION_TEMPLATE)
+
+
+# ===== 随时可交付生成节点 =====
+
+RESEARCH_SECTION = "3.1"
+
+
+def anytime_generate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    随时可交付生成节点（GENERATION_MODE=anytime）
+    
+    不等搜索完成：先仅凭表单与分析结果生成草稿，同时在后台执行搜索。
+    搜索从开始起在截止时间（ANYTIME_SEARCH_DEADLINE）内返回则只精修
+    「3.1 技术调研和选型」章节，否则直接保存草稿，端到端耗时有上界。
+    截止时间与草稿生成并行计时：草稿完成时搜索已超时则不再等待，
+    搜索仍在截止时间内则最多再等到截止时间。
+    """
+    return _run_steps(_anytime_generate_steps(state))
+
+
+async def anytime_generate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """随时可交付生成节点（异步）"""
+    return await _arun_steps(_anytime_generate_steps(state))
+
+
+def _anytime_generate_steps(state: TechStackState) -> Steps:
+    """随时可交付生成节点步骤"""
+    deadline = _anytime_deadline()
+    search_clock = _SearchClock()
+    search = _FanOut(search_clock.run, search_clock.arun, [(state,)], 1, "anytime-search")
+    
+    try:
+        yield search.start_call()
+        draft_update = yield from _generate_steps({**state, "search_results": []})
         
-        fallback_doc = _generate_fallback_document(state)
+        try:
+            search_update = yield search.result_call(0, timeout=search_clock.remaining(deadline))
+        except (FutureTimeoutError, asyncio.TimeoutError):
+            return _anytime_timeout_update(draft_update, deadline)
         
-        return {
-            "final_document": fallback_doc,
-            "current_step": "generate",
-            "messages": ["使用降级文档"],
-        }
+        refinement = _research_refinement(state, draft_update, search_update)
+        if refinement is not None:
+            prompt, document = refinement
+            try:
+                llm_client = get_llm_client()
+                _, system_prompt = _budgeted_inputs(state, "refine", GENERATOR_SYSTEM_PROMPT, llm_client)
+                response = yield _llm_call(llm_client, prompt, system_prompt)
+                _apply_research_refinement(draft_update["document_path"], document, response)
+            except Exception as e:
+                console.print(f"[yellow]3.1 章节精修失败，保留草稿: {str(e)}[/yellow]")
+        
+        return _anytime_update(draft_update, search_update)
+    
+    finally:
+        # 超时的搜索不再等待
+        search.close()
+
+
+def _anytime_deadline() -> float:
+    """搜索结果的截止时间（秒，从搜索开始计时）"""
+    return float(os.getenv("ANYTIME_SEARCH_DEADLINE", 30.0))
+
+
+class _SearchClock:
+    """执行后台搜索并记录其实际开始的时间，截止时间从此刻算起"""
+    
+    def __init__(self):
+        self.started: Optional[float] = None
+    
+    def run(self, state: TechStackState) -> Dict[str, Any]:
+        self.started = time.monotonic()
+        return search_node(state)
+    
+    async def arun(self, state: TechStackState) -> Dict[str, Any]:
+        self.started = time.monotonic()
+        return await search_node_async(state)
+    
+    def remaining(self, deadline: float) -> float:
+        """距截止时间还剩的秒数（搜索尚未开始时为完整的截止时间）"""
+        if self.started is None:
+            return deadline
+        return max(0.0, deadline - (time.monotonic() - self.started))
+
+
+def _research_refinement(
+    state: TechStackState,
+    draft_update: Dict[str, Any],
+    search_update: Dict[str, Any],
+) -> Optional[Tuple[str, str]]:
+    """
+    构建 3.1 章节精修提示词
+    
+    Returns:
+        (提示词, 草稿全文)；无搜索结果或草稿中没有 3.1 章节（如降级文档）时为 None
+    """
+    search_results = search_update.get("search_results", [])
+    if not search_results:
+        return None
+    
+    with open(draft_update["document_path"], "r", encoding="utf-8") as f:
+        document = f.read()
+    section = extract_section(document, RESEARCH_SECTION)
+    if section is None:
+        console.print("[dim]草稿中没有「3.1 技术调研和选型」章节，跳过精修[/dim]")
+        return None
+    
+    console.print(f"\n[bold green]🔧 根据 {len(search_results)} 条调研结果精修 3.1 章节...[/bold green]")
+    project_info = form_data_to_project_info(state.get("form_data", {}))
+    return get_research_refinement_prompt(section, project_info, search_results), document
+
+
+def _apply_research_refinement(document_path: str, document: str, response: str) -> None:
+    """用精修后的 3.1 章节替换草稿中的对应章节"""
+    section = extract_section(strip_code_fence(response), RESEARCH_SECTION)
+    if section is None:
+        raise ValueError("精修结果中没有 3.1 章节")
+    
+    with open(document_path, "w", encoding="utf-8") as f:
+        f.write(replace_section(document, RESEARCH_SECTION, section))
+    console.print("✓ 3.1 章节已根据调研结果更新")
+
+
+def _anytime_update(draft_update: Dict[str, Any], search_update: Dict[str, Any]) -> Dict[str, Any]:
+    """合并草稿与搜索的状态更新"""
+    return {
+        **draft_update,
+        "search_results": search_update.get("search_results", []),
+        "messages": draft_update.get("messages", []) + search_update.get("messages", []),
+    }
+
+
+def _anytime_timeout_update(draft_update: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    """搜索超时：直接使用草稿"""
+    console.print(f"[yellow]⏱ 搜索未在 {deadline:g}s 内完成，直接保存草稿[/yellow]")
+    return {
+        **draft_update,
+        "messages": draft_update.get("messages", []) + ["搜索超时，使用草稿"],
+    }
+
+
+# ===== 编辑后重新生成节点 =====
+
+def revise_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    修订节点 - 修改表单后增量更新上一版本的文档（edit 流程）
+    
+    对比 base_form_data 与 form_data，按 FIELD_DEPENDENCIES 只重新分析受影响的
+    分析项、并行修订受影响的章节，其余章节原样保留，并在 ChangeLog 中追加
+    一行变更记录。修订后的文档另存为新文件，随后照常校验、保存。
+    """
+    return _run_steps(_revise_steps(state))
+
+
+async def revise_node_async(state: TechStackState) -> Dict[str, Any]:
+    """修订节点（异步）"""
+    return await _arun_steps(_revise_steps(state))
+
+
+def _revise_steps(state: TechStackState) -> Steps:
+    """修订节点步骤：受影响的章节并行修订"""
+    console.print("\n[bold green]✏️  正在按表单变更修订文档...[/bold green]")
+    
+    changes = diff_form_data(state.get("base_form_data", {}), state.get("form_data", {}))
+    for change in changes:
+        console.print(f"  {change.describe()}")
+    with open(state["base_document"], "r", encoding="utf-8") as f:
+        document = f.read()
+    
+    update: Dict[str, Any] = _project_fields(state.get("form_data", {}))
+    update.update((yield from _reanalysis_steps(state, affected_analysis_items(changes))))
+    revised_state = {**state, **update}
+    
+    sections = affected_sections(changes, TECH_SOLUTION_TEMPLATE)
+    revised: List[str] = []
+    if sections:
+        console.print("[bold green]🔧 修订 {} 个章节: {}[/bold green]".format(
+            len(sections), "、".join(title for _, title, _ in sections)))
+        llm_client = get_llm_client()
+        inputs, system_prompt = _budgeted_inputs(
+            revised_state, "revise", SECTION_REVISION_SYSTEM_PROMPT, llm_client
+        )
+        prompts = _section_revision_prompts(inputs, document, sections, changes)
+        responses = yield from _fan_out_steps(_FanOut(
+            _revise_section,
+            _arevise_section,
+            [(llm_client, key, prompt, system_prompt) for (key, _, _), prompt in zip(sections, prompts)],
+            len(prompts),
+            "revise",
+        ))
+        document, revised = _apply_section_revisions(document, sections, responses)
+    
+    note = "修改表单: " + "、".join(change.label for change in changes)
+    if revised:
+        note += "；修订章节: " + "、".join(revised)
+    document = DocumentGenerator.add_changelog_entry(document, note)
+    
+    sink = _open_document(revised_state)
+    try:
+        sink.write(document)
+    finally:
+        sink.close()
+    
+    console.print(f"✓ 已修订 {len(revised)}/{len(sections)} 个章节，其余章节沿用上一版本")
+    return {
+        **update,
+        "document_path": str(sink.path),
+        "generation_fallback": False,
+        "revised_sections": revised,
+        "current_step": "revise",
+        "messages": [note],
+    }
+
+
+def _reanalysis_steps(state: TechStackState, items: List[str]) -> Generator[_Call, Any, Dict[str, Any]]:
+    """
+    重新分析，只返回受影响的分析项（其余分析项保持上一版本，避免无关章节
+    与分析结果不一致）；调用失败时保留原分析
+    """
+    if not items:
+        return {}
+    
+    console.print(f"[dim]重新分析: {', '.join(items)}[/dim]")
+    try:
+        analysis_result = yield from _analysis_result_steps(state, fused=False)
+    except Exception as e:
+        console.print(f"[yellow]重新分析失败，沿用上一版本的分析结果: {str(e)}[/yellow]")
+        return {}
+    return {item: analysis_result.get(item, state.get(item, [])) for item in items}
+
+
+def _section_revision_prompts(
+    inputs: Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]],
+    document: str,
+    sections: List[Tuple[str, str, int]],
+    changes: List[FieldChange],
+) -> List[str]:
+    """为每个受影响的章节构建修订提示词"""
+    project_info, analysis_result, search_results = inputs
+    descriptions = [change.describe() for change in changes]
+    return [
+        get_section_revision_prompt(
+            heading=f"{'#' * level} {title}",
+            title=title,
+            section_template=extract_section(TECH_SOLUTION_TEMPLATE, key) or "",
+            section=extract_section(document, key),
+            changes=descriptions,
+            project_info=project_info,
+            analysis_result=analysis_result,
+            search_results=search_results,
+        )
+        for key, title, level in sections
+    ]
+
+
+def _revise_section(llm_client, key: str, prompt: str, system_prompt: str) -> str:
+    """一次章节修订调用（记录为 revise span）"""
+    with get_tracer().span("revise", "revise", section=key):
+        return llm_client.invoke(prompt, system_message=system_prompt)
+
+
+async def _arevise_section(llm_client, key: str, prompt: str, system_prompt: str) -> str:
+    """一次章节修订调用（异步）"""
+    with get_tracer().span("revise", "revise", section=key):
+        return await llm_client.ainvoke(prompt, system_message=system_prompt)
+
+
+def _apply_section_revisions(
+    document: str,
+    sections: List[Tuple[str, str, int]],
+    responses: List[Any],
+) -> Tuple[str, List[str]]:
+    """
+    把修订后的章节拼回文档（修订失败的章节保留原文）
+    
+    Returns:
+        (文档, 已修订的章节编号)
+    """
+    revised = []
+    for (key, title, level), response in zip(sections, responses):
+        if isinstance(response, Exception):
+            console.print(f"[yellow]章节「{title}」修订失败，保留原文: {str(response)}[/yellow]")
+            continue
+        template = extract_section(TECH_SOLUTION_TEMPLATE, key) or ""
+        section = normalize_chapter(response, Chapter([title], template), level=level)
+        document = splice_section(document, key, section, TECH_SOLUTION_TEMPLATE)
+        revised.append(key)
+    return document, revised
+
+
+# ===== 校验与章节修复节点 =====
+
+def validate_node(state: TechStackState) -> Dict[str, Any]:
+    """
+    文档校验节点 - 本地解析标题树，检查必备章节与 3.1 的方案对比、明确建议
+    
+    未通过的章节（最多 MAX_SECTION_REPAIRS 个）各用一次小型修复调用重写后
+    拼回原文，不重新生成整篇文档。
+    """
+    return _run_steps(_validate_steps(state))
+
+
+async def validate_node_async(state: TechStackState) -> Dict[str, Any]:
+    """文档校验节点（异步）"""
+    return await _arun_steps(_validate_steps(state))
+
+
+def _validate_steps(state: TechStackState) -> Steps:
+    """文档校验节点步骤：各章节修复调用并行执行"""
+    document_path = state.get("document_path", "")
+    if not document_path:
+        return {"current_step": "validate"}
+    
+    document, issues = _validate_document(document_path)
+    repairs = _planned_repairs(state, issues)
+    if not repairs:
+        return _validate_update(document_path, document, issues, [])
+    
+    llm_client = get_llm_client()
+    inputs, system_prompt = _budgeted_inputs(state, "repair", SECTION_REPAIR_SYSTEM_PROMPT, llm_client)
+    prompts = _section_repair_prompts(inputs, document, repairs)
+    responses = yield from _fan_out_steps(_FanOut(
+        _repair_section,
+        _arepair_section,
+        [(llm_client, issue, prompt, system_prompt) for issue, prompt in zip(repairs, prompts)],
+        len(prompts),
+        "repair",
+    ))
+    document, repaired = _apply_section_repairs(document, repairs, responses)
+    return _validate_update(document_path, document, issues, repaired)
+
+
+def _max_section_repairs() -> int:
+    """每篇文档最多修复的章节数（MAX_SECTION_REPAIRS，默认 3，0 表示只校验不修复）"""
+    return max(0, int(os.getenv("MAX_SECTION_REPAIRS", 3)))
+
+
+def _planned_repairs(state: TechStackState, issues: List[ValidationIssue]) -> List[ValidationIssue]:
+    """
+    本次要修复的问题（最多 MAX_SECTION_REPAIRS 个）
+    
+    生成刚失败、文档为降级文档时不修复：修复调用同样依赖 LLM，只会增加延迟。
+    """
+    if issues and state.get("generation_fallback"):
+        console.print("[dim]文档为生成失败后的降级文档，跳过章节修复[/dim]")
+        return []
+    return issues[:_max_section_repairs()]
+
+
+def _validate_document(document_path: str) -> Tuple[str, List[ValidationIssue]]:
+    """读取并校验生成的文档"""
+    with open(document_path, "r", encoding="utf-8") as f:
+        document = f.read()
+    
+    issues = validate_document(document, TECH_SOLUTION_TEMPLATE)
+    if issues:
+        console.print(f"\n[yellow]🔍 文档结构校验发现 {len(issues)} 处问题:[/yellow]")
+        for issue in issues:
+            console.print(f"[dim]  - {issue.describe()}[/dim]")
+    else:
+        console.print("✓ 文档结构校验通过")
+    return document, issues
+
+
+def _section_repair_prompts(
+    inputs: Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]],
+    document: str,
+    issues: List[ValidationIssue],
+) -> List[str]:
+    """为每个待修复章节构建修复提示词"""
+    project_info, analysis_result, search_results = inputs
+    console.print(f"[bold green]🔧 修复 {len(issues)} 个章节: "
+                  + "、".join(issue.title for issue in issues) + "[/bold green]")
+    return [
+        get_section_repair_prompt(
+            heading=f"{'#' * issue.level} {issue.title}",
+            title=issue.title,
+            section_template=extract_section(TECH_SOLUTION_TEMPLATE, issue.section) or "",
+            section=extract_section(document, issue.section),
+            problems=issue.problems,
+            project_info=project_info,
+            analysis_result=analysis_result,
+            search_results=search_results,
+        )
+        for issue in issues
+    ]
+
+
+def _repair_section(llm_client, issue: ValidationIssue, prompt: str, system_prompt: str) -> str:
+    """一次章节修复调用（记录为 repair span，便于统计修复频率与成本）"""
+    with get_tracer().span("repair", "repair", section=issue.section):
+        return llm_client.invoke(prompt, system_message=system_prompt)
+
+
+async def _arepair_section(llm_client, issue: ValidationIssue, prompt: str, system_prompt: str) -> str:
+    """一次章节修复调用（异步）"""
+    with get_tracer().span("repair", "repair", section=issue.section):
+        return await llm_client.ainvoke(prompt, system_message=system_prompt)
+
+
+def _apply_section_repairs(
+    document: str,
+    issues: List[ValidationIssue],
+    responses: List[Any],
+) -> Tuple[str, List[str]]:
+    """
+    按模版顺序把修复后的章节拼回文档
+    
+    Returns:
+        (文档, 已修复的章节编号)
+    """
+    repaired = []
+    for issue, response in zip(issues, responses):
+        if isinstance(response, Exception):
+            console.print(f"[yellow]章节「{issue.title}」修复失败: {str(response)}[/yellow]")
+            continue
+        template = extract_section(TECH_SOLUTION_TEMPLATE, issue.section) or ""
+        section = normalize_chapter(response, Chapter([issue.title], template), level=issue.level)
+        document = splice_section(document, issue.section, section, TECH_SOLUTION_TEMPLATE)
+        repaired.append(issue.section)
+    return document, repaired
+
+
+def _validate_update(
+    document_path: str,
+    document: str,
+    issues: List[ValidationIssue],
+    repaired: List[str],
+) -> Dict[str, Any]:
+    """写回修复后的文档并汇总校验结果"""
+    if not issues:
+        return {"current_step": "validate", "messages": ["文档结构校验通过"]}
+    
+    if repaired:
+        with open(document_path, "w", encoding="utf-8") as f:
+            f.write(document)
+    
+    remaining = validate_document(document, TECH_SOLUTION_TEMPLATE)
+    if remaining:
+        console.print("[yellow]仍未通过校验: "
+                      + "；".join(issue.describe() for issue in remaining) + "[/yellow]")
+    elif repaired:
+        console.print(f"✓ 已修复 {len(repaired)} 个章节，文档结构校验通过")
+    
+    messages = [f"修复章节: {', '.join(repaired)}"] if repaired else []
+    if remaining:
+        messages.append(f"{len(remaining)} 处结构问题未修复")
+    return {
+        "repaired_sections": repaired,
+        "current_step": "validate",
+        "messages": messages,
+    }
 
 
 # ===== 保存节点 =====
@@ -201,22 +1592,22 @@ def save_node(state: TechStackState) -> Dict[str, Any]:
     """保存节点"""
     console.print("\n[bold green]💾 正在保存文档...[/bold green]")
     
-    final_document = state.get("final_document", "")
-    project_type = state.get("project_type", "unknown")
+    document_path = state.get("document_path", "")
     
     file_manager = get_file_manager()
     
     try:
-        output_path = file_manager.save_document(
-            content=final_document,
-            project_name=project_type,
-        )
+        if not document_path:
+            raise ValueError("没有已生成的文档")
+        output_path = file_manager.finalize_document(document_path)
         
         console.print(f"✓ 文档已保存到: [cyan]{output_path}[/cyan]")
         
-        if Confirm.ask("\n是否显示文档预览？", default=False):
+        if state.get("interactive", True) and Confirm.ask("\n是否显示文档预览？", default=False):
+            with open(output_path, "r", encoding="utf-8") as f:
+                preview = f.read(500)
             console.print("\n" + "=" * 80)
-            console.print(final_document[:500] + "...\n（仅显示前500字符）")
+            console.print(preview + "...\n（仅显示前500字符）")
             console.print("=" * 80)
         
         return {
@@ -234,6 +1625,11 @@ def save_node(state: TechStackState) -> Dict[str, Any]:
         }
 
 
+async def save_node_async(state: TechStackState) -> Dict[str, Any]:
+    """保存节点（异步）- 文件写入与预览确认在线程中执行"""
+    return await asyncio.to_thread(save_node, state)
+
+
 # ===== 辅助函数 =====
 
 def _parse_json_response(response: str) -> Dict[str, Any]:
@@ -0,0 +1,311 @@
+"""
+预搜索（Speculative Search）- 在需求分析的 LLM 调用进行时提前开始技术调研
+
+表单中的核心功能、关键特性、现有技术栈与 package.json 依赖已经足以推断出
+一部分搜索关键词（主要是"具体功能 + 框架"的库调研）。预搜索在分析开始前
+就把这些查询提交到后台线程，分析完成后再与最终关键词对账：
+
+- 仍然相关（主题出现在最终关键词或需求中）的结果直接复用，并占用搜索配额
+- 不相关的查询被取消 / 丢弃
+- 分析判定无需搜索时整体取消
+
+这样搜索阶段的耗时与分析调用重叠，关键路径接近 max(分析, 搜索)。
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
+
+from src.tools.search import TechSearchTool
+
+# 表单中常见功能描述 -> 英文检索主题（与关键词提示词中"具体库名优先"的策略一致）
+FEATURE_TOPICS: Dict[str, str] = {
+    "瀑布流": "masonry",
+    "masonry": "masonry",
+    "虚拟滚动": "virtual scroll",
+    "虚拟列表": "virtual scroll",
+    "长列表": "virtual scroll",
+    "无限滚动": "infinite scroll",
+    "图表": "chart",
+    "可视化": "data visualization",
+    "表单": "form",
+    "富文本": "rich text editor",
+    "编辑器": "rich text editor",
+    "拖拽": "drag and drop",
+    "实时": "websocket realtime",
+    "即时通讯": "websocket realtime",
+    "视频": "video player",
+    "直播": "video player",
+    "3d": "3D WebGL",
+    "地图": "map",
+    "国际化": "i18n",
+    "动画": "animation",
+    "离线": "offline PWA",
+    "弱网": "offline PWA",
+    "seo": "SSR SEO",
+    "后台管理": "admin dashboard",
+    "表格": "data table",
+    "上传": "file upload",
+    "状态管理": "state management",
+}
+
+# 识别框架（按优先级）：包名或表单中出现的名称 -> 检索用名称
+FRAMEWORKS: List[Tuple[str, str]] = [
+    ("next", "Next.js"),
+    ("nuxt", "Nuxt"),
+    ("remix", "Remix"),
+    ("react", "React"),
+    ("vue", "Vue"),
+    ("angular", "Angular"),
+    ("svelte", "Svelte"),
+    ("solid-js", "SolidJS"),
+    ("taro", "Taro"),
+    ("uni-app", "uni-app"),
+    ("react-native", "React Native"),
+    ("flutter", "Flutter"),
+]
+
+
+@dataclass
+class SpeculativeQuery:
+    """一条预搜索查询及其主题词（用于与分析结果对账）"""
+
+    query: str
+    topics: List[str]
+
+
+def _package_dependencies(package_json: str) -> List[str]:
+    """从 package.json 文本中提取依赖包名（解析失败返回空列表）"""
+    try:
+        data = json.loads(package_json)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    names: List[str] = []
+    for section in ("dependencies", "devDependencies"):
+        deps = data.get(section)
+        if isinstance(deps, dict):
+            names.extend(deps.keys())
+    return names
+
+
+def _detect_framework(form_data: Dict[str, Any]) -> Optional[str]:
+    """按 package.json 依赖 > 现有技术栈 > 开发偏好的顺序识别主框架"""
+    dependencies = set(_package_dependencies(form_data.get("package_json", "") or ""))
+    for package, name in FRAMEWORKS:
+        if package in dependencies:
+            return name
+
+    text = " ".join(
+        str(form_data.get(field, "") or "") for field in ("existing_stack", "dev_preference")
+    ).lower()
+    for package, name in FRAMEWORKS:
+        if re.search(rf"(?<![a-z]){re.escape(package)}(?![a-z])", text):
+            return name
+    return None
+
+
+def derive_speculative_queries(
+    form_data: Dict[str, Any],
+    limit: int = 4,
+) -> List[SpeculativeQuery]:
+    """
+    从表单推断预搜索查询（不调用 LLM）
+
+    Args:
+        form_data: 表单数据
+        limit: 最多生成的查询数
+
+    Returns:
+        按功能出现顺序排列的查询
+    """
+    features = " ".join(
+        str(form_data.get(field, "") or "") for field in ("core_features", "key_features")
+    ).lower()
+    framework = _detect_framework(form_data)
+    prefix = f"{framework} " if framework else ""
+
+    # 按功能在表单中出现的位置排序，同一主题只搜一次
+    matches = sorted(
+        (features.find(term), term, topic)
+        for term, topic in FEATURE_TOPICS.items()
+        if term in features
+    )
+    queries: List[SpeculativeQuery] = []
+    seen_topics = set()
+    for _, term, topic in matches:
+        if topic in seen_topics:
+            continue
+        seen_topics.add(topic)
+        queries.append(SpeculativeQuery(
+            query=f"{prefix}{topic} library comparison",
+            topics=[topic, term],
+        ))
+        if len(queries) >= limit:
+            break
+
+    if not queries and framework:
+        queries.append(SpeculativeQuery(
+            query=f"{framework} best practices",
+            topics=[framework],
+        ))
+    return queries
+
+
+class SpeculativeSearch:
+    """一组在后台线程中运行的预搜索查询"""
+
+    def __init__(
+        self,
+        search_tool: TechSearchTool,
+        queries: List[SpeculativeQuery],
+        max_results_per_query: int = 3,
+    ):
+        self.search_tool = search_tool
+        self.queries = queries
+        self.started = time.monotonic()
+        # 在搜索工具的共享线程池中运行（复用其搜索会话），搜索 span 归属于发起预搜索的节点
+        self._futures: Dict[str, Future] = {
+            q.query: search_tool.submit(q.query, max_results_per_query)
+            for q in queries
+        }
+
+    def reconcile(
+        self,
+        keywords: List[str],
+        requirements: List[str],
+        budget: int,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        与分析结果对账
+
+        Args:
+            keywords: 最终搜索关键词（按优先级）
+            requirements: 分析得到的核心需求
+            budget: 搜索查询总配额
+
+        Returns:
+            (复用的预搜索查询, 仍需搜索的关键词)，两者合计不超过 budget
+        """
+        context = " ".join(keywords + requirements).lower()
+        kept = [
+            q.query for q in self.queries
+            if any(topic.lower() in context for topic in q.topics)
+        ][:budget]
+
+        kept_lower = {q.lower() for q in kept}
+        remaining = [k for k in keywords if k.strip().lower() not in kept_lower]
+        return kept, remaining[:max(0, budget - len(kept))]
+
+    def collect(self, queries: List[str], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        """
+        取回指定预搜索查询的结果（按给定顺序合并），其余查询全部取消
+
+        Args:
+            queries: 要复用的查询
+            timeout: 单个查询从预搜索开始算起的超时（秒，0/None 表示不限）
+        """
+        self._cancel_except(queries)
+        results: List[Dict[str, Any]] = []
+        try:
+            for query in queries:
+                remaining = None
+                if timeout:
+                    remaining = max(0.0, timeout - (time.monotonic() - self.started))
+                try:
+                    results.extend(self._futures[query].result(timeout=remaining))
+                except FutureTimeoutError:
+                    print(f"Speculative search timed out for query '{query}'")
+        finally:
+            self.cancel()
+        return results
+
+    async def acollect(self, queries: List[str], timeout: Optional[float]) -> List[Dict[str, Any]]:
+        """collect 的 asyncio 版本"""
+        self._cancel_except(queries)
+        results: List[Dict[str, Any]] = []
+        try:
+            for query in queries:
+                remaining = None
+                if timeout:
+                    remaining = max(0.0, timeout - (time.monotonic() - self.started))
+                try:
+                    results.extend(
+                        await asyncio.wait_for(asyncio.wrap_future(self._futures[query]), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    print(f"Speculative search timed out for query '{query}'")
+        finally:
+            self.cancel()
+        return results
+
+    def _cancel_except(self, queries: List[str]) -> None:
+        keep = set(queries)
+        for query, future in self._futures.items():
+            if query not in keep:
+                future.cancel()
+
+    def cancel(self) -> None:
+        """取消尚未开始的查询；已在进行中的查询结果会被丢弃"""
+        for future in self._futures.values():
+            future.cancel()
+
+
+# 进行中的预搜索（状态里只保存 speculation_id，Future 不进入图状态）
+_speculations: Dict[str, SpeculativeSearch] = {}
+_speculations_lock = threading.Lock()
+
+
+def speculation_enabled() -> bool:
+    """是否启用预搜索（SPECULATIVE_SEARCH，默认开启）"""
+    return os.getenv("SPECULATIVE_SEARCH", "true").lower() in ("1", "true", "yes")
+
+
+def start_speculation(
+    form_data: Dict[str, Any],
+    search_tool: TechSearchTool,
+    max_queries: Optional[int] = None,
+) -> Tuple[str, List[str]]:
+    """
+    根据表单启动预搜索
+
+    Args:
+        form_data: 表单数据
+        search_tool: 搜索工具
+        max_queries: 最多预搜索的查询数（默认 SPECULATIVE_MAX_QUERIES，缺省 4）
+
+    Returns:
+        (speculation_id, 已提交的查询)；没有可推断的查询时 id 为空字符串
+    """
+    if max_queries is None:
+        max_queries = int(os.getenv("SPECULATIVE_MAX_QUERIES", 4))
+    queries = derive_speculative_queries(form_data, limit=max_queries)
+    if not queries:
+        return "", []
+
+    speculation_id = uuid.uuid4().hex[:12]
+    with _speculations_lock:
+        _speculations[speculation_id] = SpeculativeSearch(search_tool, queries)
+    return speculation_id, [q.query for q in queries]
+
+
+def take_speculation(speculation_id: Optional[str]) -> Optional[SpeculativeSearch]:
+    """取出（并注销）一次预搜索，供搜索节点对账"""
+    if not speculation_id:
+        return None
+    with _speculations_lock:
+        return _speculations.pop(speculation_id, None)
+
+
+def cancel_speculation(speculation_id: Optional[str]) -> None:
+    """取消并丢弃一次预搜索（如分析判定无需搜索）"""
+    speculation = take_speculation(speculation_id)
+    if speculation is not None:
+        speculation.cancel()
@@ -21,15 +21,26 @@ class TechStackState(TypedDict):
     extracted_requirements: List[str]  # 提取的核心技术需求
     tech_constraints: List[str]  # 技术约束条件
     needs_search: bool  # 是否需要进行在线搜索
+    search_keywords: List[str]  # 搜索关键词（合并分析模式下由分析节点一并给出）
+    speculation_id: str  # 进行中的预搜索（与分析并行，由搜索节点对账）
     
     # ===== 搜索结果 =====
     search_results: Annotated[List[Dict[str, Any]], operator.add]  # 搜索引擎返回的结果
     
     # ===== 文档生成 =====
-    final_document: str  # 最终生成的完整 Markdown 文档
+    document_name: str  # 输出文件名（相对输出目录；为空时由表单收集节点按项目类型与时间生成，批量运行时按表单 id 命名）
+    document_path: str  # 生成中的 Markdown 文档文件（流式写入，保存节点落定文件名）
+    generation_fallback: bool  # 生成失败，文档为降级文档（校验节点不再调用 LLM 修复）
+    repaired_sections: List[str]  # 未通过结构校验、经修复调用重写的章节编号
+    
+    # ===== 编辑后重新生成（edit 流程） =====
+    base_form_data: Dict[str, Any]  # 上一版本的表单数据（与 form_data 对比得出变更）
+    base_document: str  # 上一版本的文档路径
+    revised_sections: List[str]  # 因表单变更重新生成的章节编号
     
     # ===== 控制流程 =====
     current_step: str  # 当前执行的步骤
+    interactive: bool  # False 时跳过所有交互式确认（回放、批量等非交互运行）
     
     # ===== 消息和历史 =====
     messages: Annotated[List[str], operator.add]  # 对话历史和日志
@@ -1,13 +1,18 @@
 """
 表单模块 - 技术选型 Agent 结构化输入
 """
-from src.forms.schema import FIELD_DEFINITIONS, GROUP_ORDER, GROUP_LABELS
+from src.forms.schema import FIELD_DEFINITIONS, FIELD_DEPENDENCIES, GROUP_ORDER, GROUP_LABELS
 from src.forms.collector import collect_form, form_data_to_project_info
+from src.forms.loader import FormRecord, load_form_records, validate_form_data
 
 __all__ = [
     "FIELD_DEFINITIONS",
+    "FIELD_DEPENDENCIES",
     "GROUP_ORDER",
     "GROUP_LABELS",
     "collect_form",
     "form_data_to_project_info",
+    "FormRecord",
+    "load_form_records",
+    "validate_form_data",
 ]
@@ -0,0 +1,80 @@
+"""
+表单变更对比 - 供"编辑后重新生成"流程确定需要重跑的分析项与文档章节
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple
+
+from src.forms.schema import FIELD_DEFINITIONS, FIELD_DEPENDENCIES
+from src.tools.sections import iter_headings, section_key
+
+
+@dataclass
+class FieldChange:
+    """一个表单字段的变更"""
+
+    field: str
+    label: str
+    old: Any
+    new: Any
+
+    def describe(self, max_chars: int = 80) -> str:
+        """一行描述，如 "禁忌与不接受项（forbidden_items）：「无」→「包体积大」" """
+        def short(value: Any) -> str:
+            text = " ".join(str(value).split()) if value not in (None, "") else "空"
+            return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+        return f"{self.label}（{self.field}）：「{short(self.old)}」→「{short(self.new)}」"
+
+
+def _normalized(value: Any) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def diff_form_data(old: Dict[str, Any], new: Dict[str, Any]) -> List[FieldChange]:
+    """
+    对比两份表单（忽略首尾与连续空白的差异）
+
+    Returns:
+        按 FIELD_DEFINITIONS 顺序排列的变更
+    """
+    changes = []
+    for field_id, defn in FIELD_DEFINITIONS.items():
+        if _normalized(old.get(field_id)) != _normalized(new.get(field_id)):
+            label = defn.get("message", field_id).split("（")[0]
+            changes.append(FieldChange(field_id, label, old.get(field_id), new.get(field_id)))
+    return changes
+
+
+def affected_analysis_items(changes: List[FieldChange]) -> List[str]:
+    """受变更影响、需要重新分析的分析结果字段"""
+    items: List[str] = []
+    for change in changes:
+        for item in FIELD_DEPENDENCIES.get(change.field, {}).get("analysis", []):
+            if item not in items:
+                items.append(item)
+    return items
+
+
+def affected_sections(changes: List[FieldChange], template: str) -> List[Tuple[str, str, int]]:
+    """
+    受变更影响、需要修订的模版章节
+
+    已包含上级章节时不再单独列出其子章节。
+
+    Args:
+        changes: 表单变更
+        template: 方案模版（决定章节标题、层级与顺序）
+
+    Returns:
+        (章节编号, 模版标题, 标题层级)，按模版顺序
+    """
+    keys = set()
+    for change in changes:
+        keys.update(FIELD_DEPENDENCIES.get(change.field, {}).get("sections", []))
+
+    sections = []
+    for heading in iter_headings(template):
+        key = section_key(heading.title)
+        if key in keys and not any(key.startswith(other + ".") for other in keys):
+            sections.append((key, heading.title, heading.level))
+    return sections
@@ -0,0 +1,156 @@
+"""
+表单文件加载与校验 - 供批量（非交互）运行使用
+
+支持两种输入：
+- JSONL 文件：每行一条记录
+- 目录：其中每个 *.json 文件一条记录，*.jsonl 文件每行一条记录
+
+记录可以直接是 form_data，也可以是 {"id": ..., "form_data": {...}}。
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from src.forms.schema import FIELD_DEFINITIONS
+
+
+@dataclass
+class FormRecord:
+    """一条待处理的表单记录"""
+
+    id: str
+    form_data: Dict[str, Any]
+    source: str  # 文件名（JSONL 附带行号）
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+def validate_form_data(raw: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    按 FIELD_DEFINITIONS 校验并规范化一份表单
+
+    - 未知字段、类型不符、不在可选项中的取值记为错误
+    - 缺失字段按定义补默认值（无默认值时为空字符串）
+    - 业务核心功能与关键特性不能同时为空
+
+    Args:
+        raw: 原始表单数据
+
+    Returns:
+        (规范化后的 form_data, 错误列表)
+    """
+    if not isinstance(raw, dict):
+        return {}, ["表单必须是 JSON 对象"]
+
+    errors = [f"未知字段: {name}" for name in raw if name not in FIELD_DEFINITIONS]
+    form_data: Dict[str, Any] = {}
+
+    for field_id, defn in FIELD_DEFINITIONS.items():
+        value = raw.get(field_id)
+        field_type = defn.get("type", "text")
+        label = defn.get("message", field_id).split("（")[0]
+
+        if value is None or value == "":
+            form_data[field_id] = defn.get("default", "")
+            continue
+
+        if field_type == "list":
+            choices = defn.get("choices", [])
+            if value not in choices:
+                errors.append(f"{label}（{field_id}）取值 {value!r} 不在可选项中: {' / '.join(choices)}")
+            form_data[field_id] = value
+        elif field_type == "number":
+            try:
+                number = int(value)
+            except (TypeError, ValueError):
+                errors.append(f"{label}（{field_id}）必须是整数: {value!r}")
+                continue
+            if number < 1:
+                errors.append(f"{label}（{field_id}）必须大于 0: {number}")
+            form_data[field_id] = number
+        else:
+            if field_id == "package_json" and isinstance(value, dict):
+                # 允许直接内嵌 package.json 对象
+                value = json.dumps(value, ensure_ascii=False, indent=2)
+            if not isinstance(value, str):
+                errors.append(f"{label}（{field_id}）必须是字符串")
+                continue
+            form_data[field_id] = value.strip()
+
+    if not form_data.get("core_features") and not form_data.get("key_features"):
+        errors.append("业务核心功能（core_features）与关键特性（key_features）不能同时为空")
+    return form_data, errors
+
+
+def _record(raw: Any, default_id: str, source: str) -> FormRecord:
+    if isinstance(raw, dict) and isinstance(raw.get("form_data"), dict):
+        record_id = str(raw.get("id") or default_id)
+        raw = raw["form_data"]
+    else:
+        record_id = default_id
+    form_data, errors = validate_form_data(raw)
+    return FormRecord(id=record_id, form_data=form_data, source=source, errors=errors)
+
+
+def _load_jsonl(path: Path) -> List[FormRecord]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            source = f"{path.name}:{line_no}"
+            default_id = f"{path.stem}-{line_no}"
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                records.append(FormRecord(default_id, {}, source, [f"JSON 解析失败: {e}"]))
+                continue
+            records.append(_record(raw, default_id, source))
+    return records
+
+
+def load_form_records(path: str) -> List[FormRecord]:
+    """
+    从 JSONL 文件或目录加载表单记录（无效记录附带错误，不会中断加载）
+
+    Args:
+        path: JSONL 文件，或包含 *.json / *.jsonl 文件的目录
+
+    Returns:
+        表单记录（目录按文件名排序）
+
+    Raises:
+        FileNotFoundError: 路径不存在
+    """
+    input_path = Path(path)
+    if not input_path.exists():
+        raise FileNotFoundError(f"表单输入不存在: {path}")
+
+    if input_path.is_file():
+        records = _load_jsonl(input_path)
+    else:
+        records = []
+        for file in sorted(input_path.iterdir()):
+            if file.suffix == ".jsonl":
+                records.extend(_load_jsonl(file))
+            elif file.suffix == ".json":
+                try:
+                    with open(file, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except json.JSONDecodeError as e:
+                    records.append(FormRecord(file.stem, {}, file.name, [f"JSON 解析失败: {e}"]))
+                    continue
+                records.append(_record(raw, file.stem, file.name))
+
+    # 记录 id 用于输出文件名与汇总，重复时追加序号
+    seen: Dict[str, int] = {}
+    for record in records:
+        count = seen.get(record.id, 0)
+        seen[record.id] = count + 1
+        if count:
+            record.id = f"{record.id}-{count + 1}"
+    return records
@@ -63,3 +63,45 @@ GROUP_LABELS = {
     "business": "业务与需求",
     "constraints": "开发偏好与约束",
 }
+
+# 字段变更的影响范围（edit 流程据此只重跑受影响的分析项与文档章节）
+# - analysis: 需要更新的分析结果字段
+# - sections: 需要修订的模版章节编号
+FIELD_DEPENDENCIES = {
+    "project_type": {
+        "analysis": ["extracted_requirements", "tech_constraints"],
+        "sections": ["1", "3.1", "3.2", "3.5", "3.6", "5.1", "5.2", "6.1", "7.1"],
+    },
+    "project_stage": {
+        "analysis": ["tech_constraints"],
+        "sections": ["1.1", "3.1", "3.5", "3.7", "7.1"],
+    },
+    "frontend_count": {
+        "analysis": ["tech_constraints"],
+        "sections": ["2", "3.1", "7.1"],
+    },
+    "existing_stack": {
+        "analysis": ["tech_constraints"],
+        "sections": ["3.1", "3.2", "3.7"],
+    },
+    "package_json": {
+        "analysis": ["tech_constraints"],
+        "sections": ["3.1", "3.2", "3.7"],
+    },
+    "core_features": {
+        "analysis": ["extracted_requirements"],
+        "sections": ["1", "3.2", "3.4", "6.1"],
+    },
+    "key_features": {
+        "analysis": ["extracted_requirements"],
+        "sections": ["1.2", "3.1", "3.6", "5.1", "6.1"],
+    },
+    "dev_preference": {
+        "analysis": ["tech_constraints"],
+        "sections": ["3.1", "3.2"],
+    },
+    "forbidden_items": {
+        "analysis": ["tech_constraints"],
+        "sections": ["3.1", "3.2", "5.2"],
+    },
+}
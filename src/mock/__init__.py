@@ -0,0 +1 @@
+"""Offline stand-ins for the LLM API and search backend (benchmarks and load tests)"""
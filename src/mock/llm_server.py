@@ -0,0 +1,420 @@
+"""
+Offline OpenAI-compatible chat-completions server
+
+Speaks enough of the OpenAI protocol (including SSE streaming and usage
+reporting) for ChatOpenAI / DeepseekClient to run the whole workflow
+without network access or API credits.
+
+Usage:
+    python -m src.mock.llm_server --port 8765 --latency 0.5 --tps 60 --error-rate 0.1
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765 DEEPSEEK_API_KEY=mock SEARCH_BACKEND=fake python cli.py
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any
+
+from src.prompts.generator import TECH_SOLUTION_TEMPLATE
+from src.tools.sections import extract_section
+from src.utils.tokens import estimate_tokens
+
+
+@dataclass
+class MockLLMConfig:
+    """Behaviour of the mock server."""
+
+    latency: float = 0.3  # seconds before the first token / full response
+    tokens_per_second: float = 80.0  # streaming decode speed (0 = instant)
+    error_rate: float = 0.0  # probability of an HTTP 500
+    rate_limit_rate: float = 0.0  # probability of an HTTP 429 with Retry-After
+    retry_after: float = 1.0  # Retry-After seconds sent with 429s
+    drop_rate: float = 0.0  # probability that a stream is cut off midway
+    seed: Optional[int] = None
+
+
+def _analysis_response() -> Dict[str, Any]:
+    return {
+        "extracted_requirements": [
+            "首屏加载性能（LCP < 2.5s）",
+            "长列表虚拟滚动",
+            "SEO 友好的服务端渲染",
+            "TypeScript 全量类型约束",
+            "组件复用与多人协作规范",
+        ],
+        "tech_constraints": [
+            "团队以 React 经验为主",
+            "包体积敏感",
+            "需兼容主流移动端浏览器",
+        ],
+        "needs_search": True,
+        "search_reason": "需要对比虚拟滚动与 SSR 框架的最新方案",
+    }
+
+
+def _keywords_response() -> Dict[str, Any]:
+    return {
+        "search_keywords": [
+            "React virtual scroll library comparison",
+            "TanStack Virtual vs react-window",
+            "React masonry library npm",
+            "Next.js vs Remix 2026",
+            "React vs Vue 2026",
+            "Next.js best practices 2026",
+            "frontend performance optimization",
+            "React production case study",
+        ],
+        "priority_frameworks": ["Next.js", "Remix"],
+    }
+
+
+def _plan_response() -> Dict[str, Any]:
+    return {
+        "solution_name": "Next.js SSR + TanStack Virtual",
+        "recommended_stack": ["框架: Next.js 15 (App Router)", "列表: TanStack Virtual", "样式: Tailwind CSS"],
+        "alternatives": ["Remix + react-window: 数据加载模型更简单，生态略小"],
+        "key_decisions": ["首屏 SSR + 流式渲染", "长列表统一虚拟化", "TypeScript strict"],
+        "risks": ["RSC 学习成本", "虚拟滚动与 SEO 的平衡"],
+    }
+
+
+def _skeleton_response() -> Dict[str, Any]:
+    return {
+        "background": "C 端内容社区首页改版，需要支持长列表与首屏 SEO。",
+        "metrics": ["首屏 LCP < 2.5s", "列表滚动 60fps"],
+        "options": [
+            {
+                "name": "Next.js SSR", "scenario": "H5 + PC Web", "container": "浏览器",
+                "dev_mode": "源码开发", "modules": "App Router 按路由拆分",
+                "pros": "SEO 友好、流式渲染", "cons": "RSC 学习成本", "use_case": "内容型 C 端",
+            },
+            {
+                "name": "Remix", "scenario": "H5 + PC Web", "container": "浏览器",
+                "dev_mode": "源码开发", "modules": "嵌套路由",
+                "pros": "数据加载模型简单", "cons": "生态较小", "use_case": "表单密集型应用",
+            },
+        ],
+        "recommendation": "选择 Next.js SSR，长列表统一使用 TanStack Virtual。",
+        "tech_stack": {"框架": {"name": "Next.js 15", "reason": "SSR 与流式渲染"}},
+        "sections": {"3.2.2": "- 首页信息流\n- 详情页"},
+        "risks": [{"risk": "虚拟滚动影响 SEO", "level": "中", "mitigation": "首屏 SSR 输出前 20 条"}],
+        "test_points": ["长列表滚动性能"],
+        "rollback": ["回滚至上一版本镜像"],
+    }
+
+
+def _repair_response(prompt: str) -> str:
+    match = re.search(r"以「(#+) ([^」]+)」标题开头", prompt)
+    if not match:
+        return "（mock 修复）\n"
+    heading, title = match.group(1), match.group(2)
+    if title.startswith("3.1"):
+        return (
+            f"{heading} {title}\n\n"
+            "| 方案 | 投放场景 | 容器类型 | 开发模式 | 模块方案 |\n"
+            "|------|----------|----------|----------|----------|\n"
+            "| Next.js SSR | H5 + PC Web | 浏览器 | 源码开发 | App Router 按路由拆分 |\n"
+            "| Remix | H5 + PC Web | 浏览器 | 源码开发 | 嵌套路由 |\n\n"
+            "**明确建议**：选择 Next.js SSR（mock 修复）\n"
+        )
+    section = extract_section(TECH_SOLUTION_TEMPLATE, title.split(" ", 1)[0])
+    return section or f"{heading} {title}\n\n（mock 修复）\n"
+
+
+def _continuation_response(prompt: str) -> str:
+    # The mock document is the template, so the rest is whatever follows the tail
+    tail = prompt.split("最后一个字符即中断位置）\n-----\n", 1)[-1].rsplit("\n-----\n\n## 续写要求", 1)[0]
+    position = TECH_SOLUTION_TEMPLATE.rfind(tail) if tail else -1
+    if position < 0:
+        return "\n\n（mock 续写）\n"
+    # Models tend to repeat the last few words before continuing
+    resume_at = max(0, position + len(tail) - 20)
+    return TECH_SOLUTION_TEMPLATE[resume_at:]
+
+
+def build_response_text(messages: List[Dict[str, Any]]) -> str:
+    """
+    Pick a canned completion that matches what the prompt asks for.
+
+    Args:
+        messages: OpenAI-format chat messages
+
+    Returns:
+        Completion text
+    """
+    prompt = messages[-1].get("content", "") if messages else ""
+    if isinstance(prompt, list):
+        prompt = " ".join(part.get("text", "") for part in prompt if isinstance(part, dict))
+
+    if "请只输出更新后的该章节" in prompt:
+        section = extract_section(TECH_SOLUTION_TEMPLATE, "3.1") or "### 3.1 技术调研和选型\n"
+        return section.rstrip() + "\n\n> 已根据在线调研结果更新（mock）\n"
+    if "请只输出按表单变更修订后的该章节" in prompt:
+        section = prompt.split("## 当前章节内容\n", 1)[-1].split("\n\n## 修订要求", 1)[0]
+        return section.rstrip() + "\n\n> 已按表单变更修订（mock）\n"
+    if "请从中断处继续输出剩余内容" in prompt:
+        return _continuation_response(prompt)
+    if "请只输出修复后的该章节" in prompt:
+        return _repair_response(prompt)
+    if "\n<<<\n" in prompt and "\n>>>" in prompt:
+        # Chapter of the sectioned mode: echo the chapter template
+        return prompt.split("\n<<<\n", 1)[1].split("\n>>>", 1)[0] + "\n"
+    if '"solution_name"' in prompt:
+        payload = _plan_response()
+    elif '"test_points"' in prompt:
+        payload = _skeleton_response()
+    elif '"search_keywords"' in prompt and '"extracted_requirements"' in prompt:
+        payload = {**_analysis_response(), "search_keywords": _keywords_response()["search_keywords"]}
+    elif '"search_keywords"' in prompt:
+        payload = _keywords_response()
+    elif '"needs_search"' in prompt:
+        payload = _analysis_response()
+    else:
+        return TECH_SOLUTION_TEMPLATE or "# 前端技术方案\n\n（mock 文档）\n"
+    return "```json\n" + json.dumps(payload, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _split_tokens(text: str) -> List[str]:
+    """Split text into small token-like pieces (~2 CJK or ~4 Latin characters) for streaming."""
+    pieces, current = [], ""
+    for char in text:
+        current += char
+        if char == "\n" or len(current) >= (4 if char.isascii() else 2):
+            pieces.append(current)
+            current = ""
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Request handler for /chat/completions and /v1/chat/completions."""
+
+    config: MockLLMConfig = MockLLMConfig()
+    rng: random.Random = random.Random()
+    stats: Dict[str, int] = {}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _count(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            with self.stats_lock:
+                self._send_json(200, dict(self.stats))
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self._count("requests")
+
+        config = self.config
+        roll = self.rng.random()
+        if roll < config.rate_limit_rate:
+            self._count("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}},
+                {"Retry-After": str(config.retry_after)},
+            )
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._count("errors")
+            self._send_json(500, {"error": {"message": "Injected server error (mock)", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        text = build_response_text(messages)
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": estimate_tokens(text),
+            "total_tokens": prompt_tokens + estimate_tokens(text),
+        }
+        model = request.get("model", "mock")
+
+        time.sleep(config.latency)
+
+        if request.get("stream"):
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self._stream(text, model, usage if include_usage else None)
+            return
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, text: str, model: str, usage: Optional[Dict[str, int]]) -> None:
+        """Send the completion as server-sent events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        pieces = _split_tokens(text)
+        drop_at = (
+            self.rng.randint(1, max(1, len(pieces) - 1))
+            if self.rng.random() < self.config.drop_rate else None
+        )
+        delay = 1.0 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+
+        def write_chunk(data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def event(payload: Dict[str, Any]) -> None:
+            write_chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        try:
+            event(chunk({"role": "assistant", "content": ""}))
+            for i, piece in enumerate(pieces):
+                if drop_at is not None and i == drop_at:
+                    self._count("dropped_streams")
+                    # Close without the terminating chunk so the client sees a broken stream
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                if delay:
+                    time.sleep(delay)
+                event(chunk({"content": piece}))
+            event(chunk({}, "stop"))
+            if usage is not None:
+                event({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                })
+            write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    config: Optional[MockLLMConfig] = None,
+) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a mock server.
+
+    Args:
+        host: Bind address
+        port: Bind port (0 picks a free port)
+        config: Server behaviour
+
+    Returns:
+        Server instance; its base URL is http://host:server.server_port
+    """
+    config = config or MockLLMConfig()
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {
+        "config": config,
+        "rng": random.Random(config.seed),
+        "stats": {},
+        "stats_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_background_server(
+    config: Optional[MockLLMConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> ThreadingHTTPServer:
+    """
+    Start a mock server in a daemon thread (handy for benchmarks).
+
+    Returns:
+        Running server; call server.shutdown() to stop it
+    """
+    server = create_server(host, port, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before first token")
+    parser.add_argument("--tps", type=float, default=80.0, help="streamed tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="probability of HTTP 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of cutting a stream midway")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, MockLLMConfig(
+        latency=args.latency,
+        tokens_per_second=args.tps,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    ))
+    print(f"Mock LLM server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
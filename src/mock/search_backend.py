@@ -0,0 +1,74 @@
+"""
+Fake search backend for TechSearchTool
+"""
+import hashlib
+import random
+import time
+from typing import List, Dict, Any
+
+
+_FAKE_SOURCES = [
+    ("github.com", "GitHub - {query}: source code, issues and releases"),
+    ("www.npmjs.com", "{query} - npm package overview and weekly downloads"),
+    ("dev.to", "Comparing options for {query} in production"),
+    ("medium.com", "What we learned about {query} after two years"),
+    ("stackoverflow.com", "Best approach for {query}? - Stack Overflow"),
+    ("developer.mozilla.org", "{query} - Web APIs and performance guide | MDN"),
+]
+
+
+class FakeSearchBackend:
+    """
+    Search backend that returns deterministic canned results after a
+    configurable latency, with optional error injection.
+    
+    Drop-in replacement for DuckDuckGoBackend:
+        TechSearchTool(backend=FakeSearchBackend(latency=0.3))
+    """
+    
+    def __init__(
+        self,
+        latency: float = 0.3,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency: Mean seconds per query
+            jitter: Uniform +/- jitter added to the latency
+            error_rate: Probability that a query raises an error
+            seed: Seed for latency jitter and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+    
+    def __call__(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        timeout: float,
+    ) -> List[Dict[str, Any]]:
+        delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        if self._random.random() < self.error_rate:
+            raise ConnectionError(f"Injected search failure for '{query}'")
+        
+        # Deterministic per query, so repeated runs see identical results
+        offset = int(hashlib.md5(query.encode("utf-8")).hexdigest(), 16)
+        results = []
+        for i in range(max_results):
+            domain, title = _FAKE_SOURCES[(offset + i) % len(_FAKE_SOURCES)]
+            slug = "-".join(query.lower().split())
+            results.append({
+                "title": title.format(query=query),
+                "body": (
+                    f"Fake result {i} for {query}. Covers bundle size, rendering "
+                    f"performance, ecosystem maturity and migration cost."
+                ),
+                "href": f"https://{domain}/{slug}/{i}",
+            })
+        return results
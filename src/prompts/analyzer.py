@@ -2,31 +2,22 @@
 Prompt templates for requirement analysis - 表单式适配
 输入为结构化 form_data，注入选型指南
 """
-from pathlib import Path
+from typing import Optional
 
-_ANALYZER_DIR = Path(__file__).parent
-_SELECTION_GUIDE_PATH = _ANALYZER_DIR / "selection_guide.md"
-
-
-def _load_selection_guide() -> str:
-    """加载选型指南内容"""
-    if _SELECTION_GUIDE_PATH.exists():
-        return _SELECTION_GUIDE_PATH.read_text(encoding="utf-8")
-    return ""
-
-
-SELECTION_GUIDE = _load_selection_guide()
+from src.prompts.guide_index import GUIDE_SLOT
+from src.utils.tokens import truncate_to_tokens
 
+# 指南片段按表单检索后注入（见 guide_index.with_selection_guide）
 ANALYSIS_SYSTEM_PROMPT = f"""你是一位资深的前端技术架构师，拥有超过10年的大型项目开发经验。
 你擅长根据项目需求分析最合适的技术栈，并能够平衡技术先进性、团队能力、项目时间线等多方面因素。
 你的分析客观、全面，能够为技术选型提供有价值的洞见。
 
 ## 选型参考（必读）
 
-以下《前端技术栈选型指南》作为你分析的重要参考，请结合用户表单输入与指南给出最佳分析：
+以下节选自《前端技术栈选型指南》的相关章节作为你分析的重要参考，请结合用户表单输入与指南给出最佳分析：
 
 ---
-{SELECTION_GUIDE}
+{GUIDE_SLOT}
 ---
 
 ## 隐式默认（用户未填时按此补全）
@@ -97,24 +88,113 @@ ANALYSIS_PROMPT_TEMPLATE = """基于用户通过表单提供的项目信息，
 现在请开始分析。"""
 
 
-def get_analysis_prompt(project_info: dict) -> str:
+FUSED_ANALYSIS_PROMPT_TEMPLATE = """基于用户通过表单提供的项目信息，请一次性完成技术需求分析，并在需要时直接给出技术调研所需的搜索关键词。
+
+## 项目信息（结构化输入）
+
+- **项目类型**: {project_type}
+- **项目阶段**: {project_stage}
+- **本次前端人数**: {frontend_count}
+- **现有技术栈**: {existing_stack}
+- **package.json**: {package_json}
+- **业务核心功能**: {core_features}
+- **关键特性**: {key_features}
+- **开发偏好**: {dev_preference}
+- **禁忌与不接受项**: {forbidden_items}
+
+## 请完成以下任务
+
+### 1. 提取核心技术需求
+请列出5-8个关键技术需求点（性能、用户体验、开发效率、可维护性等）。
+
+### 2. 识别技术约束
+请列出3-5个主要的技术约束条件（团队熟悉度、学习曲线、生态成熟度、浏览器兼容性等）。
+
+### 3. 判断是否需要在线搜索
+满足以下任一条件时需要在线技术调研：
+- 项目涉及较新的技术栈或框架（近2年内发布）
+- 需要了解最新的技术趋势和最佳实践
+- 需要对比多个技术方案的实际应用案例
+- 用户明确提到需要"最新"、"流行"的技术
+
+### 4. 生成搜索关键词（仅当 needs_search 为 true 时，否则返回空数组）
+生成 8-12 个搜索关键词：
+- **优先**（至少 4 个，排在最前）：针对核心功能的具体库名 / npm 包名，如 "React masonry library npm"、"React virtual scroll library comparison"
+- 其余：框架对比（"React vs Vue 2026"）、最佳实践（"Next.js best practices 2026"）、性能优化、实际案例
+
+### 输出格式
+请严格按照以下JSON格式输出（不要包含任何其他文字）：
+
+```json
+{{
+  "extracted_requirements": [
+    "需求1描述",
+    "需求2描述",
+    "需求3描述"
+  ],
+  "tech_constraints": [
+    "约束1描述",
+    "约束2描述",
+    "约束3描述"
+  ],
+  "needs_search": true,
+  "search_reason": "需要搜索的原因说明",
+  "search_keywords": [
+    "关键词1",
+    "关键词2",
+    "关键词3"
+  ]
+}}
+```
+
+现在请开始分析。"""
+
+
+# package.json 在提示词中的默认 token 上限（实际上限由预算分配决定，见 budget.py）
+PACKAGE_JSON_TOKENS = 400
+
+
+def _prompt_fields(project_info: dict, package_json_tokens: Optional[int] = None) -> dict:
+    """表单字段到提示词占位符的映射（含默认值）"""
+    if package_json_tokens is None:
+        package_json_tokens = PACKAGE_JSON_TOKENS
+    package_json = truncate_to_tokens(project_info.get("package_json", "") or "", package_json_tokens)
+    return {
+        "project_type": project_info.get("project_type", "未指定"),
+        "project_stage": project_info.get("project_stage", "全新开发"),
+        "frontend_count": project_info.get("frontend_count", 1),
+        "existing_stack": project_info.get("existing_stack", "无") or "无",
+        "package_json": package_json or "未提供",
+        "core_features": project_info.get("core_features", "未指定") or "未指定",
+        "key_features": project_info.get("key_features", "未指定") or "未指定",
+        "dev_preference": project_info.get("dev_preference", "无偏好") or "无偏好",
+        "forbidden_items": project_info.get("forbidden_items", "无") or "无",
+    }
+
+
+def get_analysis_prompt(project_info: dict, package_json_tokens: Optional[int] = None) -> str:
     """
     生成分析提示词
     
     Args:
         project_info: 来自 form_data 的结构化项目信息
+        package_json_tokens: package.json 的 token 上限（缺省为 PACKAGE_JSON_TOKENS）
+        
+    Returns:
+        格式化后的提示词
+    """
+    return ANALYSIS_PROMPT_TEMPLATE.format(**_prompt_fields(project_info, package_json_tokens))
+
+
+def get_fused_analysis_prompt(project_info: dict, package_json_tokens: Optional[int] = None) -> str:
+    """
+    生成"分析 + 搜索关键词"合并提示词（一次 LLM 调用同时产出两者）
+    
+    Args:
+        project_info: 来自 form_data 的结构化项目信息
+        package_json_tokens: package.json 的 token 上限（缺省为 PACKAGE_JSON_TOKENS）
         
     Returns:
         格式化后的提示词
     """
-    return ANALYSIS_PROMPT_TEMPLATE.format(
-        project_type=project_info.get("project_type", "未指定"),
-        project_stage=project_info.get("project_stage", "全新开发"),
-        frontend_count=project_info.get("frontend_count", 1),
-        existing_stack=project_info.get("existing_stack", "无") or "无",
-        package_json=(project_info.get("package_json", "") or "未提供")[:500],
-        core_features=project_info.get("core_features", "未指定") or "未指定",
-        key_features=project_info.get("key_features", "未指定") or "未指定",
-        dev_preference=project_info.get("dev_preference", "无偏好") or "无偏好",
-        forbidden_items=project_info.get("forbidden_items", "无") or "无",
-    )
+    return FUSED_ANALYSIS_PROMPT_TEMPLATE.format(**_prompt_fields(project_info, package_json_tokens))
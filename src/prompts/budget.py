@@ -0,0 +1,121 @@
+"""
+提示词 token 预算 - 按优先级在各可裁剪部分之间分配单次调用的输入预算
+
+一次调用的输入目标为模型上下文窗口减去输出上限（max_tokens），可用
+PROMPT_TOKEN_BUDGET 进一步收紧以换取更低的延迟与成本。提示词中不可裁剪的
+部分（指令、表单字段、分析结果）先行扣除，其余预算按 PART_PRIORITY 顺序
+分给选型指南、方案模版、表单附件（package.json）与调研摘要。
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# 可裁剪部分的优先级（靠前的先满足）
+PART_PRIORITY = ("form", "template", "evidence", "guide")
+
+# 各部分在预算紧张时尽量保留的最低 token 数
+PART_MINIMUM = {
+    "form": 150,
+    "template": 400,
+    "evidence": 150,
+    "guide": 150,
+}
+
+PART_LABELS = {
+    "form": "表单附件",
+    "template": "方案模版",
+    "evidence": "调研摘要",
+    "guide": "选型指南",
+}
+
+
+def prompt_token_target(max_tokens: Optional[int] = None) -> int:
+    """
+    单次调用的输入 token 目标
+
+    Args:
+        max_tokens: 输出上限，缺省读取 DEEPSEEK_MAX_TOKENS
+
+    Returns:
+        LLM_CONTEXT_WINDOW - max_tokens，设置了 PROMPT_TOKEN_BUDGET（> 0）时取两者较小值
+    """
+    if max_tokens is None:
+        max_tokens = int(os.getenv("DEEPSEEK_MAX_TOKENS", 4000))
+    target = int(os.getenv("LLM_CONTEXT_WINDOW", 65536)) - max_tokens
+    cap = int(os.getenv("PROMPT_TOKEN_BUDGET", 0))
+    if cap > 0:
+        target = min(target, cap)
+    return max(target, 0)
+
+
+@dataclass
+class PromptBudget:
+    """一次调用的预算分配结果"""
+
+    call: str  # 调用名，如 "analyze"、"generate"
+    target: int  # 输入 token 目标
+    fixed: int  # 不可裁剪部分的 token 数
+    desired: Dict[str, int] = field(default_factory=dict)  # 各部分完整放入所需
+    parts: Dict[str, int] = field(default_factory=dict)  # 各部分分得的预算
+
+    def get(self, name: str) -> int:
+        """某部分分得的预算（未参与分配的部分为 0）"""
+        return self.parts.get(name, 0)
+
+    @property
+    def total(self) -> int:
+        """分配后的输入 token 上限"""
+        return self.fixed + sum(self.parts.values())
+
+    def describe(self) -> str:
+        """一行描述，如 "generate 3120/61536 token（固定 820，方案模版 2300/2300，…）" """
+        items = [f"固定 {self.fixed}"] + [
+            f"{PART_LABELS.get(name, name)} {self.parts.get(name, 0)}/{self.desired[name]}"
+            for name in PART_PRIORITY
+            if name in self.desired
+        ]
+        return f"{self.call} {self.total}/{self.target} token（{'，'.join(items)}）"
+
+    def to_dict(self) -> Dict[str, int]:
+        """用于 trace 记录的分配明细"""
+        return {"target": self.target, "fixed": self.fixed, **self.parts}
+
+
+def allocate_prompt_budget(
+    call: str,
+    fixed: int,
+    desired: Dict[str, int],
+    target: Optional[int] = None,
+) -> PromptBudget:
+    """
+    在各可裁剪部分之间分配预算
+
+    分两轮按 PART_PRIORITY 顺序分配：先给每部分最多 PART_MINIMUM 的保底，
+    再依次补足到完整大小。预算不足以放下全部保底时，低优先级部分先被压缩。
+
+    Args:
+        call: 调用名（仅用于日志）
+        fixed: 不可裁剪部分的 token 数
+        desired: 各部分完整放入所需的 token 数（不在 PART_PRIORITY 中的部分排在最后）
+        target: 输入 token 目标，缺省为 prompt_token_target()
+
+    Returns:
+        分配结果
+    """
+    if target is None:
+        target = prompt_token_target()
+    order = [name for name in PART_PRIORITY if name in desired]
+    order += [name for name in desired if name not in order]
+
+    remaining = max(target - fixed, 0)
+    parts = {name: 0 for name in order}
+    for name in order:
+        share = min(desired[name], PART_MINIMUM.get(name, 0), remaining)
+        parts[name] = share
+        remaining -= share
+    for name in order:
+        share = min(desired[name] - parts[name], remaining)
+        parts[name] += share
+        remaining -= share
+
+    return PromptBudget(call=call, target=target, fixed=fixed, desired=dict(desired), parts=parts)
@@ -3,9 +3,15 @@ Prompt templates for document generation - 表单式适配
 输出采用《前端技术方案模版》结构，注入选型指南和模版
 """
 from pathlib import Path
+from typing import List, Optional
+
+from src.prompts.guide_index import GUIDE_SLOT
+from src.tools.document import STATIC_SECTIONS
+from src.tools.ranking import select_within_budget
+from src.tools.sections import iter_headings, section_key
+from src.utils.tokens import count_tokens, truncate_to_tokens
 
 _PROMPTS_DIR = Path(__file__).parent
-_SELECTION_GUIDE_PATH = _PROMPTS_DIR / "selection_guide.md"
 _TECH_TEMPLATE_PATH = _PROMPTS_DIR / "tech_solution_template.md"
 
 
@@ -16,19 +22,30 @@ def _load_file(path: Path) -> str:
     return ""
 
 
-SELECTION_GUIDE = _load_file(_SELECTION_GUIDE_PATH)
 TECH_SOLUTION_TEMPLATE = _load_file(_TECH_TEMPLATE_PATH)
 
+# 调研摘要中搜索条目部分的 token 预算
+SEARCH_SUMMARY_TOKENS = 600
+
+# 调研摘要中每条搜索结果正文的 token 上限
+SEARCH_SNIPPET_TOKENS = 60
+
+# 系统提示词中方案模版的占位符，调用前用 with_solution_template() 按预算填入
+TEMPLATE_SLOT = "<<solution_template>>"
+
+# 各系统提示词中的 GUIDE_SLOT 在调用前替换为按表单检索出的选型指南片段
+# （见 guide_index.with_selection_guide）
+
 GENERATOR_SYSTEM_PROMPT = f"""你是一位专业的技术文档撰写专家，擅长编写清晰、全面、结构化的企业级技术方案文档。
 你的文档能够帮助技术团队和管理层快速理解技术方案，做出明智的决策。
 你的写作风格专业、客观，注重数据支撑和实际案例。
 
 ## 选型参考（必读）
 
-以下《前端技术栈选型指南》作为你选型推荐的重要参考：
+以下节选自《前端技术栈选型指南》的相关章节作为你选型推荐的重要参考：
 
 ---
-{SELECTION_GUIDE[:8000]}
+{GUIDE_SLOT}
 ---
 
 ## 输出模版（必须遵循）
@@ -36,7 +53,7 @@ GENERATOR_SYSTEM_PROMPT = f"""你是一位专业的技术文档撰写专家，
 请按照以下《前端技术方案模版》结构生成文档。**非每项必填**，按方案相关性选择填写；用户未指出、本次未涉及的部分注明「用户未指出但可能需要保留」。
 
 ---
-{TECH_SOLUTION_TEMPLATE[:6000]}
+{TEMPLATE_SLOT}
 ---
 
 ## 核心要求
@@ -83,6 +100,110 @@ DOCUMENT_GENERATION_PROMPT_TEMPLATE = """请基于以下信息，生成一份符
 现在请开始生成文档。"""
 
 
+RESEARCH_REFINEMENT_PROMPT_TEMPLATE = """下面是一份技术方案文档草稿中的「3.1 技术调研和选型」章节。草稿生成时尚未拿到在线调研结果，现在结果已返回，请据此修订该章节。
+
+## 项目背景
+- **项目类型**: {project_type}
+- **业务核心功能**: {core_features}
+- **关键特性**: {key_features}
+- **开发偏好**: {dev_preference}
+- **禁忌与不接受项**: {forbidden_items}
+
+## 技术调研数据
+{search_summary}
+
+## 草稿章节
+{section}
+
+## 修订要求
+1. 保留原有的方案对比结构（2+ 套方案，每套写明：投放场景、容器类型、开发模式、模块方案）
+2. 用调研数据补充或修正具体库名、版本、优缺点与实际案例，不臆造调研数据中没有的事实
+3. 保留章节末尾的明确建议，如调研结果改变了结论请同步修改
+4. 请只输出更新后的该章节，以「### 3.1 技术调研和选型」标题开头，不要输出其他章节或额外说明"""
+
+
+def format_search_summary(
+    search_results: list,
+    max_items: int = 5,
+    token_budget: int = SEARCH_SUMMARY_TOKENS,
+) -> str:
+    """
+    将搜索结果整理为提示词中的调研数据摘要
+    
+    搜索节点已按与需求的相关度与来源权威度排序，这里按该顺序在 token 预算内
+    选取条目（放不下的长条目跳过，让后面较短的条目仍可使用剩余预算）。
+    
+    Args:
+        search_results: 搜索结果列表（已排序）
+        max_items: 摘要中最多保留的条目数
+        token_budget: 条目部分的 token 预算（0 表示不限）
+    """
+    selected = select_within_budget(
+        search_results, search_result_cost, token_budget, max_items
+    )
+    summary = f"找到 {len(search_results)} 条相关技术信息。\n\n**部分关键信息**:\n"
+    for i, result in enumerate(selected, 1):
+        summary += f"{i}. {search_result_line(result)}\n"
+    return summary
+
+
+def search_result_line(result: dict) -> str:
+    """调研摘要中的一条搜索结果（正文截断到 SEARCH_SNIPPET_TOKENS）"""
+    title = result.get("title", "No title")
+    body = truncate_to_tokens(result.get("body", "") or "", SEARCH_SNIPPET_TOKENS)
+    return f"{title}: {body}"
+
+
+def search_result_cost(result: dict) -> int:
+    """一条搜索结果在调研摘要中占用的 token 数"""
+    return count_tokens(search_result_line(result))
+
+
+def with_solution_template(system_prompt: str, token_budget: Optional[int] = None) -> str:
+    """
+    把系统提示词中的 TEMPLATE_SLOT 替换为方案模版
+
+    Args:
+        system_prompt: 含 TEMPLATE_SLOT 的系统提示词
+        token_budget: 模版的 token 上限（缺省为完整模版）
+    """
+    if TEMPLATE_SLOT not in system_prompt:
+        return system_prompt
+    template = TECH_SOLUTION_TEMPLATE
+    if token_budget is not None:
+        template = truncate_to_tokens(template, token_budget)
+    return system_prompt.replace(TEMPLATE_SLOT, template)
+
+
+def get_research_refinement_prompt(
+    section: str,
+    project_info: dict,
+    search_results: list,
+) -> str:
+    """
+    生成「3.1 技术调研和选型」章节精修提示词（随时可交付模式）
+    
+    Args:
+        section: 草稿中的 3.1 章节（含标题）
+        project_info: 来自 form_data 的项目信息
+        search_results: 搜索结果列表
+        
+    Returns:
+        格式化后的提示词
+    """
+    return RESEARCH_REFINEMENT_PROMPT_TEMPLATE.format(
+        project_type=project_info.get("project_type", "未指定"),
+        core_features=project_info.get("core_features", "") or "未指定",
+        key_features=project_info.get("key_features", "") or "未指定",
+        dev_preference=project_info.get("dev_preference", "") or "无偏好",
+        forbidden_items=project_info.get("forbidden_items", "") or "无",
+        search_summary=format_search_summary(
+            search_results, max_items=10, token_budget=2 * SEARCH_SUMMARY_TOKENS
+        ),
+        section=section.strip(),
+    )
+
+
 def get_generation_prompt(
     project_info: dict,
     analysis_result: dict,
@@ -99,6 +220,17 @@ def get_generation_prompt(
     Returns:
         格式化后的提示词
     """
+    return DOCUMENT_GENERATION_PROMPT_TEMPLATE.format(
+        **_generation_fields(project_info, analysis_result, search_results)
+    )
+
+
+def _generation_fields(
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> dict:
+    """文档生成类提示词共用的占位符（项目背景、分析结果、调研摘要）"""
     form_data = project_info.get("form_data", project_info)
     
     requirements_list = analysis_result.get("extracted_requirements", [])
@@ -108,15 +240,11 @@ def get_generation_prompt(
     constraints_str = "\n".join([f"- {c}" for c in constraints_list])
     
     if search_results:
-        search_summary = f"找到 {len(search_results)} 条相关技术信息。\n\n**部分关键信息**:\n"
-        for i, result in enumerate(search_results[:5], 1):
-            title = result.get("title", "No title")
-            body = (result.get("body", "") or "")[:100]
-            search_summary += f"{i}. {title}: {body}...\n"
+        search_summary = format_search_summary(search_results)
     else:
         search_summary = "未进行在线搜索，将基于选型指南和LLM已有知识生成推荐。"
     
-    return DOCUMENT_GENERATION_PROMPT_TEMPLATE.format(
+    return dict(
         project_type=project_info.get("project_type", "未指定"),
         project_stage=project_info.get("project_stage", "全新开发"),
         team_size=str(project_info.get("frontend_count", 1)) + "人",
@@ -129,3 +257,435 @@ def get_generation_prompt(
         constraints=constraints_str if constraints_str else "无明确约束",
         search_summary=search_summary,
     )
+
+
+# ===== 分章节并行生成（GENERATION_MODE=sectioned） =====
+
+SECTIONED_SYSTEM_PROMPT = f"""你是一位专业的技术文档撰写专家，擅长编写清晰、全面、结构化的企业级技术方案文档。
+你正与其他撰写者并行完成同一份《前端技术方案》，每人负责其中一部分章节，各部分最终按模版顺序拼接成完整文档。
+你的写作风格专业、客观，注重数据支撑和实际案例。
+
+## 选型参考（必读）
+
+以下节选自《前端技术栈选型指南》的相关章节作为你选型推荐的重要参考：
+
+---
+{GUIDE_SLOT}
+---
+"""
+
+
+_PROJECT_BACKGROUND = """### 项目背景（来自用户表单）
+- **项目类型**: {project_type}
+- **项目阶段**: {project_stage}
+- **本次前端人数**: {team_size}
+- **现有技术栈**: {existing_stack}
+- **业务核心功能**: {core_features}
+- **关键特性**: {key_features}
+- **开发偏好**: {dev_preference}
+- **禁忌与不接受项**: {forbidden_items}
+
+### 需求分析结果
+**核心技术需求**:
+{requirements}
+
+**技术约束**:
+{constraints}
+
+### 技术调研数据
+{search_summary}"""
+
+
+DOCUMENT_PLAN_PROMPT_TEMPLATE = """请为下面的项目规划一份《前端技术方案》的核心结论。这份规划会同时发给多位撰写者，各自撰写不同章节，因此结论必须明确、前后一致、足够精炼。
+
+## 输入信息
+
+""" + _PROJECT_BACKGROUND + """
+
+## 规划要求
+1. 确定最终推荐方案，并给出 1-2 个对比备选方案
+2. 列出推荐技术栈（类别: 技术，如 "框架: Next.js 15"）
+3. 列出 3-5 条关键技术决策、3-5 条主要风险
+4. 每项一句话，整体不超过 600 字
+
+### 输出格式
+请严格按照以下JSON格式输出（不要包含任何其他文字）：
+
+```json
+{{
+  "solution_name": "推荐方案名称",
+  "recommended_stack": ["类别: 技术"],
+  "alternatives": ["备选方案: 一句话说明"],
+  "key_decisions": ["决策1"],
+  "risks": ["风险1"]
+}}
+```"""
+
+
+CHAPTER_PROMPT_TEMPLATE = """请撰写《前端技术方案》中的以下章节：{chapter_title}。
+其他章节由其他撰写者并行完成，请只撰写本部分。
+
+## 输入信息
+
+""" + _PROJECT_BACKGROUND + """
+
+## 方案规划（全文共享，必须保持一致）
+{plan}
+
+## 本部分模版
+<<<
+{chapter_template}
+>>>
+
+## 撰写要求
+1. 按本部分模版的标题与顺序输出，标题层级与模版一致，以「{first_heading}」开头
+2. 只输出本部分内容，不要输出文档标题、其他章节或额外说明
+3. 技术选型、方案名称、技术栈必须与「方案规划」一致
+4. 非每项必填，按相关性选择；用户未指出、本次未涉及的部分注明「用户未指出但可能需要保留」
+{chapter_requirements}5. 使用 Markdown 格式，本部分约 {target_chars} 字"""
+
+
+def format_plan(plan: dict) -> str:
+    """将方案规划 JSON 渲染为提示词中的要点列表"""
+    lines = [f"- **推荐方案**: {plan.get('solution_name') or '未指定'}"]
+    sections = (
+        ("recommended_stack", "推荐技术栈"),
+        ("alternatives", "对比备选"),
+        ("key_decisions", "关键决策"),
+        ("risks", "主要风险"),
+    )
+    for key, label in sections:
+        items = plan.get(key) or []
+        if items:
+            lines.append(f"- **{label}**:")
+            lines.extend(f"  - {item}" for item in items)
+    return "\n".join(lines)
+
+
+def get_document_plan_prompt(
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> str:
+    """
+    生成方案规划提示词（分章节生成前的共享规划）
+    
+    Args:
+        project_info: 来自 form_data 的项目信息（含 form_data）
+        analysis_result: 分析结果
+        search_results: 搜索结果列表
+    """
+    return DOCUMENT_PLAN_PROMPT_TEMPLATE.format(
+        **_generation_fields(project_info, analysis_result, search_results)
+    )
+
+
+def get_chapter_prompt(
+    chapter_title: str,
+    chapter_template: str,
+    first_heading: str,
+    plan: dict,
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+    target_chars: int,
+) -> str:
+    """
+    生成单个章节（组）的撰写提示词
+    
+    Args:
+        chapter_title: 章节名称（用于说明）
+        chapter_template: 该部分的模版原文
+        first_heading: 输出应以之开头的标题行
+        plan: 共享的方案规划
+        project_info: 来自 form_data 的项目信息（含 form_data）
+        analysis_result: 分析结果
+        search_results: 搜索结果列表
+        target_chars: 建议篇幅（字）
+    """
+    chapter_requirements = ""
+    if "3.1" in chapter_template:
+        chapter_requirements = (
+            "4.1 **3.1 技术调研和选型** 必须包含 2+ 套方案对比，每套写明：投放场景、容器类型、"
+            "开发模式、模块方案，并给出明确建议\n"
+        )
+    return CHAPTER_PROMPT_TEMPLATE.format(
+        chapter_title=chapter_title,
+        chapter_template=chapter_template.strip(),
+        first_heading=first_heading,
+        plan=format_plan(plan),
+        chapter_requirements=chapter_requirements,
+        target_chars=target_chars,
+        **_generation_fields(project_info, analysis_result, search_results),
+    )
+
+
+# ===== 骨架渲染模式：LLM 只输出可变内容的结构化 JSON =====
+
+SKELETON_SYSTEM_PROMPT = f"""你是一位专业的前端架构师，负责为《前端技术方案》提供结构化的核心内容。
+文档的标题、章节结构、变更记录与固定检查项由程序按模版生成，你只需输出各章节的实质内容。
+你的写作风格专业、客观、精炼，注重数据支撑和实际案例。
+
+## 选型参考（必读）
+
+以下节选自《前端技术栈选型指南》的相关章节作为你选型推荐的重要参考：
+
+---
+{GUIDE_SLOT}
+---
+"""
+
+
+SKELETON_CONTENT_PROMPT_TEMPLATE = """请为下面的项目提供《前端技术方案》的核心内容。文档骨架由程序渲染，请只输出 JSON。
+
+## 输入信息
+
+""" + _PROJECT_BACKGROUND + """
+
+## 内容要求
+1. options 给出 2-3 套候选方案，每套写明投放场景、容器类型、开发模式、模块方案、优缺点与适用场景；recommendation 给出明确建议
+2. tech_stack 按类别列出推荐技术及理由
+3. sections 只填写与本项目相关的章节（键为章节编号），每项 1-4 句或简短 Markdown 列表；可填写的章节：
+{section_list}
+4. 未涉及的字段与章节直接省略，不要编造，程序会标注「用户未指出但可能需要保留」
+5. 每项简洁，总计不超过 2000 字
+
+### 输出格式
+请严格按照以下JSON格式输出（不要包含任何其他文字）：
+
+```json
+{{
+  "background": "需求背景",
+  "metrics": ["衡量标准"],
+  "options": [
+    {{"name": "方案名", "scenario": "投放场景", "container": "容器类型", "dev_mode": "开发模式", "modules": "模块方案", "pros": "优点", "cons": "缺点", "use_case": "适用场景"}}
+  ],
+  "recommendation": "明确建议",
+  "tech_stack": {{"框架": {{"name": "技术", "reason": "理由"}}}},
+  "sections": {{"3.2.2": "功能拆解内容"}},
+  "risks": [{{"risk": "风险", "level": "高/中/低", "mitigation": "应对措施"}}],
+  "test_points": ["测试重点"],
+  "rollback": ["回滚步骤"]
+}}
+```"""
+
+# 由结构化字段渲染或保留模版原文的章节，不出现在 sections 可选列表中
+_SKELETON_RENDERED_SECTIONS = {"1.1", "1.2", "3.1", "6.1", "7.3"} | STATIC_SECTIONS
+
+
+def skeleton_section_list(template: str = TECH_SOLUTION_TEMPLATE) -> str:
+    """列出模版中可由 sections 自由填写的末级章节"""
+    headings = [h for h in iter_headings(template) if h.level >= 2]
+    lines = []
+    for i, heading in enumerate(headings):
+        key = section_key(heading.title)
+        has_children = i + 1 < len(headings) and headings[i + 1].level > heading.level
+        if key[:1].isdigit() and not has_children and key not in _SKELETON_RENDERED_SECTIONS:
+            lines.append(f"   - {heading.title}")
+    return "\n".join(lines)
+
+
+def get_skeleton_content_prompt(
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> str:
+    """
+    生成骨架渲染模式的结构化内容提示词
+    
+    Args:
+        project_info: 来自 form_data 的项目信息（含 form_data）
+        analysis_result: 分析结果
+        search_results: 搜索结果列表
+    """
+    return SKELETON_CONTENT_PROMPT_TEMPLATE.format(
+        section_list=skeleton_section_list(),
+        **_generation_fields(project_info, analysis_result, search_results),
+    )
+
+
+# ===== 章节修复：本地校验未通过时只重写缺失或不合格的章节 =====
+
+SECTION_REPAIR_SYSTEM_PROMPT = f"""你是一位专业的技术文档撰写专家，负责修补《前端技术方案》中未通过结构校验的单个章节。
+文档其余部分已经完成，你只需输出需要修复的章节，内容须与项目背景一致。
+
+## 选型参考（必读）
+
+以下节选自《前端技术栈选型指南》的相关章节作为你选型推荐的重要参考：
+
+---
+{GUIDE_SLOT}
+---
+"""
+
+
+SECTION_REPAIR_PROMPT_TEMPLATE = """下面这份《前端技术方案》中的「{title}」章节未通过结构校验，请重写该章节。
+
+## 输入信息
+
+""" + _PROJECT_BACKGROUND + """
+
+## 校验问题
+{problems}
+
+## 该章节模版
+{section_template}
+
+## 当前章节内容
+{section}
+
+## 修复要求
+1. 按该章节模版的标题与顺序输出，解决上述全部校验问题，保留当前内容中正确的部分
+2. 「3.1 技术调研和选型」须以表格对比 2+ 套方案（每套写明：投放场景、容器类型、开发模式、模块方案），并以「**明确建议**：」给出结论
+3. 非每项必填，用户未指出、本次未涉及的部分注明「用户未指出但可能需要保留」
+4. 请只输出修复后的该章节，以「{heading}」标题开头，不要输出其他章节或额外说明"""
+
+
+def get_section_repair_prompt(
+    heading: str,
+    title: str,
+    section_template: str,
+    section: Optional[str],
+    problems: List[str],
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> str:
+    """
+    生成单个章节的修复提示词
+    
+    Args:
+        heading: 输出应以之开头的标题行（如 "### 3.1 技术调研和选型"）
+        title: 章节标题
+        section_template: 该章节的模版原文
+        section: 文档中的当前章节（缺失时为 None）
+        problems: 校验问题
+        project_info: 来自 form_data 的项目信息（含 form_data）
+        analysis_result: 分析结果
+        search_results: 搜索结果列表
+    """
+    return SECTION_REPAIR_PROMPT_TEMPLATE.format(
+        title=title,
+        heading=heading,
+        problems="\n".join(f"- {problem}" for problem in problems),
+        section_template=section_template.strip(),
+        section=section.strip() if section else "（文档中缺少该章节）",
+        **_generation_fields(project_info, analysis_result, search_results),
+    )
+
+
+# ===== 表单变更后的章节修订（edit 流程） =====
+
+SECTION_REVISION_SYSTEM_PROMPT = f"""你是一位专业的技术文档撰写专家，负责在用户修改表单后修订《前端技术方案》中受影响的章节。
+文档其余章节保持不变，你只需输出被指定的章节：只改动受表单变更影响的内容，其余内容尽量保持原文，
+以免与未修订的章节产生矛盾。
+
+## 选型参考（必读）
+
+以下节选自《前端技术栈选型指南》的相关章节作为你选型推荐的重要参考：
+
+---
+{GUIDE_SLOT}
+---
+"""
+
+
+SECTION_REVISION_PROMPT_TEMPLATE = """用户修改了表单中的部分回答，请据此修订《前端技术方案》中的「{title}」章节。
+
+## 输入信息（已按新表单更新）
+
+""" + _PROJECT_BACKGROUND + """
+
+## 表单变更
+{changes}
+
+## 该章节模版
+{section_template}
+
+## 当前章节内容
+{section}
+
+## 修订要求
+1. 只修改受上述变更影响的内容，未受影响的段落、表格行保持原文
+2. 变更使原有选型或结论不再成立时（如新增的禁忌项命中了推荐方案），须更新结论并简要说明调整原因
+3. 按该章节模版的标题与顺序输出；「3.1 技术调研和选型」仍须对比 2+ 套方案并以「**明确建议**：」给出结论
+4. 请只输出按表单变更修订后的该章节，以「{heading}」标题开头，不要输出其他章节或额外说明"""
+
+
+def get_section_revision_prompt(
+    heading: str,
+    title: str,
+    section_template: str,
+    section: Optional[str],
+    changes: List[str],
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> str:
+    """
+    生成表单变更后单个章节的修订提示词
+    
+    Args:
+        heading: 输出应以之开头的标题行（如 "### 3.1 技术调研和选型"）
+        title: 章节标题
+        section_template: 该章节的模版原文
+        section: 文档中的当前章节（缺失时为 None）
+        changes: 表单变更描述（如 "禁忌与不接受项：「无」→「包体积大」"）
+        project_info: 来自新 form_data 的项目信息（含 form_data）
+        analysis_result: 更新后的分析结果
+        search_results: 搜索结果列表
+    """
+    return SECTION_REVISION_PROMPT_TEMPLATE.format(
+        title=title,
+        heading=heading,
+        changes="\n".join(f"- {change}" for change in changes),
+        section_template=section_template.strip(),
+        section=section.strip() if section else "（文档中缺少该章节）",
+        **_generation_fields(project_info, analysis_result, search_results),
+    )
+
+
+# ===== 续写：流式输出中途断开时，从中断处继续生成 =====
+
+CONTINUATION_PROMPT_TEMPLATE = """你正在按《前端技术方案模版》撰写的技术方案文档在输出过程中中断了，请从中断处继续输出剩余内容。
+
+## 输入信息
+
+""" + _PROJECT_BACKGROUND + """
+
+## 已完成的章节
+{written_titles}
+
+## 已输出内容的末尾（原样摘录，最后一个字符即中断位置）
+-----
+{tail}
+-----
+
+## 续写要求
+1. 从中断处（可能在句子或表格行中间）紧接着输出，不要重复已输出的内容，不要添加任何开场白或说明
+2. 按模版顺序完成剩余章节，标题层级与已输出部分一致
+3. 技术选型与结论须与已输出部分保持一致"""
+
+
+def get_continuation_prompt(
+    written_titles: List[str],
+    tail: str,
+    project_info: dict,
+    analysis_result: dict,
+    search_results: list,
+) -> str:
+    """
+    生成续写提示词（流式生成中断后继续输出剩余部分）
+    
+    Args:
+        written_titles: 已输出的章节标题
+        tail: 已输出内容的末尾
+        project_info: 来自 form_data 的项目信息（含 form_data）
+        analysis_result: 分析结果
+        search_results: 搜索结果列表
+    """
+    return CONTINUATION_PROMPT_TEMPLATE.format(
+        written_titles="\n".join(f"- {title}" for title in written_titles) or "（尚无完整章节）",
+        tail=tail,
+        **_generation_fields(project_info, analysis_result, search_results),
+    )
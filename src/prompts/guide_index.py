@@ -0,0 +1,221 @@
+"""
+选型指南检索 - 把 selection_guide.md 按二级标题切块并建立倒排索引，
+每次调用只向系统提示词注入与表单相关的章节
+
+系统提示词中以 GUIDE_SLOT 占位，调用前用 with_selection_guide() 替换为
+按表单检索出的指南片段（在 token 预算内，按指南原顺序拼接）。
+"""
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.tools.ranking import tokenize
+from src.utils.tokens import count_tokens
+
+_SELECTION_GUIDE_PATH = Path(__file__).parent / "selection_guide.md"
+
+SELECTION_GUIDE = (
+    _SELECTION_GUIDE_PATH.read_text(encoding="utf-8") if _SELECTION_GUIDE_PATH.exists() else ""
+)
+
+# 系统提示词中指南片段的占位符
+GUIDE_SLOT = "<<selection_guide>>"
+
+# 总是注入的章节（选型原则）
+PINNED_SECTIONS = ("概览与原则",)
+
+# 标题中的词在索引中的权重（相对正文）
+_TITLE_WEIGHT = 3
+
+
+@dataclass
+class GuideSection:
+    """指南中的一个二级章节"""
+
+    title: str
+    text: str  # 含 "## 标题" 行
+    tokens: int  # token 数（见 tokens.count_tokens）
+
+
+class GuideIndex:
+    """
+    指南章节的倒排索引（词 -> [(章节序号, 词频)]），按 BM25 打分
+    """
+
+    def __init__(self, markdown: str, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.heading, self.sections = self._split(markdown)
+
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for index, section in enumerate(self.sections):
+            terms = Counter(tokenize(section.text))
+            for term in tokenize(section.title):
+                terms[term] += _TITLE_WEIGHT
+            self.lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                self.postings.setdefault(term, []).append((index, freq))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    @staticmethod
+    def _split(markdown: str) -> Tuple[str, List[GuideSection]]:
+        """按二级标题切块，返回 (一级标题行, 章节)"""
+        parts = re.split(r"\n(?=## )", markdown.strip())
+        heading = parts[0].strip() if parts and not parts[0].startswith("## ") else ""
+        sections = []
+        for part in parts:
+            if not part.startswith("## "):
+                continue
+            text = part.strip()
+            title = text.splitlines()[0][3:].strip()
+            sections.append(GuideSection(title, text, count_tokens(text)))
+        return heading, sections
+
+    def find(self, title: str) -> Optional[int]:
+        """按标题前缀查找章节序号（如 "小型项目技术组合"）"""
+        for index, section in enumerate(self.sections):
+            if section.title.startswith(title):
+                return index
+        return None
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """查询文本对各章节的 BM25 得分（只包含命中的章节）"""
+        count = len(self.sections)
+        scores: Dict[int, float] = {}
+        for term, weight in Counter(tokenize(query)).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.avg_length)
+                scores[index] = scores.get(index, 0.0) + weight * idf * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+    def retrieve(self, query: str, token_budget: int, required: Optional[List[str]] = None) -> List[GuideSection]:
+        """
+        检索与查询相关的章节
+
+        Args:
+            query: 查询文本（表单内容、分析结果）
+            token_budget: 注入指南片段的 token 预算（0 表示不限，返回全部章节）
+            required: 必选章节标题（按顺序优先放入，仍受预算约束）
+
+        Returns:
+            选中的章节，按指南原顺序
+        """
+        if not token_budget:
+            return list(self.sections)
+
+        ranked: List[int] = []
+        for title in list(PINNED_SECTIONS) + list(required or []):
+            index = self.find(title)
+            if index is not None and index not in ranked:
+                ranked.append(index)
+        scores = self.scores(query)
+        ranked += [
+            index for index in sorted(scores, key=lambda i: (-scores[i], i))
+            if index not in ranked
+        ]
+
+        selected = []
+        remaining = token_budget
+        for index in ranked:
+            tokens = self.sections[index].tokens
+            if tokens <= remaining:
+                selected.append(index)
+                remaining -= tokens
+        return [self.sections[index] for index in sorted(selected)]
+
+
+GUIDE_INDEX = GuideIndex(SELECTION_GUIDE)
+
+
+def required_guide_sections(project_info: Dict[str, Any]) -> List[str]:
+    """
+    按表单规则必选的指南章节（规模组合、渲染模式、迁移建议）
+    """
+    titles = []
+    try:
+        count = int(project_info.get("frontend_count", 1) or 1)
+    except (TypeError, ValueError):
+        count = 1
+    if count <= 3:
+        titles.append("小型项目技术组合")
+    elif count <= 10:
+        titles.append("中小型业务技术组合")
+    else:
+        titles.append("中大型平台技术组合")
+
+    features = " ".join(
+        str(project_info.get(field, "") or "") for field in ("core_features", "key_features")
+    ).lower()
+    if any(word in features for word in ("seo", "ssr", "首屏", "内容站", "搜索引擎")):
+        titles.append("渲染模式对比与选择")
+    if project_info.get("project_stage") in ("项目新增", "局部模块替换"):
+        titles.append("迁移与演进建议")
+    return titles
+
+
+def guide_query(project_info: Dict[str, Any], analysis_result: Optional[Dict[str, Any]] = None) -> str:
+    """由表单（与分析结果）构建指南检索的查询文本"""
+    parts = [
+        str(project_info.get(field, "") or "")
+        for field in (
+            "project_type", "existing_stack", "core_features", "key_features",
+            "dev_preference", "forbidden_items",
+        )
+    ]
+    if analysis_result:
+        parts += analysis_result.get("extracted_requirements", []) or []
+        parts += analysis_result.get("tech_constraints", []) or []
+    return "\n".join(part for part in parts if part)
+
+
+def guide_token_budget() -> int:
+    """指南片段的默认 token 预算（GUIDE_TOKEN_BUDGET，0 表示注入全文）"""
+    return int(os.getenv("GUIDE_TOKEN_BUDGET", 1000))
+
+
+def select_guide(
+    project_info: Dict[str, Any],
+    analysis_result: Optional[Dict[str, Any]] = None,
+    token_budget: Optional[int] = None,
+) -> str:
+    """
+    检索与本次表单相关的指南片段
+
+    Args:
+        project_info: 来自 form_data 的项目信息
+        analysis_result: 需求分析结果（有则一并作为查询）
+        token_budget: token 预算，缺省读取 GUIDE_TOKEN_BUDGET
+
+    Returns:
+        指南片段（含一级标题），按指南原顺序
+    """
+    budget = guide_token_budget() if token_budget is None else token_budget
+    sections = GUIDE_INDEX.retrieve(
+        guide_query(project_info, analysis_result),
+        budget,
+        required_guide_sections(project_info),
+    )
+    return "\n\n".join([GUIDE_INDEX.heading] + [section.text for section in sections]).strip()
+
+
+def with_selection_guide(
+    system_prompt: str,
+    project_info: Dict[str, Any],
+    analysis_result: Optional[Dict[str, Any]] = None,
+    token_budget: Optional[int] = None,
+) -> str:
+    """把系统提示词中的 GUIDE_SLOT 替换为按表单检索出的指南片段"""
+    if GUIDE_SLOT not in system_prompt:
+        return system_prompt
+    return system_prompt.replace(
+        GUIDE_SLOT, select_guide(project_info, analysis_result, token_budget)
+    )
@@ -0,0 +1,167 @@
+"""
+Search result deduplication: URL canonicalization and near-duplicate removal
+"""
+import hashlib
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.tools.ranking import tokenize
+
+
+# Query parameters that only track the visit and never change the page
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "source", "src", "spm", "from",
+    "share", "share_source", "share_medium", "sharesource", "igshid", "si",
+}
+_TRACKING_PREFIXES = ("utm_", "hmsr", "hmpl", "hmcu", "hmkw", "hmci")
+
+# Host prefixes that serve the same page as the bare host
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+# Mirror hosts mapped to the host they mirror
+_HOST_ALIASES = {
+    "npmjs.org": "npmjs.com",
+    "npm.io": "npmjs.com",
+    "legacy.reactjs.org": "react.dev",
+    "reactjs.org": "react.dev",
+    "zh-hans.react.dev": "react.dev",
+    "zh-hans.reactjs.org": "react.dev",
+    "cn.vuejs.org": "vuejs.org",
+    "v3.vuejs.org": "vuejs.org",
+    "nextjs.org.cn": "nextjs.org",
+    "developer.mozilla.org.cn": "developer.mozilla.org",
+}
+
+SIMHASH_BITS = 64
+# Bands for locality-sensitive lookup: two hashes within MAX_DISTANCE bits of
+# each other agree on at least one band when BANDS > MAX_DISTANCE (pigeonhole)
+SIMHASH_BANDS = 4
+MAX_DISTANCE = 3
+# Texts with fewer features than this are only deduplicated by URL
+MIN_FEATURES = 8
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a result URL so that the same page reached through
+    different links compares equal.
+
+    Lowercases scheme and host, drops "www."/"m."/"amp." prefixes and maps
+    known mirrors to their origin, removes tracking parameters, fragments,
+    default ports, "index.html" and trailing slashes, and sorts the
+    remaining query parameters.
+
+    Returns:
+        Canonical URL string ("" for an empty URL)
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+    except ValueError:
+        return url.lower()
+
+    host = (parts.hostname or "").lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    host = _HOST_ALIASES.get(host, host)
+
+    path = re.sub(r"/+", "/", parts.path or "/")
+    path = re.sub(r"/(index\.html?|amp)$", "/", path)
+    path = path.rstrip("/") or ""
+    if host == "github.com":
+        path = path.lower()
+        if path.endswith(".git"):
+            path = path[:-4]
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of a text (None when it has too few features to compare
+    reliably).
+    """
+    features = tokenize(text)
+    if len(features) < MIN_FEATURES:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    result = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            result |= 1 << bit
+    return result
+
+
+def _bands(value: int) -> List[Tuple[int, int]]:
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(band, value >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+
+def dedupe_results(
+    results: List[Dict[str, Any]],
+    max_distance: int = MAX_DISTANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Drop duplicate search results, keeping the first occurrence (results
+    arrive in keyword priority order).
+
+    A result is a duplicate when its canonical URL was already seen, or when
+    the SimHash of its title and body is within max_distance bits of a kept
+    result (syndicated copies of the same article). Candidates are found
+    through banded hash buckets, so the whole pass runs in (expected) linear
+    time.
+
+    Args:
+        results: Search results with title, body and href
+        max_distance: Maximum Hamming distance for near-duplicates
+            (must be smaller than SIMHASH_BANDS)
+
+    Returns:
+        Deduplicated results, each with "href" left as returned by the backend
+    """
+    seen_urls = set()
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    kept = []
+
+    for result in results:
+        url = canonicalize_url(result.get("href", ""))
+        if url and url in seen_urls:
+            continue
+
+        fingerprint = simhash(f"{result.get('title', '')} {result.get('body', '')}")
+        if fingerprint is not None:
+            bands = _bands(fingerprint)
+            if any(
+                bin(fingerprint ^ other).count("1") <= max_distance
+                for band in bands
+                for other in buckets.get(band, ())
+            ):
+                continue
+            for band in bands:
+                buckets.setdefault(band, []).append(fingerprint)
+
+        if url:
+            seen_urls.add(url)
+        kept.append(result)
+
+    return kept
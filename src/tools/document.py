@@ -1,9 +1,22 @@
 """
 Document Generation Tools
 """
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from src.tools.sections import find_section, iter_headings, section_key
+
+# Placeholder for template sections the user did not cover
+UNSPECIFIED = "用户未指出但可能需要保留"
+
+# Template sections whose body is a fixed checklist / table and is kept verbatim
+STATIC_SECTIONS = {"5.4", "5.5", "6.2", "7.2", "8", "9"}
+
+CHANGELOG_TITLE = "ChangeLog 变更记录"
+CHANGELOG_TABLE_HEADER = "| 版本号 | 变更人 | 变更时间 | 变更备注 |\n|--------|--------|----------|----------|"
+_VERSION_PATTERN = re.compile(r"V\s*(\d+)\.(\d+)")
+
 
 class DocumentGenerator:
     """
@@ -144,3 +157,201 @@ class DocumentGenerator:
         """
         header = "#" * level
         return f"{header} {title}\n\n{content}\n\n"
+    
+    @staticmethod
+    def format_bullets(items: List[str]) -> str:
+        """
+        Format a list of strings as a markdown bullet list.
+        
+        Args:
+            items: List items
+            
+        Returns:
+            Markdown bullet list (empty string if there are no items)
+        """
+        return "\n".join(f"- {item}" for item in items if item)
+    
+    @staticmethod
+    def format_option_profiles(options: List[Dict[str, Any]]) -> str:
+        """
+        Format candidate solutions by delivery scenario, container,
+        development mode and module plan (the dimensions required in 3.1).
+        
+        Args:
+            options: Candidate solutions
+            
+        Returns:
+            Markdown formatted table
+        """
+        if not options:
+            return "暂无对比数据"
+        
+        lines = [
+            "| 方案 | 投放场景 | 容器类型 | 开发模式 | 模块方案 |",
+            "|------|----------|----------|----------|----------|",
+        ]
+        for option in options:
+            lines.append(
+                f"| {option.get('name', '')} | {option.get('scenario', '')} "
+                f"| {option.get('container', '')} | {option.get('dev_mode', '')} "
+                f"| {option.get('modules', '')} |"
+            )
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_risk_table(risks: List[Dict[str, Any]]) -> str:
+        """
+        Format technical risks as markdown table.
+        
+        Args:
+            risks: Risks with level and mitigation
+            
+        Returns:
+            Markdown formatted table
+        """
+        if not risks:
+            return UNSPECIFIED
+        
+        lines = ["| 风险 | 等级 | 应对措施 |", "|------|------|----------|"]
+        for risk in risks:
+            lines.append(
+                f"| {risk.get('risk', '')} | {risk.get('level', '-')} | {risk.get('mitigation', '')} |"
+            )
+        return "\n".join(lines)
+    
+    @staticmethod
+    def render_solution_document(
+        content: Dict[str, Any],
+        project_info: Dict[str, Any],
+        template: str,
+    ) -> str:
+        """
+        Render a full technical solution document from structured content.
+        
+        The skeleton (title, template notice, ChangeLog, every template
+        heading, fixed checklists and tables) is produced locally; only the
+        variable content comes from `content`:
+        
+            background, metrics, options, recommendation, tech_stack,
+            risks, test_points, rollback, sections {"3.2.2": "...", ...}
+        
+        Sections without content get the「用户未指出但可能需要保留」placeholder.
+        
+        Args:
+            content: Structured content returned by the LLM
+            project_info: Project information from the form
+            template: Solution template (tech_solution_template.md)
+            
+        Returns:
+            Markdown document
+        """
+        gen = DocumentGenerator
+        today = datetime.now().strftime("%Y-%m-%d")
+        sections = {
+            str(key): value for key, value in (content.get("sections") or {}).items() if value
+        }
+        
+        filled: Dict[str, str] = {}
+        if content.get("background"):
+            filled["1.1"] = content["background"]
+        if content.get("metrics"):
+            filled["1.2"] = gen.format_bullets(content["metrics"])
+        if content.get("options") or content.get("recommendation"):
+            parts = []
+            options = content.get("options") or []
+            if options:
+                parts.append(gen.format_option_profiles(options))
+                parts.append(gen.format_comparison_matrix(options))
+            if content.get("tech_stack"):
+                parts.append("**推荐技术栈**\n\n" + gen.format_tech_stack(content["tech_stack"]))
+            if content.get("recommendation"):
+                parts.append(f"**明确建议**：{content['recommendation']}")
+            filled["3.1"] = "\n\n".join(parts)
+        if content.get("risks"):
+            filled["5"] = gen.format_risk_table(content["risks"])
+        if content.get("test_points"):
+            filled["6.1"] = gen.format_bullets(content["test_points"])
+        if content.get("rollback"):
+            filled["7.3"] = gen.format_bullets(content["rollback"])
+        
+        title = f"{project_info.get('project_type', '')} 前端技术方案".strip()
+        parts = [
+            f"# {title}\n\n",
+            gen.wrap_section(
+                "模版声明",
+                "本方案按《前端技术方案模版》结构生成，非每项必填；"
+                f"本次未涉及的部分注明「{UNSPECIFIED}」。",
+            ),
+            gen.wrap_section(
+                CHANGELOG_TITLE,
+                f"{CHANGELOG_TABLE_HEADER}\n| V 1.0 | Agent | {today} | 初始化版本 |",
+            ),
+        ]
+        
+        headings = [h for h in iter_headings(template) if h.level >= 2]
+        for i, heading in enumerate(headings):
+            key = section_key(heading.title)
+            if not key[:1].isdigit():
+                continue  # ChangeLog is rendered above
+            has_children = i + 1 < len(headings) and headings[i + 1].level > heading.level
+            end = headings[i + 1].start if i + 1 < len(headings) else len(template)
+            
+            body = sections.get(key) or filled.get(key)
+            if body is None and key in STATIC_SECTIONS:
+                body = template[heading.end:end].strip()
+            if body is None and not has_children:
+                body = UNSPECIFIED
+            
+            if body:
+                parts.append(gen.wrap_section(heading.title, body, level=heading.level))
+            else:
+                parts.append(f"{'#' * heading.level} {heading.title}\n\n")
+        
+        return "".join(parts).rstrip("\n") + "\n"
+    
+    @staticmethod
+    def add_changelog_entry(
+        markdown: str,
+        note: str,
+        author: str = "Agent",
+        date: Optional[str] = None,
+    ) -> str:
+        """
+        Append a row to the document's ChangeLog table.
+        
+        The version continues from the last row ("V 1.1" -> "V 1.2"). A
+        missing table or ChangeLog section is created (the section goes
+        before the first numbered chapter).
+        
+        Args:
+            markdown: Document text
+            note: Change summary (pipes are escaped)
+            author: Value of the 变更人 column
+            date: Change date, defaults to today
+            
+        Returns:
+            Document with the new ChangeLog row
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        note = note.replace("|", "\\|").replace("\n", " ")
+        
+        span = find_section(markdown, "ChangeLog")
+        if span is None:
+            section = DocumentGenerator.wrap_section(
+                CHANGELOG_TITLE, f"{CHANGELOG_TABLE_HEADER}\n| V 1.1 | {author} | {date} | {note} |"
+            )
+            for heading in iter_headings(markdown):
+                if heading.level == 2 and section_key(heading.title)[:1].isdigit():
+                    return markdown[:heading.start] + section + markdown[heading.start:]
+            return markdown.rstrip("\n") + "\n\n" + section
+        
+        section = markdown[span[0]:span[1]]
+        lines = section.rstrip("\n").split("\n")
+        rows = [i for i, line in enumerate(lines) if line.strip().startswith("|")]
+        if not rows:
+            lines += ["", CHANGELOG_TABLE_HEADER, f"| V 1.1 | {author} | {date} | {note} |"]
+        else:
+            match = _VERSION_PATTERN.search(lines[rows[-1]])
+            version = f"V {match.group(1)}.{int(match.group(2)) + 1}" if match else "V 1.1"
+            lines.insert(rows[-1] + 1, f"| {version} | {author} | {date} | {note} |")
+        return markdown[:span[0]] + "\n".join(lines) + "\n\n" + markdown[span[1]:].lstrip("\n")
@@ -0,0 +1,203 @@
+"""
+Relevance ranking of search results (BM25 + source authority)
+"""
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#\-]*(?:\.[a-z0-9]+)*|[\u3400-\u9fff]+")
+_CJK_PATTERN = re.compile(r"[\u3400-\u9fff]")
+
+# Latin tokens that carry no signal in tech queries
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "the", "to", "vs", "with", "what", "which",
+}
+
+# Source authority by host (a host matches itself and its subdomains)
+AUTHORITY_SCORES = {
+    # Official documentation and package registries
+    "react.dev": 1.0,
+    "reactjs.org": 1.0,
+    "vuejs.org": 1.0,
+    "angular.dev": 1.0,
+    "angular.io": 1.0,
+    "svelte.dev": 1.0,
+    "nextjs.org": 1.0,
+    "nuxt.com": 1.0,
+    "vitejs.dev": 1.0,
+    "vite.dev": 1.0,
+    "developer.mozilla.org": 1.0,
+    "web.dev": 1.0,
+    "developers.weixin.qq.com": 1.0,
+    "taro-docs.jd.com": 1.0,
+    "uniapp.dcloud.net.cn": 1.0,
+    "reactnative.dev": 1.0,
+    "docs.flutter.dev": 1.0,
+    "github.com": 0.9,
+    "npmjs.com": 0.9,
+    # Community sites
+    "stackoverflow.com": 0.6,
+    "dev.to": 0.5,
+    "medium.com": 0.4,
+    "juejin.cn": 0.5,
+    "infoq.cn": 0.5,
+    "segmentfault.com": 0.4,
+    "zhihu.com": 0.3,
+    "csdn.net": 0.2,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize mixed Chinese/English text: lowercased Latin words (stopwords
+    dropped) and overlapping character bigrams for CJK runs, since form
+    fields and requirements are written in Chinese without spaces.
+    """
+    tokens = []
+    for token in _WORD_PATTERN.findall((text or "").lower()):
+        if _CJK_PATTERN.match(token):
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        elif token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def authority_score(href: str) -> float:
+    """
+    Authority of a result's source in [0, 1] (0 for unknown hosts).
+
+    Hosts are matched exactly or as a parent domain, so "docs.github.com"
+    matches "github.com" but "notgithub.com" does not.
+    """
+    try:
+        host = (urlsplit(href if "://" in href else f"https://{href}").hostname or "").lower()
+    except ValueError:
+        return 0.0
+    while host:
+        if host in AUTHORITY_SCORES:
+            return AUTHORITY_SCORES[host]
+        _, _, host = host.partition(".")
+    return 0.0
+
+
+class BM25:
+    """
+    Okapi BM25 over a fixed set of documents.
+    """
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Index tokenized documents.
+
+        Args:
+            documents: Token lists, one per document
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.lengths) / len(documents) if documents else 0.0
+
+        doc_freqs: Counter = Counter()
+        for freqs in self.term_freqs:
+            doc_freqs.update(freqs.keys())
+        count = len(documents)
+        self.idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        """BM25 score of every document for a tokenized query."""
+        terms = Counter(query)
+        results = []
+        for freqs, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term, weight in terms.items():
+                tf = freqs.get(term)
+                if tf:
+                    score += weight * self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def rank_results(
+    results: List[Dict[str, Any]],
+    queries: List[str],
+    authority_weight: float = 0.3,
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Rank search results by relevance to the project's requirements.
+
+    The BM25 score of each result's title and body against the query texts
+    is normalized to [0, 1] and blended with its source authority. Ties keep
+    the original (keyword priority) order.
+
+    Args:
+        results: Search results with title, body and href
+        queries: Texts describing what matters (requirements, constraints, core features)
+        authority_weight: Share of the final score given to source authority
+
+    Returns:
+        (score, result) pairs, best first
+    """
+    if not results:
+        return []
+
+    documents = [tokenize(f"{r.get('title', '')} {r.get('body', '')}") for r in results]
+    relevance = BM25(documents).scores(tokenize(" ".join(queries)))
+    top = max(relevance) or 1.0
+
+    scored = [
+        (
+            (1 - authority_weight) * score / top + authority_weight * authority_score(result.get("href", "")),
+            index,
+            result,
+        )
+        for index, (score, result) in enumerate(zip(relevance, results))
+    ]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(round(score, 4), result) for score, _, result in scored]
+
+
+def select_within_budget(
+    results: List[Dict[str, Any]],
+    cost: Callable[[Dict[str, Any]], int],
+    token_budget: int,
+    max_items: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Take results in order while they fit the token budget (a result that
+    does not fit is skipped so that shorter, lower ranked ones can still use
+    the remaining budget).
+
+    Args:
+        results: Ranked results
+        cost: Tokens a result takes up in the prompt
+        token_budget: Total tokens available (0 = unlimited)
+        max_items: Maximum number of results (None = unlimited)
+
+    Returns:
+        Selected results in their ranked order
+    """
+    selected = []
+    remaining = token_budget
+    for result in results:
+        if max_items is not None and len(selected) >= max_items:
+            break
+        tokens = cost(result)
+        if token_budget and tokens > remaining:
+            continue
+        selected.append(result)
+        remaining -= tokens
+    return selected
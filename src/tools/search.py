@@ -1,26 +1,130 @@
 """
 Search Tools using DuckDuckGo
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from duckduckgo_search import DDGS
+import asyncio
+import contextvars
+import os
+import threading
 import time
 
+from src.tools.ranking import authority_score
+from src.utils.cassette import Cassette, get_active_cassette
+from src.utils.rate_limiter import RateLimiter, get_rate_limiter, is_rate_limit_error
+from src.utils.search_cache import SearchCache, get_search_cache
+from src.utils.tracing import get_tracer
+
+
+# Backend signature: (query, max_results, region, timeout) -> raw result dicts
+SearchBackend = Callable[[str, int, str, float], List[Dict[str, Any]]]
+
+
+class DuckDuckGoBackend:
+    """
+    DuckDuckGo text search backend.
+    
+    Keeps one DDGS session per thread so repeated queries reuse the
+    underlying HTTP client instead of opening a fresh context each time.
+    TechSearchTool runs queries on one long-lived pool, so the number of
+    sessions stays bounded by the pool size; short-lived threads call
+    release_session() when they are done.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _get_session(self, timeout: float) -> DDGS:
+        session = getattr(self._local, "session", None)
+        if session is None or getattr(self._local, "timeout", None) != timeout:
+            session = DDGS(timeout=int(timeout) or None)
+            self._local.session = session
+            self._local.timeout = timeout
+        return session
+    
+    def release_session(self) -> None:
+        """Close and forget the calling thread's session, if any."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            self._local.session = None
+            session.__exit__()
+    
+    def __call__(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        timeout: float,
+    ) -> List[Dict[str, Any]]:
+        return self._get_session(timeout).text(
+            query,
+            max_results=max_results,
+            region=region,
+            safesearch='off',
+        )
+
 
 class TechSearchTool:
     """
     DuckDuckGo search wrapper optimized for technology research.
     """
     
-    def __init__(self, max_results: int = 5, delay: float = 1.0):
+    def __init__(
+        self,
+        max_results: int = 5,
+        delay: float = 1.0,
+        concurrency: int = 4,
+        timeout: float = 10.0,
+        region: str = 'wt-wt',
+        backend: Optional[SearchBackend] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[SearchCache] = None,
+    ):
         """
         Initialize search tool.
         
         Args:
             max_results: Maximum results per search query
-            delay: Delay between searches to avoid rate limiting (seconds)
+            delay: Average spacing between searches in seconds; sets the default
+                rate limit to 60/delay requests per minute (0 = unlimited)
+            concurrency: Maximum number of queries in flight (1 = sequential)
+            timeout: Per-query timeout in seconds (0 disables)
+            region: Search region (defaults to worldwide)
+            backend: Search backend callable (defaults to DuckDuckGo)
+            rate_limiter: Optional rate limiter (defaults to the shared "search" limiter,
+                overridable with SEARCH_RPM)
+            cache: Optional result cache (defaults to the shared SearchCache,
+                see get_search_cache)
         """
         self.max_results = max_results
         self.delay = delay
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.region = region
+        self.backend = backend or DuckDuckGoBackend()
+        
+        if rate_limiter is None:
+            rate_limiter = (
+                get_rate_limiter("search", rpm=60.0 / delay) if delay > 0
+                else RateLimiter("search")
+            )
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        
+        # One long-lived pool for all concurrent queries (sync, asyncio and
+        # speculative), so per-thread backend sessions are reused across calls
+        # instead of being created for every call. It is sized like asyncio's
+        # default executor so concurrent sessions (batch runs) do not queue
+        # behind one another; each call still caps its own queries in flight.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(self.concurrency, min(32, (os.cpu_count() or 1) + 4)),
+            thread_name_prefix="search",
+        )
+        
+        # Keys of stale cache entries being refreshed in the background
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
     
     def search(
         self,
@@ -39,14 +143,68 @@ class TechSearchTool:
         """
         max_results = max_results or self.max_results
         
-        try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(
-                    query,
-                    max_results=max_results,
-                    region='wt-wt',  # Worldwide search
-                    safesearch='off',
-                ))
+        cassette = get_active_cassette()
+        if cassette:
+            key = Cassette.search_key(query, max_results, self.region)
+            if cassette.replaying:
+                return cassette.replay_search(key)
+            results = self._search_live(query, max_results)
+            cassette.record_search(key, results)
+            return results
+        
+        cache = self.cache if self.cache is not None else get_search_cache()
+        if cache is None:
+            return self._search_live(query, max_results)
+        
+        key = SearchCache.make_key(query, self.region, max_results)
+        cached, stale = cache.get(key)
+        if cached is not None:
+            with get_tracer().span("search", "search", query=query, cache_hit=True, stale=stale) as span:
+                span.attrs["results"] = len(cached)
+            if stale:
+                self._refresh(cache, key, query, max_results)
+            return cached
+        
+        results = self._search_live(query, max_results)
+        if results:
+            # Failed searches return [] and are not cached
+            cache.set(key, query, results)
+        return results
+    
+    def _refresh(self, cache: SearchCache, key: str, query: str, max_results: int) -> None:
+        """
+        Re-run a query whose cached entry went stale, at most once at a time
+        per key. Refreshes run on daemon threads so a pending one never delays
+        interpreter exit (the stale entry is simply refreshed next time).
+        """
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh() -> None:
+            try:
+                results = self._search_live(query, max_results)
+                if results:
+                    cache.set(key, query, results)
+                    cache.record_refresh()
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+                # The thread ends here, so its backend session is not reused
+                release_session = getattr(self.backend, "release_session", None)
+                if release_session is not None:
+                    release_session()
+        
+        threading.Thread(target=refresh, name="search-refresh", daemon=True).start()
+    
+    def _search_live(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Run one query against the backend with rate limiting and tracing."""
+        with get_tracer().span("search", "search", query=query) as span:
+            span.attrs["rate_limit_wait"] = self.rate_limiter.acquire()
+            try:
+                results = self.backend(query, max_results, self.region, self.timeout)
+                self.rate_limiter.on_success()
                 
                 # Format results
                 formatted_results = []
@@ -57,39 +215,162 @@ class TechSearchTool:
                         'href': result.get('href', ''),
                     })
                 
+                span.attrs["results"] = len(formatted_results)
                 return formatted_results
-        
-        except Exception as e:
-            print(f"Search failed for query '{query}': {str(e)}")
-            return []
+            
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self.rate_limiter.on_rate_limited()
+                span.error = f"{type(e).__name__}: {e}"
+                print(f"Search failed for query '{query}': {str(e)}")
+                return []
     
     def search_multiple(
         self,
         queries: List[str],
         max_results_per_query: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform multiple search queries.
+        
+        With concurrency > 1 queries run on the tool's shared thread pool; a
+        query that exceeds the per-query timeout contributes no results.
+        Results are always merged back in the original query order.
+        
+        Args:
+            queries: List of search query strings (in priority order)
+            max_results_per_query: Maximum results per query
+            concurrency: Override the tool's concurrency cap
+            timeout: Override the tool's per-query timeout
+            
+        Returns:
+            Combined list of all search results
+        """
+        concurrency = concurrency or self.concurrency
+        timeout = self.timeout if timeout is None else timeout
+        
+        if concurrency <= 1 or len(queries) <= 1:
+            return self._search_sequential(queries, max_results_per_query)
+        
+        started: Dict[int, float] = {}
+        slots = threading.Semaphore(concurrency)
+        
+        def run(index: int, query: str) -> List[Dict[str, Any]]:
+            with slots:
+                started[index] = time.monotonic()
+                return self.search(query, max_results_per_query)
+        
+        futures = [self._submit(run, i, q) for i, q in enumerate(queries)]
+        try:
+            all_results = []
+            for index, future in enumerate(futures):
+                all_results.extend(
+                    self._collect(future, started, index, queries[index], timeout)
+                )
+            return all_results
+        finally:
+            # Queries that have not started yet are dropped; timed-out ones
+            # are abandoned rather than waited for
+            for future in futures:
+                future.cancel()
+    
+    async def asearch_multiple(
+        self,
+        queries: List[str],
+        max_results_per_query: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Perform multiple search queries with delay between them.
+        Asyncio counterpart of search_multiple.
+        
+        Queries (including their blocking cache lookups) run on the tool's
+        shared thread pool, bounded by a semaphore, each with its own timeout.
+        Results are merged in the original query order.
         
         Args:
-            queries: List of search query strings
+            queries: List of search query strings (in priority order)
             max_results_per_query: Maximum results per query
+            concurrency: Override the tool's concurrency cap
+            timeout: Override the tool's per-query timeout
             
         Returns:
             Combined list of all search results
         """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        
+        async def run(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                call = asyncio.wrap_future(self.submit(query, max_results_per_query))
+                try:
+                    return await asyncio.wait_for(call, timeout or None)
+                except asyncio.TimeoutError:
+                    print(f"Search timed out for query '{query}' after {timeout}s")
+                    return []
+        
+        results_per_query = await asyncio.gather(*(run(q) for q in queries))
+        return [result for results in results_per_query for result in results]
+    
+    def submit(self, query: str, max_results: Optional[int] = None) -> Future:
+        """
+        Start one search on the shared pool without waiting for it.
+        
+        Args:
+            query: Search query string
+            max_results: Override default max_results
+            
+        Returns:
+            Future resolving to the search results
+        """
+        return self._submit(self.search, query, max_results)
+    
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        # Copy the caller's context so search spans nest under the current node
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+    
+    def _search_sequential(
+        self,
+        queries: List[str],
+        max_results_per_query: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        """Run queries one after another (pacing is left to the rate limiter)."""
         all_results = []
         
-        for i, query in enumerate(queries):
+        for query in queries:
             results = self.search(query, max_results_per_query)
             all_results.extend(results)
-            
-            # Add delay between searches (except for the last one)
-            if i < len(queries) - 1 and self.delay > 0:
-                time.sleep(self.delay)
         
         return all_results
     
+    @staticmethod
+    def _collect(
+        future,
+        started: Dict[int, float],
+        index: int,
+        query: str,
+        timeout: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        Wait for one query, measuring its timeout from when it actually
+        started running rather than from when it was queued.
+        """
+        while True:
+            if index not in started or not timeout:
+                wait_for = 0.05 if timeout else None
+            else:
+                wait_for = started[index] + timeout - time.monotonic()
+                if wait_for <= 0:
+                    future.cancel()
+                    print(f"Search timed out for query '{query}' after {timeout}s")
+                    return []
+            try:
+                return future.result(timeout=wait_for)
+            except FutureTimeoutError:
+                continue
+    
     def search_tech_stack(
         self,
         framework_names: List[str],
@@ -121,10 +402,6 @@ class TechSearchTool:
                 query = f"{framework} {aspect}"
                 results = self.search(query, max_results=3)
                 framework_results.extend(results)
-                
-                # Small delay between aspect searches
-                if self.delay > 0:
-                    time.sleep(self.delay)
             
             results_by_framework[framework] = framework_results
         
@@ -183,35 +460,10 @@ class TechSearchTool:
             results: Search results to prioritize
             
         Returns:
-            Sorted search results with official sources first
-        """
-        official_domains = [
-            'github.com',
-            'npmjs.com',
-            'reactjs.org',
-            'vuejs.org',
-            'angular.io',
-            'svelte.dev',
-            'nextjs.org',
-            'dev.to',
-            'medium.com',
-            'stackoverflow.com',
-            'mdn.mozilla.org',
-        ]
-        
-        def priority_score(result: Dict[str, Any]) -> int:
-            href = result.get('href', '').lower()
-            
-            # Official sources get highest priority
-            for domain in official_domains:
-                if domain in href:
-                    return 10
-            
-            # Default priority
-            return 0
-        
-        # Sort by priority (descending)
-        return sorted(results, key=priority_score, reverse=True)
+            Results sorted by source authority (see ranking.authority_score),
+            keeping the original order among equally authoritative sources
+        """
+        return sorted(results, key=lambda r: authority_score(r.get('href', '')), reverse=True)
 
 
 # Global search tool instance
@@ -222,10 +474,25 @@ def get_search_tool() -> TechSearchTool:
     """
     Get or create a global TechSearchTool instance.
     
+    Concurrency cap and per-query timeout come from SEARCH_CONCURRENCY and
+    SEARCH_TIMEOUT environment variables. SEARCH_BACKEND=fake swaps DuckDuckGo
+    for the offline FakeSearchBackend (FAKE_SEARCH_LATENCY, FAKE_SEARCH_ERROR_RATE).
+    
     Returns:
         Shared TechSearchTool instance
     """
     global _global_search_tool
     if _global_search_tool is None:
-        _global_search_tool = TechSearchTool()
+        backend = None
+        if os.getenv("SEARCH_BACKEND", "duckduckgo").lower() == "fake":
+            from src.mock.search_backend import FakeSearchBackend
+            backend = FakeSearchBackend(
+                latency=float(os.getenv("FAKE_SEARCH_LATENCY", 0.3)),
+                error_rate=float(os.getenv("FAKE_SEARCH_ERROR_RATE", 0.0)),
+            )
+        _global_search_tool = TechSearchTool(
+            concurrency=int(os.getenv("SEARCH_CONCURRENCY", 4)),
+            timeout=float(os.getenv("SEARCH_TIMEOUT", 10)),
+            backend=backend,
+        )
     return _global_search_tool
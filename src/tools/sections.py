@@ -0,0 +1,240 @@
+"""
+Markdown section helpers for the generated technical documents
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional, List, Iterator
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+_WRAPPING_FENCE_PATTERN = re.compile(r"^(?:[^\n]*\n){0,2}?```[\w-]*\n")
+
+
+@dataclass
+class Heading:
+    """A Markdown ATX heading located in a document."""
+
+    level: int
+    title: str
+    start: int  # offset of the heading line
+    end: int  # offset just after the heading line
+
+
+def iter_headings(markdown: str) -> Iterator[Heading]:
+    """
+    Yield the headings of a document in order, skipping fenced code blocks.
+
+    Args:
+        markdown: Document text
+    """
+    offset = 0
+    in_fence = False
+    for line in markdown.splitlines(keepends=True):
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING_PATTERN.match(line.rstrip("\r\n"))
+            if match:
+                yield Heading(
+                    level=len(match.group(1)),
+                    title=match.group(2).strip(),
+                    start=offset,
+                    end=offset + len(line),
+                )
+        offset += len(line)
+
+
+def heading_matches(title: str, key: str) -> bool:
+    """
+    Whether a heading title matches a section key.
+
+    Numbered keys ("3.1") match on the section number so that wording
+    differences ("3.1 技术调研与选型", "3.1、技术调研和选型") still match;
+    other keys match as a title prefix.
+    """
+    if not title.startswith(key):
+        return False
+    rest = title[len(key):]
+    if key[-1:].isdigit():
+        # "3.1" must not match "3.10" or "3.1.2"
+        return not rest or not (rest[0].isdigit() or (rest[0] == "." and rest[1:2].isdigit()))
+    return True
+
+
+def find_section(markdown: str, key: str) -> Optional[tuple]:
+    """
+    Locate a section: its heading plus everything up to the next heading of
+    the same or a higher level.
+
+    Args:
+        markdown: Document text
+        key: Section number ("3.1") or title prefix
+
+    Returns:
+        (start, end) character offsets, or None if the section is missing
+    """
+    headings = list(iter_headings(markdown))
+    for i, heading in enumerate(headings):
+        if heading_matches(heading.title, key):
+            for following in headings[i + 1:]:
+                if following.level <= heading.level:
+                    return heading.start, following.start
+            return heading.start, len(markdown)
+    return None
+
+
+def extract_section(markdown: str, key: str) -> Optional[str]:
+    """Return the text of a section (heading included), or None if missing."""
+    span = find_section(markdown, key)
+    return markdown[span[0]:span[1]] if span else None
+
+
+def replace_section(markdown: str, key: str, section: str) -> str:
+    """
+    Replace a section with new text.
+
+    Args:
+        markdown: Document text
+        key: Section number or title prefix
+        section: Replacement, including its heading
+
+    Raises:
+        KeyError: If the section is missing
+    """
+    span = find_section(markdown, key)
+    if span is None:
+        raise KeyError(key)
+    section = section.rstrip("\n") + "\n\n"
+    return markdown[:span[0]] + section + markdown[span[1]:].lstrip("\n")
+
+
+def section_titles(markdown: str, max_level: int = 6) -> List[str]:
+    """Titles of all headings up to `max_level`, in document order."""
+    return [h.title for h in iter_headings(markdown) if h.level <= max_level]
+
+
+def section_key(title: str) -> str:
+    """Key used to match a heading: its number ("3", "3.1") or the full title."""
+    match = re.match(r"\d+(?:\.\d+)*", title)
+    return match.group(0) if match else title
+
+
+def strip_code_fence(text: str) -> str:
+    """
+    Remove a code fence wrapping a whole LLM response (```markdown ... ```),
+    including a short lead-in line before the fence ("好的，以下是……").
+    """
+    text = text.strip()
+    match = _WRAPPING_FENCE_PATTERN.match(text)
+    if match and text.endswith("```"):
+        text = text[match.end():-3]
+    return text.strip()
+
+
+def continuation_overlap(text: str, continuation: str, min_overlap: int = 8) -> int:
+    """
+    Length of the longest suffix of `text` that `continuation` starts with.
+
+    Models asked to continue an interrupted answer often repeat the last few
+    words; the overlap is cut before the continuation is appended. Overlaps
+    shorter than `min_overlap` are ignored (they are usually coincidental,
+    e.g. a newline or a table pipe).
+    """
+    for size in range(min(len(text), len(continuation)), min_overlap - 1, -1):
+        if text.endswith(continuation[:size]):
+            return size
+    return 0
+
+
+@dataclass
+class Chapter:
+    """A group of consecutive top-level template chapters generated together."""
+
+    titles: List[str]  # titles of the chapter headings in the group
+    text: str  # template text of the group
+
+    @property
+    def title(self) -> str:
+        return " / ".join(self.titles) if self.titles else "文档开头"
+
+
+def split_chapters(markdown: str, level: int = 2, min_chars: int = 0) -> List[Chapter]:
+    """
+    Split a document into chapters at headings of `level`.
+
+    Text before the first such heading (title, preface) belongs to the first
+    chapter. Chapters shorter than `min_chars` are merged into the previous
+    one so that tiny chapters do not each cost a separate LLM call.
+
+    Args:
+        markdown: Document (e.g. the solution template)
+        level: Heading level that starts a chapter
+        min_chars: Minimum chapter size before merging
+
+    Returns:
+        Chapters in document order
+    """
+    starts = [h for h in iter_headings(markdown) if h.level == level]
+    if not starts:
+        return [Chapter(titles=[], text=markdown)]
+
+    chapters: List[Chapter] = []
+    preamble = markdown[:starts[0].start]
+    for i, heading in enumerate(starts):
+        end = starts[i + 1].start if i + 1 < len(starts) else len(markdown)
+        text = markdown[heading.start:end]
+        if i == 0:
+            text = preamble + text
+        if chapters and len(text.strip()) < min_chars:
+            chapters[-1].titles.append(heading.title)
+            chapters[-1].text += text
+        else:
+            chapters.append(Chapter(titles=[heading.title], text=text))
+    return chapters
+
+
+def normalize_chapter(text: str, chapter: Chapter, level: int = 2, first: bool = False) -> str:
+    """
+    Make an independently generated chapter fit into the stitched document.
+
+    - drops a wrapping code fence and any chatter before the first heading
+    - restores the chapter headings to `level` (models often promote them)
+    - removes repeated document titles (level 1) outside the first chapter
+    - adds the chapter heading if the model left it out
+
+    Args:
+        text: Generated chapter text
+        chapter: Template chapter it was generated for
+        level: Level of chapter headings in the document
+        first: Whether this is the first chapter (which keeps the document title)
+
+    Returns:
+        Normalized chapter text ending with a blank line
+    """
+    text = strip_code_fence(text)
+    keys = [section_key(title) for title in chapter.titles]
+
+    headings = list(iter_headings(text))
+    if headings:
+        text = text[headings[0].start:]
+
+    lines = []
+    in_fence = False
+    for line in text.splitlines():
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_PATTERN.match(line)
+        if match:
+            title = match.group(2).strip()
+            if any(heading_matches(title, key) for key in keys):
+                line = f"{'#' * level} {title}"
+            elif len(match.group(1)) == 1 and not first:
+                continue
+        lines.append(line)
+    text = "\n".join(lines).strip()
+
+    if chapter.titles and not any(
+        h.level == level and heading_matches(h.title, keys[0]) for h in iter_headings(text)
+    ):
+        text = f"{'#' * level} {chapter.titles[0]}\n\n{text}"
+    return text + "\n\n"
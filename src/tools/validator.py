@@ -0,0 +1,157 @@
+"""
+Local structural validation of generated technical documents
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+from src.tools.sections import (
+    find_section,
+    heading_matches,
+    iter_headings,
+    replace_section,
+    section_key,
+)
+
+# Section that must contain the option comparison and the recommendation
+RESEARCH_SECTION = "3.1"
+MIN_OPTIONS = 2
+
+_TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_OPTION_HEADING_PATTERN = re.compile(r"方案|选项|option", re.IGNORECASE)
+_RECOMMENDATION_PATTERN = re.compile(
+    r"明确建议|推荐方案|推荐使用|推荐采用|建议采用|建议选择|建议使用|最终选择|最终选型|选型结论|结论[:：]"
+)
+
+
+@dataclass
+class ValidationIssue:
+    """A problem found in one section of a document."""
+
+    section: str  # section key ("3.1")
+    title: str  # template heading title
+    level: int  # template heading level
+    problems: List[str] = field(default_factory=list)
+    missing: bool = False  # the whole section is absent
+
+    def describe(self) -> str:
+        """One-line summary, e.g. "3.1 技术调研和选型: 缺少明确建议"."""
+        return f"{self.title}: {'；'.join(self.problems)}"
+
+
+def required_sections(template: str) -> List[tuple]:
+    """
+    Sections every document must contain: numbered top-level chapters of the
+    template (except those marked 【可选】) plus the research section.
+
+    Returns:
+        (key, title, level) tuples in template order
+    """
+    required = []
+    for heading in iter_headings(template):
+        key = section_key(heading.title)
+        if not key[:1].isdigit():
+            continue
+        if (heading.level == 2 and "可选" not in heading.title) or key == RESEARCH_SECTION:
+            required.append((key, heading.title, heading.level))
+    return required
+
+
+def count_options(section: str) -> int:
+    """
+    Number of candidate solutions compared in a section: the largest number
+    of data rows in one of its tables, or the number of option subheadings
+    ("#### 方案一：Next.js"), whichever is greater.
+    """
+    blocks: List[List[str]] = [[]]
+    for line in section.splitlines():
+        if line.strip().startswith("|"):
+            blocks[-1].append(line.strip())
+        elif blocks[-1]:
+            blocks.append([])
+
+    best_table = 0
+    for block in blocks:
+        if len(block) >= 2 and _TABLE_SEPARATOR_PATTERN.match(block[1]):
+            best_table = max(best_table, len(block) - 2)
+
+    headings = list(iter_headings(section))
+    option_headings = sum(
+        1 for h in headings[1:] if _OPTION_HEADING_PATTERN.search(h.title)
+    )
+    return max(best_table, option_headings)
+
+
+def has_recommendation(section: str) -> bool:
+    """Whether a section states an explicit recommendation."""
+    return bool(_RECOMMENDATION_PATTERN.search(section))
+
+
+def validate_document(markdown: str, template: str) -> List[ValidationIssue]:
+    """
+    Check a generated document against the template.
+
+    - every required chapter (and 3.1) is present
+    - 3.1 compares at least MIN_OPTIONS solutions
+    - 3.1 gives an explicit recommendation
+    
+    Sections inside a missing chapter are not reported separately; repairing
+    the chapter covers them.
+
+    Args:
+        markdown: Generated document
+        template: Solution template
+
+    Returns:
+        Issues in template order (empty if the document is valid)
+    """
+    issues: List[ValidationIssue] = []
+    for key, title, level in required_sections(template):
+        if any(issue.missing and key.startswith(issue.section + ".") for issue in issues):
+            continue
+        span = find_section(markdown, key)
+        if span is None:
+            issues.append(ValidationIssue(key, title, level, ["缺少该章节"], missing=True))
+            continue
+        if key != RESEARCH_SECTION:
+            continue
+
+        section = markdown[span[0]:span[1]]
+        problems = []
+        options = count_options(section)
+        if options < MIN_OPTIONS:
+            problems.append(f"仅对比了 {options} 套方案，至少需要 {MIN_OPTIONS} 套")
+        if not has_recommendation(section):
+            problems.append("缺少明确建议")
+        if problems:
+            issues.append(ValidationIssue(key, title, level, problems))
+    return issues
+
+
+def splice_section(markdown: str, key: str, section: str, template: str) -> str:
+    """
+    Put a repaired section into a document: replace it if present, otherwise
+    insert it before the first section that follows it in the template.
+
+    Args:
+        markdown: Document text
+        key: Section key
+        section: Section text including its heading
+        template: Solution template (defines section order)
+    """
+    if find_section(markdown, key) is not None:
+        return replace_section(markdown, key, section)
+
+    section = section.rstrip("\n") + "\n\n"
+    following = _following_keys(template, key)
+    for heading in iter_headings(markdown):
+        if any(heading_matches(heading.title, k) for k in following):
+            return markdown[:heading.start] + section + markdown[heading.start:]
+    return markdown.rstrip("\n") + "\n\n" + section
+
+
+def _following_keys(template: str, key: str) -> List[str]:
+    """Numbered template section keys after `key`, in template order."""
+    keys = [section_key(h.title) for h in iter_headings(template)]
+    keys = [k for k in keys if k[:1].isdigit()]
+    return keys[keys.index(key) + 1:] if key in keys else []
@@ -0,0 +1,215 @@
+"""
+Record/replay cassettes for LLM and search traffic
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional, List, Dict, Any, AsyncIterator, Deque, Iterator
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Captures every LLM request/response (with stream chunk timing), every
+    search result and the submitted form, and replays them deterministically.
+
+    File format: gzip-compressed JSON lines. The first line is a header,
+    each following line one interaction:
+        {"kind": "llm", "key": ..., "chunks": [...], "offsets": [...], "error": ...}
+        {"kind": "search", "key": ..., "results": [...]}
+        {"kind": "form", "form_data": {...}}
+
+    Identical requests are replayed in the order they were recorded.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", realtime: bool = False):
+        """
+        Args:
+            path: Cassette file
+            mode: "record" or "replay"
+            realtime: In replay mode, reproduce the recorded stream chunk timing
+                instead of returning everything immediately
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.realtime = realtime
+        self.form_data: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._recorded: List[Dict[str, Any]] = []
+        self._queues: Dict[tuple, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.hits = 0
+
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def search_key(query: str, max_results: int, region: str) -> str:
+        payload = json.dumps([query, max_results, region], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {header.get('version')}")
+            for line in f:
+                entry = json.loads(line)
+                if entry["kind"] == "form":
+                    self.form_data = entry["form_data"]
+                else:
+                    self._queues[(entry["kind"], entry["key"])].append(entry)
+
+    def _next(self, kind: str, key: str) -> Dict[str, Any]:
+        with self._lock:
+            queue = self._queues.get((kind, key))
+            if not queue:
+                raise CassetteMissError(
+                    f"No recorded {kind} interaction for key {key[:12]}… in {self.path}"
+                )
+            self.hits += 1
+            # Keep the last recording around so extra identical calls still replay
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._recorded.append(entry)
+
+    # ===== LLM =====
+
+    def record_llm(
+        self,
+        key: str,
+        chunks: List[str],
+        offsets: List[float],
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one LLM response.
+
+        Args:
+            key: Request key (LLMCache.make_key)
+            chunks: Response chunks (one element for non-streamed calls)
+            offsets: Seconds from request start to each chunk
+            error: Error that interrupted the stream after `chunks`, if any
+        """
+        entry = {
+            "kind": "llm",
+            "key": key,
+            "chunks": chunks,
+            "offsets": [round(o, 4) for o in offsets],
+        }
+        if error:
+            entry["error"] = error
+        self._append(entry)
+
+    def replay_llm(self, key: str) -> Iterator[str]:
+        """
+        Replay a recorded LLM response chunk by chunk.
+
+        Raises:
+            CassetteMissError: If the request was not recorded
+            RuntimeError: After the recorded chunks, if the stream was interrupted
+        """
+        entry = self._next("llm", key)
+        started = time.monotonic()
+        for chunk, offset in zip(entry["chunks"], entry["offsets"]):
+            wait = self._replay_wait(offset, started)
+            if wait > 0:
+                time.sleep(wait)
+            yield chunk
+        if entry.get("error"):
+            raise RuntimeError(entry["error"])
+
+    async def areplay_llm(self, key: str) -> AsyncIterator[str]:
+        """Asyncio counterpart of replay_llm (realtime waits do not block the loop)."""
+        entry = self._next("llm", key)
+        started = time.monotonic()
+        for chunk, offset in zip(entry["chunks"], entry["offsets"]):
+            wait = self._replay_wait(offset, started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield chunk
+        if entry.get("error"):
+            raise RuntimeError(entry["error"])
+
+    def _replay_wait(self, offset: float, started: float) -> float:
+        """Seconds to wait before replaying a chunk recorded at `offset`."""
+        if not self.realtime:
+            return 0.0
+        return offset - (time.monotonic() - started)
+
+    # ===== Search =====
+
+    def record_search(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Record the formatted results of one search query."""
+        self._append({"kind": "search", "key": key, "results": results})
+
+    def replay_search(self, key: str) -> List[Dict[str, Any]]:
+        """
+        Replay recorded search results.
+
+        Raises:
+            CassetteMissError: If the query was not recorded
+        """
+        return self._next("search", key)["results"]
+
+    # ===== Form =====
+
+    def record_form(self, form_data: Dict[str, Any]) -> None:
+        """Record the submitted form so replays skip the interactive prompts."""
+        self._append({"kind": "form", "form_data": form_data})
+
+    def save(self) -> str:
+        """
+        Write recorded interactions to disk (record mode only).
+
+        Returns:
+            Cassette path
+        """
+        if not self.recording:
+            return str(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            entries = list(self._recorded)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "created": time.time()}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return str(self.path)
+
+
+# Active cassette (None when neither recording nor replaying)
+_active_cassette: Optional[Cassette] = None
+
+
+def use_cassette(cassette: Optional[Cassette]) -> None:
+    """Activate a cassette for all LLM and search calls (None deactivates)."""
+    global _active_cassette
+    _active_cassette = cassette
+
+
+def get_active_cassette() -> Optional[Cassette]:
+    """The currently active cassette, if any."""
+    return _active_cassette
@@ -0,0 +1,438 @@
+"""
+Persistent LangGraph checkpointer backed by SQLite
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, AsyncIterator, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+
+# Serialized values larger than this are stored zlib-compressed
+COMPRESS_MIN_BYTES = 2048
+_COMPRESSED_SUFFIX = "+zlib"
+
+
+class SqliteCheckpointer(BaseCheckpointSaver):
+    """
+    Checkpoint saver that keeps every run (LangGraph thread) in a SQLite file,
+    so an interrupted run can be resumed by another process.
+
+    Channel values are stored once per channel version rather than inside
+    each checkpoint: a checkpoint only references versions, and a step only
+    writes the channels it changed. Large values such as the accumulated
+    search results are therefore serialized when a node updates them, not
+    on every step, and big blobs are compressed.
+
+    langgraph-checkpoint-sqlite's SqliteSaver is not used because it
+    serializes the whole state into every checkpoint and its async methods
+    need a separate aiosqlite saver, while one instance here serves both
+    the sync and the async graphs.
+    """
+
+    def __init__(self, path: str = ".cache/checkpoints.sqlite3", max_runs: int = 50):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            path: SQLite database file
+            max_runs: Maximum number of runs kept (oldest removed first, 0 keeps all)
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_runs = max_runs
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                parent_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                version TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints(created_at);
+            """
+        )
+        self._conn.commit()
+
+    # ----- serialization -----
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(data)
+            if len(compressed) < len(data):
+                return type_ + _COMPRESSED_SUFFIX, compressed
+        return type_, data
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(_COMPRESSED_SUFFIX):
+            type_ = type_[:-len(_COMPRESSED_SUFFIX)]
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # ----- reads -----
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint: the one named by `checkpoint_id` in the config, or
+        the latest checkpoint of the thread.
+
+        Returns:
+            The checkpoint tuple, or None if the thread has no checkpoint
+        """
+        configurable = config["configurable"]
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: List[Any] = [configurable["thread_id"], configurable.get("checkpoint_ns", "")]
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first.
+
+        Args:
+            config: Restrict to a thread (and namespace / checkpoint id)
+            filter: Metadata key/value pairs that must match
+            before: Only checkpoints older than this one
+            limit: Maximum number of checkpoints
+        """
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata "
+            "FROM checkpoints"
+        )
+        clauses: List[str] = []
+        params: List[Any] = []
+        if config:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(configurable["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        for row in rows:
+            if filter:
+                metadata = json.loads(row[6])
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            with self._lock:
+                checkpoint_tuple = self._tuple(row)
+            yield checkpoint_tuple
+
+    def _tuple(self, row: tuple) -> CheckpointTuple:
+        """Build a CheckpointTuple from a checkpoints row (lock held)."""
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, data, metadata = row
+        checkpoint = self._load(type_, data)
+
+        channel_values: Dict[str, Any] = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._conn.execute(
+                "SELECT type, value FROM checkpoint_blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob and blob[0] != "empty":
+                channel_values[channel] = self._load(*blob)
+
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=json.loads(metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._load(type_, value))
+                for task_id, channel, type_, value in writes
+            ],
+        )
+
+    # ----- writes -----
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint. Only the channels in `new_versions` (those changed
+        since the previous checkpoint) are serialized.
+
+        Returns:
+            Config pointing at the saved checkpoint
+        """
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+
+        checkpoint = checkpoint.copy()
+        values: Dict[str, Any] = checkpoint.pop("channel_values")  # type: ignore[misc]
+        blobs = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self._dump(values[channel]) if channel in values else ("empty", None)))
+            for channel, version in new_versions.items()
+        ]
+        type_, data = self._dump(checkpoint)
+        metadata_json = json.dumps(
+            get_serializable_checkpoint_metadata(config, metadata),
+            ensure_ascii=False,
+            default=str,
+        )
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_blobs "
+                "(thread_id, checkpoint_ns, channel, version, type, value) VALUES (?, ?, ?, ?, ?, ?)",
+                blobs,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_id, type_, data,
+                 metadata_json, time.time()),
+            )
+            if parent_id is None and not checkpoint_ns:
+                self._evict_runs()
+            self._conn.commit()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save the writes of a finished task (kept until the next checkpoint)."""
+        configurable = config["configurable"]
+        key = (
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+        )
+        rows = [
+            (*key, task_id, WRITES_IDX_MAP.get(channel, idx), channel, *self._dump(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock:
+            # Special writes (errors, interrupts) overwrite; regular writes are saved once
+            for upsert, special in (("REPLACE", True), ("IGNORE", False)):
+                self._conn.executemany(
+                    f"INSERT OR {upsert} INTO checkpoint_writes "
+                    "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for row in rows if (row[4] < 0) == special],
+                )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Remove all checkpoints, channel values and writes of a run."""
+        with self._lock:
+            self._delete_threads([thread_id])
+            self._conn.commit()
+
+    def _delete_threads(self, thread_ids: List[str]) -> None:
+        for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in thread_ids]
+            )
+
+    def _evict_runs(self) -> None:
+        """Drop the oldest runs beyond max_runs (lock held)."""
+        if self.max_runs <= 0:
+            return
+        rows = self._conn.execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+            "ORDER BY MAX(created_at) DESC LIMIT -1 OFFSET ?",
+            (self.max_runs,),
+        ).fetchall()
+        if rows:
+            self._delete_threads([row[0] for row in rows])
+
+    # ----- async variants (SQLite calls run in a worker thread so they do not block the loop) -----
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Monotonic string versions ("<counter>.<random>") that sort correctly."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+# Global checkpointer instance (lazy initialization)
+_global_checkpointer: Optional[SqliteCheckpointer] = None
+
+
+def get_checkpointer() -> Optional[SqliteCheckpointer]:
+    """
+    Get or create the global SqliteCheckpointer instance.
+
+    Controlled by CHECKPOINT_ENABLED, CHECKPOINT_PATH and CHECKPOINT_MAX_RUNS
+    environment variables.
+
+    Returns:
+        Shared SqliteCheckpointer instance, or None when checkpointing is disabled
+    """
+    global _global_checkpointer
+    if os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+    if _global_checkpointer is None:
+        _global_checkpointer = SqliteCheckpointer(
+            path=os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite3"),
+            max_runs=int(os.getenv("CHECKPOINT_MAX_RUNS", 50)),
+        )
+    return _global_checkpointer
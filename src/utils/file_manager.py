@@ -22,6 +22,36 @@ class FileManager:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    def document_path(
+        self,
+        project_name: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> Path:
+        """
+        Build the output path for a new document.
+        
+        Args:
+            project_name: Optional project name for filename
+            filename: Optional custom filename (overrides project_name)
+            
+        Returns:
+            Path inside the output directory
+        """
+        if filename:
+            return self.output_dir / filename
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if project_name:
+            # Sanitize project name for filename
+            safe_name = "".join(
+                c for c in project_name if c.isalnum() or c in (' ', '-', '_')
+            ).strip().replace(' ', '_')
+            filename = f"tech_stack_{safe_name}_{timestamp}.md"
+        else:
+            filename = f"tech_stack_{timestamp}.md"
+        
+        return self.output_dir / filename
+    
     def save_document(
         self,
         content: str,
@@ -39,20 +69,7 @@ class FileManager:
         Returns:
             Full path to saved file
         """
-        if filename:
-            file_path = self.output_dir / filename
-        else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            if project_name:
-                # Sanitize project name for filename
-                safe_name = "".join(
-                    c for c in project_name if c.isalnum() or c in (' ', '-', '_')
-                ).strip().replace(' ', '_')
-                filename = f"tech_stack_{safe_name}_{timestamp}.md"
-            else:
-                filename = f"tech_stack_{timestamp}.md"
-            
-            file_path = self.output_dir / filename
+        file_path = self.document_path(project_name, filename)
         
         # Save file
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -60,6 +77,56 @@ class FileManager:
         
         return str(file_path.absolute())
     
+    def open_document(
+        self,
+        project_name: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> "DocumentSink":
+        """
+        Open a document for incremental writing.
+        
+        Content goes to "<name>.md.part" until finalize_document() renames it.
+        Concurrent runs that would get the same name (same project and
+        second) get a numeric suffix instead of sharing a file.
+        
+        Args:
+            project_name: Optional project name for filename
+            filename: Optional custom filename, may include subdirectories
+                of the output directory (overrides project_name)
+            
+        Returns:
+            Open DocumentSink
+        """
+        base = self.document_path(project_name, filename)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        candidate = base
+        for attempt in range(2, 1000):
+            if not candidate.exists():
+                try:
+                    return DocumentSink(candidate)
+                except FileExistsError:
+                    pass
+            candidate = base.with_name(f"{base.stem}_{attempt}{base.suffix}")
+        raise FileExistsError(f"No free document name for {base}")
+    
+    @staticmethod
+    def finalize_document(path: str) -> str:
+        """
+        Move a streamed document from its ".part" file to the final name.
+        
+        Args:
+            path: Partial (or already final) document path
+            
+        Returns:
+            Full path to the final file
+        """
+        file_path = Path(path)
+        if file_path.suffix == DocumentSink.PARTIAL_SUFFIX:
+            final_path = file_path.with_suffix("")
+            file_path.replace(final_path)
+            file_path = final_path
+        return str(file_path.absolute())
+    
     def load_template(self, template_name: str) -> str:
         """
         Load a template file.
@@ -91,6 +158,56 @@ class FileManager:
         return [f.name for f in self.output_dir.glob("*.md")]
 
 
+class DocumentSink:
+    """
+    Append-only writer for a document that is generated chunk by chunk.
+    
+    Chunks are flushed as they arrive so the file can be followed while
+    it is written and the full document never has to be held in memory.
+    """
+    
+    PARTIAL_SUFFIX = ".part"
+    
+    def __init__(self, final_path: Path):
+        """
+        Args:
+            final_path: Path the document gets once finalized
+        """
+        self.final_path = final_path
+        self.path = final_path.with_name(final_path.name + self.PARTIAL_SUFFIX)
+        self.chars = 0
+        # Exclusive create: two writers never share a partial file
+        self._file = open(self.path, 'x', encoding='utf-8')
+    
+    def write(self, chunk: str) -> None:
+        self._file.write(chunk)
+        self._file.flush()
+        self.chars += len(chunk)
+    
+    def read(self) -> str:
+        """Everything written so far (e.g. to resume an interrupted stream)."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def reset(self, content: str = "") -> None:
+        """Discard everything written so far (e.g. to write a fallback instead)."""
+        self._file.seek(0)
+        self._file.truncate()
+        self.chars = 0
+        if content:
+            self.write(content)
+    
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+    
+    def __enter__(self) -> "DocumentSink":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 # Global file manager instance
 _global_file_manager: Optional[FileManager] = None
 
@@ -0,0 +1,79 @@
+"""
+Live terminal preview of a document while it streams in
+"""
+from typing import Optional
+
+from rich.console import Console, RenderableType
+from rich.errors import LiveError
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+
+class LivePreview:
+    """
+    Shows the last lines of a streaming document in a Rich Live panel.
+
+    Chunks only update a bounded tail buffer; rendering happens on Live's
+    refresh thread at `refresh_per_second`, so fast token streams do not
+    redraw the terminal on every chunk. Outside a terminal, or while another
+    preview already owns the console (concurrent sessions), this is a no-op.
+    """
+
+    TAIL_CHARS = 4000
+
+    def __init__(
+        self,
+        console: Console,
+        title: str = "生成中",
+        max_lines: int = 20,
+        refresh_per_second: float = 4.0,
+    ):
+        """
+        Args:
+            console: Console to render on
+            title: Panel title
+            max_lines: Number of trailing lines shown
+            refresh_per_second: Maximum redraw rate
+        """
+        self.console = console
+        self.title = title
+        self.max_lines = max_lines
+        self.refresh_per_second = refresh_per_second
+        self.chars = 0
+        self._tail = ""
+        self._live: Optional[Live] = None
+
+    def feed(self, chunk: str) -> None:
+        """Add a streamed chunk to the preview."""
+        self.chars += len(chunk)
+        self._tail = (self._tail + chunk)[-self.TAIL_CHARS:]
+
+    def __rich__(self) -> RenderableType:
+        lines = self._tail.splitlines()[-self.max_lines:]
+        return Panel(
+            Text("\n".join(lines)),
+            title=f"{self.title} · {self.chars} 字符",
+            title_align="left",
+            border_style="dim",
+        )
+
+    def __enter__(self) -> "LivePreview":
+        if self.console.is_terminal:
+            live = Live(
+                self,
+                console=self.console,
+                refresh_per_second=self.refresh_per_second,
+                transient=True,
+            )
+            try:
+                live.start()
+                self._live = live
+            except LiveError:
+                pass
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
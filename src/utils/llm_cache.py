@@ -0,0 +1,191 @@
+"""
+Persistent LLM response cache backed by SQLite
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+
+class LLMCache:
+    """
+    On-disk cache for LLM responses.
+
+    Entries are keyed on a hash of everything that determines the completion
+    (model, sampling parameters, system message and prompt). Responses are
+    stored as the list of chunks they were produced in, so streamed documents
+    can be replayed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/llm_cache.sqlite3",
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 500,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Entry lifetime in seconds (0 disables expiry)
+            max_entries: Maximum number of entries kept (least recently used evicted first)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                chunks TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        system_message: Optional[str],
+        prompt: str,
+    ) -> str:
+        """
+        Build a cache key from the request parameters.
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(
+            [model, temperature, max_tokens, system_message or "", prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            List of response chunks, or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunks, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            chunks_json, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(chunks_json)
+
+    def set(self, key: str, chunks: List[str]) -> None:
+        """
+        Store a response and evict least recently used entries beyond max_entries.
+
+        Args:
+            key: Cache key from make_key
+            chunks: Response chunks (a single-element list for non-streamed calls)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, chunks, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(chunks, ensure_ascii=False), now, now),
+            )
+            if self.max_entries > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+# Global cache instance (lazy initialization)
+_global_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Get or create the global LLMCache instance.
+
+    Controlled by LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL and
+    LLM_CACHE_MAX_ENTRIES environment variables. DeepseekClient bypasses the
+    cache while a cassette is recording or replaying.
+
+    Returns:
+        Shared LLMCache instance, or None when caching is disabled
+    """
+    global _global_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+    if _global_cache is None:
+        _global_cache = LLMCache(
+            path=os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3"),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 500)),
+        )
+    return _global_cache
@@ -1,12 +1,35 @@
 """
 LLM Client for Deepseek API
 """
+import asyncio
 import os
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage
 from dotenv import load_dotenv
 
+from src.utils.cassette import get_active_cassette
+from src.utils.llm_cache import LLMCache, get_llm_cache
+from src.utils.rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+    is_rate_limit_error,
+    retry_after_from_exception,
+)
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+    get_circuit_breaker,
+    next_retry_delay,
+)
+from src.utils.tokens import estimate_tokens
+from src.utils.tracing import Span, get_tracer
+
 # Load environment variables
 load_dotenv()
 
@@ -15,7 +38,8 @@ class DeepseekClient:
     """
     Wrapper for Deepseek API using LangChain's ChatOpenAI.
     
-    This client provides both synchronous and streaming responses.
+    This client provides both synchronous and streaming responses, each with
+    an asyncio counterpart (ainvoke/astream).
     """
     
     def __init__(
@@ -24,17 +48,34 @@ class DeepseekClient:
         model: str = "deepseek-chat",
         temperature: float = 0.7,
         max_tokens: int = 4000,
+        base_url: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         """
         Initialize Deepseek client.
         
         Args:
-            api_key: Deepseek API key (defaults to DEEPSEEK_API_KEY env var)
+            api_key: Deepseek API key (defaults to DEEPSEEK_API_KEY env var; not
+                needed while a cassette is replaying)
             model: Model name (defaults to deepseek-chat)
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens in response
+            base_url: OpenAI-compatible endpoint (defaults to DEEPSEEK_BASE_URL env var,
+                then https://api.deepseek.com)
+            cache: Optional response cache (defaults to the global LLM cache)
+            rate_limiter: Optional rate limiter (defaults to the shared "deepseek" limiter,
+                unlimited until a 429 unless DEEPSEEK_RPM / DEEPSEEK_TPM is set)
+            retry_policy: Optional retry policy (defaults to DEEPSEEK_MAX_RETRIES etc.)
+            circuit_breaker: Optional circuit breaker (defaults to the shared "deepseek" breaker)
         """
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
+        cassette = get_active_cassette()
+        if not self.api_key and cassette is not None and cassette.replaying:
+            # Replays never reach the API; ChatOpenAI still wants a non-empty key
+            self.api_key = "replay"
         if not self.api_key:
             raise ValueError(
                 "DEEPSEEK_API_KEY not found. Please set it in .env file or pass as parameter."
@@ -43,14 +84,151 @@ class DeepseekClient:
         self.model = model or os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
         self.temperature = float(os.getenv("DEEPSEEK_TEMPERATURE", temperature))
         self.max_tokens = int(os.getenv("DEEPSEEK_MAX_TOKENS", max_tokens))
+        self.base_url = base_url or os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+        # Per-attempt timeout; the retry policy's deadline caps it further
+        self.timeout = float(os.getenv("DEEPSEEK_TIMEOUT", 120))
         
         self.llm = ChatOpenAI(
             model=self.model,
             api_key=self.api_key,
-            base_url="https://api.deepseek.com",
+            base_url=self.base_url,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            timeout=self.timeout,
+            # Retries are handled by retry_policy below
+            max_retries=0,
+            # Report token usage on the final stream chunk for tracing
+            stream_usage=True,
+        )
+        
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.rate_limiter = rate_limiter or get_rate_limiter("deepseek")
+        self.retry_policy = retry_policy or RetryPolicy.from_env("DEEPSEEK")
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker("deepseek")
+    
+    def _request_key(self, prompt: str, system_message: Optional[str]) -> str:
+        """Hash identifying a request (shared by the response cache and cassettes)."""
+        return LLMCache.make_key(
+            self.model, self.temperature, self.max_tokens, system_message, prompt
+        )
+    
+    def _cache_key(self, prompt: str, system_message: Optional[str]) -> Optional[str]:
+        """
+        Build the response cache key, or None when caching is disabled.
+        
+        The cache is bypassed while a cassette is active (like the search and
+        node caches), so recordings only contain live responses.
+        """
+        if self.cache is None or get_active_cassette() is not None:
+            return None
+        return self._request_key(prompt, system_message)
+    
+    def _request_tokens(self, prompt: str, system_message: Optional[str]) -> int:
+        """Estimated prompt tokens charged against the TPM bucket up front."""
+        return estimate_tokens(prompt) + estimate_tokens(system_message or "")
+    
+    def _on_api_success(
+        self,
+        span: Span,
+        prompt_tokens: int,
+        content: str,
+        usage: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Record token usage on the span, charge completion tokens and let the
+        limiter recover its rate.
+        
+        Args:
+            span: Tracing span of the call
+            prompt_tokens: Estimated prompt tokens (used when usage is missing)
+            content: Full response text
+            usage: LangChain usage_metadata, if the API reported it
+        """
+        if usage:
+            span.set_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        else:
+            span.set_usage(prompt_tokens, estimate_tokens(content), estimated=True)
+        self.rate_limiter.settle(span.completion_tokens)
+        self.rate_limiter.on_success()
+    
+    def _on_api_error(self, error: Exception) -> None:
+        """Feed 429 responses back into the limiter."""
+        if is_rate_limit_error(error):
+            self.rate_limiter.on_rate_limited(retry_after_from_exception(error))
+    
+    async def _off_loop(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a limiter feedback call from async code, in a worker thread when
+        the limiter state is shared through SQLite.
+        """
+        if self.rate_limiter.shared:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+    
+    def _trace_cache_hit(
+        self,
+        operation: str,
+        prompt: str,
+        system_message: Optional[str],
+    ) -> None:
+        """Record a zero-cost span for a response served from the cache."""
+        with get_tracer().span(operation, "llm", model=self.model, cache_hit=True) as span:
+            span.prompt_chars = len(prompt) + len(system_message or "")
+            span.ttft = 0.0
+    
+    @staticmethod
+    def _build_messages(prompt: str, system_message: Optional[str]) -> List[BaseMessage]:
+        """Build the message list for a single-turn call."""
+        messages: List[BaseMessage] = []
+        
+        if system_message:
+            messages.append(SystemMessage(content=system_message))
+        
+        messages.append(HumanMessage(content=prompt))
+        return messages
+    
+    def _invoke_messages(
+        self,
+        messages: List[BaseMessage],
+        tokens: int,
+        operation: str,
+    ) -> str:
+        """Invoke with tracing, rate limiting, retries and circuit breaking."""
+        with get_tracer().span(operation, "llm", model=self.model) as span:
+            span.prompt_chars = sum(len(str(m.content)) for m in messages)
+            return self._invoke_traced(span, messages, tokens, operation)
+    
+    def _invoke_traced(
+        self,
+        span: Span,
+        messages: List[BaseMessage],
+        tokens: int,
+        operation: str,
+    ) -> str:
+        started = time.monotonic()
+        
+        def attempt(timeout: Optional[float]):
+            self.rate_limiter.acquire(tokens)
+            try:
+                return self.llm.invoke(messages, timeout=timeout)
+            except Exception as e:
+                self._on_api_error(e)
+                raise
+        
+        try:
+            response = call_with_retry(
+                attempt, self.retry_policy, self.circuit_breaker, operation, self.timeout
+            )
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Deepseek API call failed: {str(e)}")
+        
+        span.ttft = time.monotonic() - started
+        self._on_api_success(
+            span, tokens, response.content, getattr(response, "usage_metadata", None)
         )
+        return response.content
     
     def invoke(
         self,
@@ -60,6 +238,9 @@ class DeepseekClient:
         """
         Synchronously invoke the LLM.
         
+        Transient errors are retried with jittered exponential backoff within
+        the retry policy's deadline.
+        
         Args:
             prompt: User prompt
             system_message: Optional system message for context
@@ -67,18 +248,38 @@ class DeepseekClient:
         Returns:
             Generated text response
         """
-        messages: List[BaseMessage] = []
+        cassette = get_active_cassette()
+        if cassette and cassette.replaying:
+            return "".join(cassette.replay_llm(self._request_key(prompt, system_message)))
         
-        if system_message:
-            messages.append(SystemMessage(content=system_message))
+        started = time.monotonic()
+        content = self._invoke_impl(prompt, system_message)
         
-        messages.append(HumanMessage(content=prompt))
+        if cassette:
+            cassette.record_llm(
+                self._request_key(prompt, system_message),
+                [content],
+                [time.monotonic() - started],
+            )
+        return content
+    
+    def _invoke_impl(self, prompt: str, system_message: Optional[str]) -> str:
+        cache_key = self._cache_key(prompt, system_message)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._trace_cache_hit("deepseek.invoke", prompt, system_message)
+                return "".join(cached)
         
-        try:
-            response = self.llm.invoke(messages)
-            return response.content
-        except Exception as e:
-            raise RuntimeError(f"Deepseek API call failed: {str(e)}")
+        content = self._invoke_messages(
+            self._build_messages(prompt, system_message),
+            self._request_tokens(prompt, system_message),
+            "deepseek.invoke",
+        )
+        
+        if cache_key:
+            self.cache.set(cache_key, [content])
+        return content
     
     def stream(
         self,
@@ -88,26 +289,281 @@ class DeepseekClient:
         """
         Stream responses from the LLM.
         
+        A connection that fails before the first chunk is retried like
+        invoke(); a failure after chunks were yielded is raised.
+        
         Args:
             prompt: User prompt
             system_message: Optional system message for context
             
         Yields:
-            Text chunks as they arrive
+            Text chunks as they arrive (replayed chunk by chunk on cache hit)
         """
-        messages: List[BaseMessage] = []
+        cassette = get_active_cassette()
+        if cassette and cassette.replaying:
+            yield from cassette.replay_llm(self._request_key(prompt, system_message))
+            return
         
-        if system_message:
-            messages.append(SystemMessage(content=system_message))
+        started = time.monotonic()
+        chunks: List[str] = []
+        offsets: List[float] = []
+        try:
+            for chunk in self._stream_impl(prompt, system_message):
+                if cassette:
+                    chunks.append(chunk)
+                    offsets.append(time.monotonic() - started)
+                yield chunk
+        except RuntimeError as e:
+            # Interrupted streams are recorded too, so replays resume the same way
+            if cassette and chunks:
+                cassette.record_llm(self._request_key(prompt, system_message), chunks, offsets, str(e))
+            raise
         
-        messages.append(HumanMessage(content=prompt))
+        if cassette:
+            cassette.record_llm(self._request_key(prompt, system_message), chunks, offsets)
+    
+    def _stream_impl(self, prompt: str, system_message: Optional[str]):
+        cache_key = self._cache_key(prompt, system_message)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._trace_cache_hit("deepseek.stream", prompt, system_message)
+                yield from cached
+                return
+        
+        messages = self._build_messages(prompt, system_message)
+        tokens = self._request_tokens(prompt, system_message)
+        
+        with get_tracer().span("deepseek.stream", "llm", model=self.model) as span:
+            span.prompt_chars = len(prompt) + len(system_message or "")
+            started = time.monotonic()
+            attempt = 0
+            
+            while True:
+                attempt += 1
+                chunks: List[str] = []
+                usage = None
+                try:
+                    self.circuit_breaker.before_call()
+                    timeout = self.retry_policy.attempt_timeout(started, self.timeout)
+                    self.rate_limiter.acquire(tokens)
+                    for chunk in self.llm.stream(messages, timeout=timeout):
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if getattr(chunk, 'content', None):
+                            span.mark_first_token(started)
+                            chunks.append(chunk.content)
+                            yield chunk.content
+                    break
+                except Exception as e:
+                    delay = self._stream_failure(e, chunks, attempt, started)
+                    time.sleep(delay)
+            
+            self.circuit_breaker.record_success()
+            self._on_api_success(span, tokens, "".join(chunks), usage)
+        
+        # Only complete streams are cached
+        if cache_key:
+            self.cache.set(cache_key, chunks)
+    
+    def _stream_failure(
+        self,
+        error: Exception,
+        chunks: List[str],
+        attempt: int,
+        started: float,
+    ) -> float:
+        """
+        Handle a failed streaming attempt.
+        
+        Returns:
+            Seconds to wait before retrying
+            
+        Raises:
+            RuntimeError: If the stream cannot be retried
+        """
+        if isinstance(error, CircuitOpenError):
+            raise RuntimeError(f"Deepseek API streaming failed: {str(error)}")
+        
+        self._on_api_error(error)
+        error = self.retry_policy.deadline_error(started, error)
+        self.circuit_breaker.record_error(error)
+        
+        delay = None
+        if not chunks:
+            delay = next_retry_delay(
+                self.retry_policy, "deepseek.stream", attempt, started, error
+            )
+        if delay is None:
+            raise RuntimeError(f"Deepseek API streaming failed: {str(error)}")
+        return delay
+    
+    async def ainvoke(
+        self,
+        prompt: str,
+        system_message: Optional[str] = None,
+    ) -> str:
+        """
+        Asynchronously invoke the LLM.
+        
+        Args:
+            prompt: User prompt
+            system_message: Optional system message for context
+            
+        Returns:
+            Generated text response
+        """
+        cassette = get_active_cassette()
+        if cassette and cassette.replaying:
+            return "".join([
+                chunk async for chunk in cassette.areplay_llm(self._request_key(prompt, system_message))
+            ])
+        
+        started = time.monotonic()
+        content = await self._ainvoke_impl(prompt, system_message)
+        
+        if cassette:
+            cassette.record_llm(
+                self._request_key(prompt, system_message),
+                [content],
+                [time.monotonic() - started],
+            )
+        return content
+    
+    async def _ainvoke_impl(self, prompt: str, system_message: Optional[str]) -> str:
+        # Cache reads and writes are blocking SQLite calls, run off the event loop
+        cache_key = self._cache_key(prompt, system_message)
+        if cache_key:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self._trace_cache_hit("deepseek.ainvoke", prompt, system_message)
+                return "".join(cached)
+        
+        messages = self._build_messages(prompt, system_message)
+        tokens = self._request_tokens(prompt, system_message)
+        
+        with get_tracer().span("deepseek.ainvoke", "llm", model=self.model) as span:
+            span.prompt_chars = len(prompt) + len(system_message or "")
+            content = await self._ainvoke_traced(span, messages, tokens)
+        
+        if cache_key:
+            await asyncio.to_thread(self.cache.set, cache_key, [content])
+        return content
+    
+    async def _ainvoke_traced(
+        self,
+        span: Span,
+        messages: List[BaseMessage],
+        tokens: int,
+    ) -> str:
+        started = time.monotonic()
+        
+        async def attempt(timeout: Optional[float]):
+            await self.rate_limiter.aacquire(tokens)
+            try:
+                return await self.llm.ainvoke(messages, timeout=timeout)
+            except Exception as e:
+                await self._off_loop(self._on_api_error, e)
+                raise
         
         try:
-            for chunk in self.llm.stream(messages):
-                if hasattr(chunk, 'content'):
-                    yield chunk.content
+            response = await acall_with_retry(
+                attempt, self.retry_policy, self.circuit_breaker, "deepseek.ainvoke", self.timeout
+            )
+        except DeadlineExceededError:
+            raise
         except Exception as e:
-            raise RuntimeError(f"Deepseek API streaming failed: {str(e)}")
+            raise RuntimeError(f"Deepseek API call failed: {str(e)}")
+        
+        span.ttft = time.monotonic() - started
+        await self._off_loop(
+            self._on_api_success, span, tokens, response.content, getattr(response, "usage_metadata", None)
+        )
+        return response.content
+    
+    async def astream(
+        self,
+        prompt: str,
+        system_message: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronously stream responses from the LLM.
+        
+        Args:
+            prompt: User prompt
+            system_message: Optional system message for context
+            
+        Yields:
+            Text chunks as they arrive (replayed chunk by chunk on cache hit)
+        """
+        cassette = get_active_cassette()
+        if cassette and cassette.replaying:
+            async for chunk in cassette.areplay_llm(self._request_key(prompt, system_message)):
+                yield chunk
+            return
+        
+        started = time.monotonic()
+        chunks: List[str] = []
+        offsets: List[float] = []
+        try:
+            async for chunk in self._astream_impl(prompt, system_message):
+                if cassette:
+                    chunks.append(chunk)
+                    offsets.append(time.monotonic() - started)
+                yield chunk
+        except RuntimeError as e:
+            if cassette and chunks:
+                cassette.record_llm(self._request_key(prompt, system_message), chunks, offsets, str(e))
+            raise
+        
+        if cassette:
+            cassette.record_llm(self._request_key(prompt, system_message), chunks, offsets)
+    
+    async def _astream_impl(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+    ) -> AsyncIterator[str]:
+        cache_key = self._cache_key(prompt, system_message)
+        if cache_key:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self._trace_cache_hit("deepseek.astream", prompt, system_message)
+                for chunk in cached:
+                    yield chunk
+                return
+        
+        messages = self._build_messages(prompt, system_message)
+        tokens = self._request_tokens(prompt, system_message)
+        
+        with get_tracer().span("deepseek.astream", "llm", model=self.model) as span:
+            span.prompt_chars = len(prompt) + len(system_message or "")
+            started = time.monotonic()
+            attempt = 0
+            
+            while True:
+                attempt += 1
+                chunks: List[str] = []
+                usage = None
+                try:
+                    self.circuit_breaker.before_call()
+                    timeout = self.retry_policy.attempt_timeout(started, self.timeout)
+                    await self.rate_limiter.aacquire(tokens)
+                    async for chunk in self.llm.astream(messages, timeout=timeout):
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if getattr(chunk, 'content', None):
+                            span.mark_first_token(started)
+                            chunks.append(chunk.content)
+                            yield chunk.content
+                    break
+                except Exception as e:
+                    delay = await self._off_loop(self._stream_failure, e, chunks, attempt, started)
+                    await asyncio.sleep(delay)
+            
+            self.circuit_breaker.record_success()
+            await self._off_loop(self._on_api_success, span, tokens, "".join(chunks), usage)
+        
+        if cache_key:
+            await asyncio.to_thread(self.cache.set, cache_key, chunks)
     
     def invoke_with_messages(self, messages: List[BaseMessage]) -> str:
         """
@@ -119,11 +575,8 @@ class DeepseekClient:
         Returns:
             Generated text response
         """
-        try:
-            response = self.llm.invoke(messages)
-            return response.content
-        except Exception as e:
-            raise RuntimeError(f"Deepseek API call failed: {str(e)}")
+        tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        return self._invoke_messages(messages, tokens, "deepseek.invoke_with_messages")
     
     def get_llm(self) -> ChatOpenAI:
         """
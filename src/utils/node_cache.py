@@ -0,0 +1,247 @@
+"""
+Content-addressed memoization of workflow node outputs backed by SQLite
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+from src.utils.cassette import get_active_cassette
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Normalize node inputs so that insignificant differences hash alike:
+    strings are stripped with runs of whitespace collapsed, and dict keys
+    are sorted when serialized.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): canonicalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    return value
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Hash of everything besides the inputs that determines a node's output:
+    prompt templates (which embed selection_guide.md), model settings,
+    search backend. Editing any of them changes the fingerprint and
+    invalidates the node's cached entries.
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps([str(part) for part in parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NodeCache:
+    """
+    On-disk cache for node outputs (analysis, search keywords, search results).
+
+    Entries are keyed on a hash of the node name, its fingerprint and its
+    canonicalized inputs. Each entry remembers the work it stands for (LLM
+    calls, searches) so that hits can be reported as saved calls. The store
+    is bounded by total size; least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/node_cache.sqlite3",
+        ttl_seconds: float = 24 * 3600,
+        max_bytes: int = 20 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Entry lifetime in seconds (0 disables expiry)
+            max_bytes: Maximum total size of stored values (0 = unbounded)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS node_cache (
+                key TEXT PRIMARY KEY,
+                node TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                cost TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_node_cache_access ON node_cache(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(node: str, node_fingerprint: str, inputs: Any) -> str:
+        """
+        Build a cache key from a node name, its fingerprint and its inputs.
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(
+            [node, node_fingerprint, canonicalize(inputs)],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, node: str, name: str, amount: int = 1) -> None:
+        counters = self._counters.setdefault(node, {"hits": 0, "misses": 0})
+        counters[name] = counters.get(name, 0) + amount
+
+    def get(self, node: str, node_fingerprint: str, inputs: Any) -> Tuple[str, Optional[Any]]:
+        """
+        Look up a node output.
+
+        Args:
+            node: Node (or step) name, e.g. "analyze"
+            node_fingerprint: Fingerprint from fingerprint()
+            inputs: Exact inputs the node consumes
+
+        Returns:
+            (cache key, cached value or None on miss/expiry)
+        """
+        key = self.make_key(node, node_fingerprint, inputs)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, cost, created_at FROM node_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds and now - row[2] > self.ttl_seconds):
+                if row is not None:
+                    self._conn.execute("DELETE FROM node_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self._count(node, "misses")
+                return key, None
+
+            self._conn.execute(
+                "UPDATE node_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._count(node, "hits")
+            for name, amount in json.loads(row[1]).items():
+                self._count(node, f"saved_{name}", amount)
+
+        return key, json.loads(row[0])
+
+    def set(
+        self,
+        node: str,
+        node_fingerprint: str,
+        key: str,
+        value: Any,
+        cost: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Store a node output. Entries of the same node with an older
+        fingerprint are dropped, then the store is trimmed to max_bytes.
+
+        Args:
+            node: Node (or step) name
+            node_fingerprint: Fingerprint the value was produced under
+            key: Cache key returned by get()
+            value: JSON-serializable output
+            cost: Work the output stands for, e.g. {"llm_calls": 1} or {"searches": 8}
+        """
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM node_cache WHERE node = ? AND fingerprint != ?",
+                (node, node_fingerprint),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO node_cache "
+                "(key, node, fingerprint, value, cost, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, node, node_fingerprint, data, json.dumps(cost or {}),
+                 len(data.encode("utf-8")), now, now),
+            )
+            if self.max_bytes > 0:
+                self._conn.execute(
+                    "DELETE FROM node_cache WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER "
+                    "(ORDER BY last_access DESC, key) AS total FROM node_cache) WHERE total > ?)",
+                    (self.max_bytes,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM node_cache")
+            self._conn.commit()
+            self._counters = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with per-node counters (hits, misses, saved_llm_calls,
+            saved_searches), their totals, entries and bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM node_cache"
+            ).fetchone()
+            nodes = {node: dict(counters) for node, counters in self._counters.items()}
+
+        totals: Dict[str, int] = {}
+        for counters in nodes.values():
+            for name, amount in counters.items():
+                totals[name] = totals.get(name, 0) + amount
+        return {"nodes": nodes, "totals": totals, "entries": entries, "bytes": size}
+
+
+# Global cache instance (lazy initialization)
+_global_node_cache: Optional[NodeCache] = None
+
+
+def get_node_cache() -> Optional[NodeCache]:
+    """
+    Get or create the global NodeCache instance.
+
+    Controlled by NODE_CACHE_ENABLED, NODE_CACHE_PATH, NODE_CACHE_TTL and
+    NODE_CACHE_MAX_BYTES environment variables. Disabled while a cassette is
+    recording or replaying, so that cassettes always contain every call.
+
+    Returns:
+        Shared NodeCache instance, or None when memoization is disabled
+    """
+    global _global_node_cache
+    if os.getenv("NODE_CACHE_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+    if get_active_cassette() is not None:
+        return None
+    if _global_node_cache is None:
+        _global_node_cache = NodeCache(
+            path=os.getenv("NODE_CACHE_PATH", ".cache/node_cache.sqlite3"),
+            ttl_seconds=float(os.getenv("NODE_CACHE_TTL", 24 * 3600)),
+            max_bytes=int(os.getenv("NODE_CACHE_MAX_BYTES", 20 * 1024 * 1024)),
+        )
+    return _global_node_cache
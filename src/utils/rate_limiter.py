@@ -0,0 +1,348 @@
+"""
+Token-bucket rate limiting for LLM and search calls
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+# A state transaction maps the current state to (new state, result)
+StateUpdate = Callable[[Optional[Dict[str, Any]]], Tuple[Dict[str, Any], Any]]
+
+
+class _LocalState:
+    """Bucket state held in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Any]] = None
+
+    def transact(self, fn: StateUpdate) -> Any:
+        with self._lock:
+            self._state, result = fn(self._state)
+        return result
+
+
+class _SQLiteState:
+    """
+    Bucket state stored in a SQLite file so several processes can share
+    one budget. Each update runs inside an exclusive write transaction.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.name = name
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+
+    def transact(self, fn: StateUpdate) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state FROM rate_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                state, result = fn(json.loads(row[0]) if row else None)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, state) VALUES (?, ?)",
+                    (self.name, json.dumps(state)),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets.
+
+    The effective rate adapts to provider feedback: a 429 halves it and
+    blocks callers until Retry-After has passed, each success raises it
+    again by a small step up to the configured limit (AIMD).
+
+    Without a configured RPM the limiter does not throttle at all until the
+    provider answers 429. It then learns a limit of half the request rate
+    observed over the last minute, which recovers additively on success and
+    is dropped once it is back at the rate that was throttled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        burst_seconds: float = 10.0,
+        shared_path: Optional[str] = None,
+        min_scale: float = 0.1,
+        recovery_step: float = 0.05,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            name: Limiter name (also the key of the shared state)
+            rpm: Requests per minute (0 = unlimited)
+            tpm: Tokens per minute (0 = unlimited)
+            burst_seconds: Bucket capacity expressed as seconds of full-rate traffic
+            shared_path: Optional SQLite file to share the buckets across processes
+            min_scale: Lowest fraction of the configured rate after repeated 429s
+            recovery_step: Fraction of the configured rate regained per success
+        """
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_seconds = burst_seconds
+        self.min_scale = min_scale
+        self.recovery_step = recovery_step
+        self._store = _SQLiteState(shared_path, name) if shared_path else _LocalState()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a limit is configured (a learned limit may apply regardless)."""
+        return self.rpm > 0 or self.tpm > 0
+
+    @property
+    def shared(self) -> bool:
+        """Whether bucket state lives in a SQLite file (every update is blocking I/O)."""
+        return isinstance(self._store, _SQLiteState)
+
+    def _request_rate(self, state: Dict[str, Any]) -> float:
+        """Effective requests per minute (0 = unlimited)."""
+        if self.rpm > 0:
+            return self.rpm * state["scale"]
+        return state.get("learned_rpm", 0.0)
+
+    def _capacity(self, per_minute: float) -> float:
+        return max(1.0, per_minute / 60.0 * self.burst_seconds)
+
+    def _refill(self, state: Optional[Dict[str, Any]], now: float) -> Dict[str, Any]:
+        if state is None:
+            return {
+                "requests": self._capacity(self.rpm),
+                "tokens": self._capacity(self.tpm),
+                "scale": 1.0,
+                "blocked_until": 0.0,
+                "updated": now,
+                "learned_rpm": 0.0,
+                "learned_ceiling": 0.0,
+                "window_start": now,
+                "window_requests": 0,
+            }
+        for key, value in (("learned_rpm", 0.0), ("learned_ceiling", 0.0), ("window_start", now), ("window_requests", 0)):
+            state.setdefault(key, value)
+        elapsed = max(0.0, now - state["updated"])
+        rate = self._request_rate(state)
+        state["requests"] = min(
+            self._capacity(rate), state["requests"] + elapsed * rate / 60.0
+        )
+        state["tokens"] = min(
+            self._capacity(self.tpm), state["tokens"] + elapsed * self.tpm * state["scale"] / 60.0
+        )
+        state["updated"] = now
+        return state
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if available; return seconds to wait otherwise."""
+
+        def update(state):
+            now = time.time()
+            state = self._refill(state, now)
+            if state["blocked_until"] > now:
+                return state, state["blocked_until"] - now
+
+            wait = 0.0
+            rate = self._request_rate(state)
+            if rate > 0 and state["requests"] < 1:
+                wait = max(wait, (1 - state["requests"]) * 60.0 / rate)
+            # Requests larger than the whole bucket are let through once it is full
+            needed = min(tokens, self._capacity(self.tpm))
+            if self.tpm > 0 and state["tokens"] < needed:
+                wait = max(wait, (needed - state["tokens"]) * 60.0 / (self.tpm * state["scale"]))
+            if wait > 0:
+                return state, wait
+
+            if rate > 0:
+                state["requests"] -= 1
+            if self.tpm > 0:
+                state["tokens"] -= tokens
+            if now - state["window_start"] > 60.0:
+                state["window_start"] = now
+                state["window_requests"] = 0
+            state["window_requests"] += 1
+            return state, 0.0
+
+        return self._store.transact(update)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request (and `tokens` tokens) may be sent.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """
+        Asyncio counterpart of acquire.
+
+        Shared state is updated in a worker thread so the SQLite write lock
+        never blocks the event loop.
+        """
+        waited = 0.0
+        while True:
+            if self.shared:
+                wait = await asyncio.to_thread(self._try_acquire, tokens)
+            else:
+                wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def settle(self, tokens: int) -> None:
+        """
+        Charge tokens that were only known after the call (e.g. completion
+        tokens). The bucket may go negative, delaying later callers.
+        """
+        if self.tpm <= 0 or tokens <= 0:
+            return
+
+        def update(state):
+            state = self._refill(state, time.time())
+            state["tokens"] -= tokens
+            return state, None
+
+        self._store.transact(update)
+
+    def on_success(self) -> None:
+        """Recover part of the rate after a successful call."""
+
+        def update(state):
+            state = self._refill(state, time.time())
+            state["scale"] = min(1.0, state["scale"] + self.recovery_step)
+            if state["learned_rpm"] > 0:
+                state["learned_rpm"] += max(1.0, state["learned_ceiling"] * self.recovery_step)
+                if state["learned_rpm"] >= state["learned_ceiling"]:
+                    state["learned_rpm"] = 0.0
+            return state, None
+
+        self._store.transact(update)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after a 429 / throttling response.
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if provided
+        """
+
+        def update(state):
+            now = time.time()
+            state = self._refill(state, now)
+            state["scale"] = max(self.min_scale, state["scale"] / 2)
+            if self.rpm <= 0:
+                if state["learned_rpm"] > 0:
+                    state["learned_rpm"] = max(1.0, state["learned_rpm"] / 2)
+                else:
+                    window = max(1.0, now - state["window_start"])
+                    observed = state["window_requests"] * 60.0 / window
+                    state["learned_ceiling"] = max(2.0, observed)
+                    state["learned_rpm"] = state["learned_ceiling"] / 2
+            pause = retry_after if retry_after is not None else 60.0 / max(self.rpm, 60.0)
+            state["blocked_until"] = max(state["blocked_until"], now + pause)
+            state["requests"] = min(state["requests"], 0.0)
+            return state, None
+
+        self._store.transact(update)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current bucket levels and adaptive scale."""
+
+        def read(state):
+            state = self._refill(state, time.time())
+            return state, dict(state)
+
+        return self._store.transact(read)
+
+
+def retry_after_from_exception(error: Exception) -> Optional[float]:
+    """
+    Extract the Retry-After delay from an HTTP error, if any.
+
+    Args:
+        error: Exception raised by the provider SDK
+
+    Returns:
+        Delay in seconds, or None when the header is absent or unparsable
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception is a 429 / throttling response."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("RateLimitError", "RatelimitException")
+
+
+# Named limiter registry
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rpm: float = 0, tpm: float = 0) -> RateLimiter:
+    """
+    Get or create a named RateLimiter.
+
+    Limits default to the given values but can be overridden per name with
+    <NAME>_RPM / <NAME>_TPM environment variables. When RATE_LIMIT_DB is set,
+    bucket state is shared across processes through that SQLite file.
+
+    Args:
+        name: Limiter name (e.g. "deepseek", "search")
+        rpm: Default requests per minute
+        tpm: Default tokens per minute
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            prefix = name.upper()
+            _limiters[name] = RateLimiter(
+                name=name,
+                rpm=float(os.getenv(f"{prefix}_RPM", rpm)),
+                tpm=float(os.getenv(f"{prefix}_TPM", tpm)),
+                shared_path=os.getenv("RATE_LIMIT_DB") or None,
+            )
+        return _limiters[name]
@@ -0,0 +1,381 @@
+"""
+Retry with jittered exponential backoff, per-call deadlines and a circuit breaker
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Callable, Awaitable, TypeVar
+
+from src.utils.rate_limiter import is_rate_limit_error, retry_after_from_exception
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryEvent:
+    """A retry about to happen (or a failure that will not be retried)."""
+
+    operation: str
+    attempt: int  # 1-based number of the attempt that failed
+    delay: float  # seconds slept before the next attempt (0 when giving up)
+    elapsed: float  # seconds since the call started
+    error: str
+    will_retry: bool
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the endpoint while the circuit breaker is open."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a call's deadline runs out, before or during an attempt."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `recovery_timeout` seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure opens it
+    again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a half-open trial is already running
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = self._opened_at + self.recovery_timeout - time.monotonic()
+            raise CircuitOpenError(
+                f"Circuit open after {self._failures} consecutive failures; "
+                f"retry in {max(0.0, retry_in):.1f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+
+    def record_error(self, error: Exception) -> None:
+        """
+        Record a failed call. Only transient errors count as endpoint
+        failures; a permanent error (e.g. 401) proves the endpoint is up.
+        """
+        if is_retryable_error(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+class RetryPolicy:
+    """
+    Retry settings: attempt count, backoff curve and overall per-call deadline.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        deadline: float = 180.0,
+    ):
+        """
+        Args:
+            max_retries: Retries after the first attempt (0 disables retrying)
+            base_delay: Backoff base in seconds
+            max_delay: Upper bound of a single backoff in seconds
+            deadline: Total seconds a call may take across all attempts (0 = no deadline)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @classmethod
+    def from_env(cls, prefix: str = "DEEPSEEK") -> "RetryPolicy":
+        """Build a policy from <PREFIX>_MAX_RETRIES / _RETRY_BASE_DELAY / _RETRY_MAX_DELAY / _DEADLINE."""
+        return cls(
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", 3)),
+            base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", 1.0)),
+            max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", 20.0)),
+            deadline=float(os.getenv(f"{prefix}_DEADLINE", 180.0)),
+        )
+
+    def attempt_timeout(self, started: float, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Timeout for the next attempt: the per-attempt timeout capped by the
+        time left before the deadline.
+
+        Args:
+            started: time.monotonic() when the call started
+            timeout: Per-attempt timeout in seconds (None = none)
+
+        Returns:
+            Seconds the attempt may take, or None when unbounded
+
+        Raises:
+            DeadlineExceededError: If no time is left
+        """
+        if not self.deadline:
+            return timeout
+        remaining = self.deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline of {self.deadline:.1f}s exceeded")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def deadline_error(self, started: float, error: Exception) -> Exception:
+        """
+        The error to report for a failed attempt: a DeadlineExceededError
+        when the deadline has run out by now, otherwise the error itself.
+        """
+        if isinstance(error, DeadlineExceededError) or not self.deadline:
+            return error
+        if time.monotonic() - started < self.deadline:
+            return error
+        exceeded = DeadlineExceededError(
+            f"Deadline of {self.deadline:.1f}s exceeded ({type(error).__name__}: {error})"
+        )
+        exceeded.__cause__ = error
+        return exceeded
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Full-jitter exponential backoff, never shorter than a Retry-After hint.
+
+        Args:
+            attempt: 1-based number of the attempt that failed
+            error: The error that caused the retry
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        retry_after = retry_after_from_exception(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Whether an error is transient: timeouts, connection problems, 408/409,
+    429 and 5xx responses. Other 4xx responses are permanent.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409) or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return type(error).__name__ in (
+        "APIConnectionError",
+        "APITimeoutError",
+        "InternalServerError",
+        "ReadTimeout",
+        "ConnectTimeout",
+        "RemoteProtocolError",
+    )
+
+
+# Retry event listeners
+_retry_listeners: List[Callable[[RetryEvent], None]] = []
+
+
+def add_retry_listener(listener: Callable[[RetryEvent], None]) -> None:
+    """Register a callback invoked for every retry event."""
+    if listener not in _retry_listeners:
+        _retry_listeners.append(listener)
+
+
+def remove_retry_listener(listener: Callable[[RetryEvent], None]) -> None:
+    """Unregister a retry event callback."""
+    if listener in _retry_listeners:
+        _retry_listeners.remove(listener)
+
+
+def emit_retry_event(event: RetryEvent) -> None:
+    """Deliver an event to all listeners (listener errors are ignored)."""
+    for listener in list(_retry_listeners):
+        try:
+            listener(event)
+        except Exception:
+            pass
+
+
+def next_retry_delay(
+    policy: RetryPolicy,
+    operation: str,
+    attempt: int,
+    started: float,
+    error: Exception,
+) -> Optional[float]:
+    """
+    Decide whether to retry after a failed attempt and report the event.
+
+    Returns:
+        Seconds to sleep before the next attempt, or None to give up
+    """
+    elapsed = time.monotonic() - started
+    delay = policy.backoff(attempt, error)
+    will_retry = (
+        is_retryable_error(error)
+        and attempt <= policy.max_retries
+        and (not policy.deadline or elapsed + delay < policy.deadline)
+    )
+    emit_retry_event(RetryEvent(
+        operation=operation,
+        attempt=attempt,
+        delay=delay if will_retry else 0.0,
+        elapsed=elapsed,
+        error=f"{type(error).__name__}: {error}",
+        will_retry=will_retry,
+    ))
+    return delay if will_retry else None
+
+
+def call_with_retry(
+    fn: Callable[[Optional[float]], T],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    operation: str = "call",
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Call `fn` with retries, backoff, deadline and circuit breaking.
+
+    `fn` receives the timeout of the attempt (see RetryPolicy.attempt_timeout)
+    and must pass it on to the blocking call, so that the deadline also caps
+    an attempt already in flight.
+
+    Args:
+        fn: Attempt, called with its timeout in seconds (None = unbounded)
+        policy: Retry policy
+        breaker: Optional circuit breaker
+        operation: Name reported in retry events
+        timeout: Per-attempt timeout in seconds (None = only the deadline)
+
+    Raises:
+        CircuitOpenError: If the breaker is open
+        DeadlineExceededError: If the deadline runs out
+        Exception: The last error once retries are exhausted or the error is permanent
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker:
+            breaker.before_call()
+        try:
+            result = fn(policy.attempt_timeout(started, timeout))
+        except Exception as e:
+            error = policy.deadline_error(started, e)
+            if breaker:
+                breaker.record_error(error)
+            delay = next_retry_delay(policy, operation, attempt, started, error)
+            if delay is None:
+                if error is e:
+                    raise
+                raise error from e
+            time.sleep(delay)
+            continue
+        if breaker:
+            breaker.record_success()
+        return result
+
+
+async def acall_with_retry(
+    fn: Callable[[Optional[float]], Awaitable[T]],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    operation: str = "call",
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Asyncio counterpart of call_with_retry. Each attempt is additionally
+    bounded with asyncio.wait_for.
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker:
+            breaker.before_call()
+        try:
+            attempt_timeout = policy.attempt_timeout(started, timeout)
+            result = await asyncio.wait_for(fn(attempt_timeout), attempt_timeout)
+        except Exception as e:
+            error = policy.deadline_error(started, e)
+            if breaker:
+                breaker.record_error(error)
+            delay = next_retry_delay(policy, operation, attempt, started, error)
+            if delay is None:
+                if error is e:
+                    raise
+                raise error from e
+            await asyncio.sleep(delay)
+            continue
+        if breaker:
+            breaker.record_success()
+        return result
+
+
+# Shared breakers per endpoint
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get or create a named CircuitBreaker, configured by
+    <NAME>_BREAKER_THRESHOLD and <NAME>_BREAKER_RECOVERY environment variables.
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            prefix = name.upper()
+            _breakers[name] = CircuitBreaker(
+                failure_threshold=int(os.getenv(f"{prefix}_BREAKER_THRESHOLD", 5)),
+                recovery_timeout=float(os.getenv(f"{prefix}_BREAKER_RECOVERY", 30.0)),
+            )
+        return _breakers[name]
@@ -0,0 +1,238 @@
+"""
+Persistent search result cache backed by SQLite
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+from src.utils.cassette import get_active_cassette
+
+
+# Year tokens such as "2026" are dropped: results for "React vs Vue 2025" and
+# "React vs Vue 2026" are interchangeable within the cache lifetime
+_YEAR_PATTERN = re.compile(r"^(19|20)\d{2}$")
+_TOKEN_STRIP = ".,;:!?\"'()[]{}"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so that trivially different phrasings share a
+    cache entry: case and whitespace are ignored, surrounding punctuation and
+    year tokens are dropped, and word order does not matter.
+
+    Returns:
+        Space-separated sorted tokens, e.g. "comparison library react scroll virtual"
+    """
+    tokens = set()
+    for token in query.lower().split():
+        token = token.strip(_TOKEN_STRIP)
+        if token and not _YEAR_PATTERN.match(token):
+            tokens.add(token)
+    return " ".join(sorted(tokens))
+
+
+class SearchCache:
+    """
+    On-disk cache for search results.
+
+    Entries are keyed on the normalized query, region and max_results. An
+    entry is fresh for ttl_seconds; for stale_seconds after that it is still
+    served (the caller is expected to refresh it in the background), after
+    which it counts as a miss. The store is bounded by entry count; least
+    recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/search_cache.sqlite3",
+        ttl_seconds: float = 24 * 3600,
+        stale_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 2000,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Freshness lifetime in seconds (0 disables expiry)
+            stale_seconds: How long past the TTL an entry may still be served
+                while it is refreshed (0 disables stale-while-revalidate)
+            max_entries: Maximum number of entries kept (least recently used evicted first)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, region: str, max_results: int) -> str:
+        """
+        Build a cache key from the normalized query, region and result count.
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps([normalize_query(query), region, max_results], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            (results or None on miss/expiry, whether the entry is stale and
+            should be refreshed)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None, False
+
+            results_json, created_at = row
+            age = now - created_at
+            stale = bool(self.ttl_seconds) and age > self.ttl_seconds
+            if stale and age > self.ttl_seconds + self.stale_seconds:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None, False
+
+            self._conn.execute(
+                "UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+
+        return json.loads(results_json), stale
+
+    def set(self, key: str, query: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Store results and evict least recently used entries beyond max_entries.
+
+        Args:
+            key: Cache key from make_key
+            query: Original query (kept for inspection)
+            results: Formatted search results
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, results, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(results, ensure_ascii=False), now, now),
+            )
+            if self.max_entries > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN ("
+                    "SELECT key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def record_refresh(self) -> None:
+        """Count a background refresh of a stale entry."""
+        with self._lock:
+            self.refreshes += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.refreshes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, stale_hits, misses, refreshes, hit_rate
+            (fresh and stale hits over all lookups) and entries
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            hits, stale_hits, misses = self.hits, self.stale_hits, self.misses
+            refreshes = self.refreshes
+
+        total = hits + stale_hits + misses
+        return {
+            "hits": hits,
+            "stale_hits": stale_hits,
+            "misses": misses,
+            "refreshes": refreshes,
+            "hit_rate": (hits + stale_hits) / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+# Global cache instance (lazy initialization)
+_global_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Get or create the global SearchCache instance.
+
+    Controlled by SEARCH_CACHE_ENABLED, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL,
+    SEARCH_CACHE_STALE and SEARCH_CACHE_MAX_ENTRIES environment variables.
+    Disabled while a cassette is recording or replaying.
+
+    Returns:
+        Shared SearchCache instance, or None when caching is disabled
+    """
+    global _global_search_cache
+    if os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+    if get_active_cassette() is not None:
+        return None
+    if _global_search_cache is None:
+        _global_search_cache = SearchCache(
+            path=os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite3"),
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", 24 * 3600)),
+            stale_seconds=float(os.getenv("SEARCH_CACHE_STALE", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 2000)),
+        )
+    return _global_search_cache
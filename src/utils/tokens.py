@@ -0,0 +1,106 @@
+"""
+Token estimation helpers
+"""
+import os
+import re
+
+_CJK_PATTERN = re.compile("[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text.
+
+    CJK characters count as one token each, everything else as one token
+    per four characters. Good enough for rate limiting and cost estimates.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+_tokenizer = None
+_tokenizer_loaded = False
+
+
+def _get_tokenizer():
+    """
+    Load the optional tiktoken encoding once (TOKENIZER=tiktoken).
+
+    Falls back to estimate_tokens when tiktoken is not installed or its
+    encoding file cannot be loaded (it is downloaded on first use).
+    """
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        _tokenizer_loaded = True
+        if os.getenv("TOKENIZER", "estimate").lower() == "tiktoken":
+            try:
+                import tiktoken
+                _tokenizer = tiktoken.get_encoding(os.getenv("TIKTOKEN_ENCODING", "cl100k_base"))
+            except Exception as e:
+                print(f"tiktoken unavailable, falling back to estimated token counts: {e}")
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with the local tokenizer.
+
+    Uses tiktoken when TOKENIZER=tiktoken (optional dependency), otherwise
+    estimate_tokens. Used for prompt budgeting, where relative sizes matter
+    more than matching the provider's tokenizer exactly.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count
+    """
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = "…") -> str:
+    """
+    Cut a text to at most max_tokens tokens (suffix included), preferring
+    to end at a line break when one falls in the last fifth of the kept text.
+
+    Args:
+        text: Input text
+        max_tokens: Token limit (<= 0 returns an empty string)
+        suffix: Marker appended when the text was cut
+
+    Returns:
+        The text itself when it fits, otherwise its truncated prefix plus suffix
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    limit = max_tokens - count_tokens(suffix)
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= limit:
+            low = middle
+        else:
+            high = middle - 1
+
+    cut = text[:low]
+    newline = cut.rfind("\n")
+    if newline >= low * 4 // 5:
+        cut = cut[:newline]
+    return cut.rstrip() + suffix if cut.strip() else ""
@@ -0,0 +1,262 @@
+"""
+Lightweight tracing for graph nodes, LLM calls and search queries
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Callable, Iterator
+
+from src.utils.resilience import RetryEvent, add_retry_listener
+
+
+@dataclass
+class Span:
+    """One timed operation: a graph node, an LLM call or a search query."""
+
+    name: str
+    kind: str  # "node" | "llm" | "search" | ...
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = 0.0  # wall-clock epoch seconds
+    duration: float = 0.0  # seconds
+    ttft: Optional[float] = None  # seconds to first streamed chunk
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False  # True when usage metadata was unavailable
+    cost: float = 0.0
+    retries: int = 0
+    retry_delay: float = 0.0
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def set_usage(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False,
+    ) -> None:
+        """Record token usage and derive the estimated cost."""
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.tokens_estimated = estimated
+        self.cost = estimate_cost(prompt_tokens, completion_tokens)
+
+    def mark_first_token(self, started: float) -> None:
+        """Record time-to-first-token once, relative to a monotonic start."""
+        if self.ttft is None:
+            self.ttft = time.monotonic() - started
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of a call from LLM_PRICE_INPUT / LLM_PRICE_OUTPUT
+    (price per million tokens, defaults to DeepSeek chat pricing in CNY).
+    """
+    price_in = float(os.getenv("LLM_PRICE_INPUT", 2.0))
+    price_out = float(os.getenv("LLM_PRICE_OUTPUT", 8.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Tracer:
+    """
+    Collects spans in memory and, when a trace file is configured, appends
+    each finished span to it as one JSON line.
+    """
+
+    def __init__(self, trace_path: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.trace_path = Path(trace_path) if trace_path else None
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attrs: Any) -> Iterator[Span]:
+        """
+        Time a block of work as a child of the currently active span.
+
+        Args:
+            name: Span name (e.g. node name, "deepseek.invoke")
+            kind: Span category
+            **attrs: Extra attributes stored with the span
+        """
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=self.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start=time.time(),
+            attrs=dict(attrs),
+        )
+        token = _current_span.set(span)
+        started = time.monotonic()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.monotonic() - started
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Generator closed from another context; nothing to restore
+                pass
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if self.trace_path:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(span), ensure_ascii=False) + "\n")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate finished spans by kind and name (calls are grouped under
+        the graph node they ran in).
+
+        Returns:
+            Rows with count, total/avg duration, avg TTFT, tokens, cost and retries,
+            ordered by first occurrence
+        """
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        by_id = {span.span_id: span for span in spans}
+        
+        def label(span: Span) -> str:
+            # Prefix calls with the node they ran in, e.g. "search › deepseek.invoke"
+            if span.kind == "node":
+                return span.name
+            parent = by_id.get(span.parent_id)
+            while parent is not None and parent.kind != "node":
+                parent = by_id.get(parent.parent_id)
+            return f"{parent.name} › {span.name}" if parent else span.name
+        
+        for span in spans:
+            name = label(span)
+            row = rows.setdefault((span.kind, name), {
+                "kind": span.kind,
+                "name": name,
+                "count": 0,
+                "total_time": 0.0,
+                "ttfts": [],
+                "prompt_chars": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost": 0.0,
+                "retries": 0,
+                "retry_delay": 0.0,
+                "errors": 0,
+            })
+            row["count"] += 1
+            row["total_time"] += span.duration
+            if span.ttft is not None:
+                row["ttfts"].append(span.ttft)
+            row["prompt_chars"] += span.prompt_chars
+            row["prompt_tokens"] += span.prompt_tokens
+            row["completion_tokens"] += span.completion_tokens
+            row["cost"] += span.cost
+            row["retries"] += span.retries
+            row["retry_delay"] += span.retry_delay
+            row["errors"] += 1 if span.error else 0
+
+        result = []
+        for row in rows.values():
+            ttfts = row.pop("ttfts")
+            row["avg_time"] = row["total_time"] / row["count"]
+            row["avg_ttft"] = sum(ttfts) / len(ttfts) if ttfts else None
+            result.append(row)
+        return result
+
+
+def current_span() -> Optional[Span]:
+    """The span active in the current context, if any."""
+    return _current_span.get()
+
+
+def _record_retry(event: RetryEvent) -> None:
+    """Attribute retry events to the span of the call being retried."""
+    span = _current_span.get()
+    if span is not None and event.will_retry:
+        span.retries += 1
+        span.retry_delay += event.delay
+
+
+add_retry_listener(_record_retry)
+
+
+def traced_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a LangGraph node (sync or async) in a "node" span.
+
+    Args:
+        name: Node name in the graph
+        node: Node function
+
+    Returns:
+        Wrapped node with the same signature
+    """
+    if asyncio.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(*args, **kwargs):
+            with get_tracer().span(name, "node"):
+                return await node(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(name, "node"):
+            return node(*args, **kwargs)
+    return wrapper
+
+
+# Global tracer instance
+_global_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(trace_path: Optional[str] = None) -> Tracer:
+    """
+    Start a fresh trace, optionally written to a JSONL file.
+
+    Args:
+        trace_path: JSONL file for finished spans (defaults to TRACE_FILE env var)
+
+    Returns:
+        The new global Tracer
+    """
+    global _global_tracer
+    _global_tracer = Tracer(trace_path or os.getenv("TRACE_FILE") or None)
+    return _global_tracer
+
+
+def get_tracer() -> Tracer:
+    """
+    Get or create the global Tracer.
+
+    Returns:
+        Shared Tracer instance
+    """
+    global _global_tracer
+    if _global_tracer is None:
+        _global_tracer = Tracer(os.getenv("TRACE_FILE") or None)
+    return _global_tracer
@@ -0,0 +1,148 @@
+"""
+测试随时可交付生成：截止时间从搜索开始计时、与草稿生成并行，
+搜索在截止时间内返回时只精修 3.1 章节，超时则直接保存草稿
+"""
+import asyncio
+import time
+
+import pytest
+
+import src.agent.nodes as nodes
+
+DRAFT = """# 技术方案
+
+## 3. 技术方案
+
+### 3.1 技术调研和选型
+
+草稿选型
+
+### 3.2 架构设计
+
+草稿架构
+"""
+
+REFINED = "### 3.1 技术调研和选型\n\n精修选型：React + ECharts\n"
+
+RESULTS = [{"title": "ECharts vs Recharts", "body": "对比", "href": "https://example.com"}]
+
+
+class FakeLLM:
+    max_tokens = 4000
+
+    def __init__(self, response=REFINED):
+        self.response = response
+        self.prompts = []
+
+    def invoke(self, prompt, system_message=None):
+        self.prompts.append(prompt)
+        return self.response
+
+    async def ainvoke(self, prompt, system_message=None):
+        return self.invoke(prompt, system_message)
+
+
+@pytest.fixture
+def anytime(monkeypatch, tmp_path):
+    """替换草稿生成、搜索与 LLM，返回设置耗时的函数与假 LLM"""
+    timing = {"draft": 0.0, "search": 0.0}
+    llm = FakeLLM()
+    path = tmp_path / "doc.md"
+
+    def draft_update():
+        path.write_text(DRAFT, encoding="utf-8")
+        return {"document_path": str(path), "messages": ["草稿"]}
+
+    def search_update():
+        return {"search_results": RESULTS, "messages": ["搜索"]}
+
+    def generate_steps(state):
+        assert state["search_results"] == []
+        yield nodes._Call(time.sleep, asyncio.sleep, (timing["draft"],))
+        return draft_update()
+
+    def search_node(state):
+        time.sleep(timing["search"])
+        return search_update()
+
+    async def search_node_async(state):
+        await asyncio.sleep(timing["search"])
+        return search_update()
+
+    monkeypatch.setattr(nodes, "_generate_steps", generate_steps)
+    monkeypatch.setattr(nodes, "search_node", search_node)
+    monkeypatch.setattr(nodes, "search_node_async", search_node_async)
+    monkeypatch.setattr(nodes, "get_llm_client", lambda: llm)
+    monkeypatch.setenv("ANYTIME_SEARCH_DEADLINE", "0.3")
+
+    def run(draft, search, is_async=False):
+        timing.update(draft=draft, search=search)
+        state = {"form_data": {"project_name": "shop", "core_features": "图表"}}
+        if is_async:
+            return asyncio.run(nodes.anytime_generate_node_async(state))
+        return nodes.anytime_generate_node(state)
+
+    return run, llm, path
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_search_within_deadline_refines_only_the_research_section(anytime, is_async):
+    run, llm, path = anytime
+
+    update = run(draft=0.0, search=0.1, is_async=is_async)
+
+    document = path.read_text(encoding="utf-8")
+    assert "精修选型" in document and "草稿选型" not in document
+    assert "草稿架构" in document
+    assert update["search_results"] == RESULTS
+    assert update["messages"] == ["草稿", "搜索"]
+    assert len(llm.prompts) == 1 and "ECharts vs Recharts" in llm.prompts[0]
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_slow_draft_does_not_use_up_the_search_deadline(anytime, is_async):
+    """草稿耗时超过截止时间，但搜索已在截止时间内返回，仍然精修"""
+    run, _, path = anytime
+
+    update = run(draft=0.4, search=0.1, is_async=is_async)
+
+    assert "精修选型" in path.read_text(encoding="utf-8")
+    assert update["search_results"] == RESULTS
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_slow_search_keeps_the_draft_within_the_deadline(anytime, is_async):
+    run, llm, path = anytime
+
+    started = time.monotonic()
+    update = run(draft=0.0, search=1.0, is_async=is_async)
+
+    assert time.monotonic() - started < 0.8
+    assert path.read_text(encoding="utf-8") == DRAFT
+    assert update["messages"] == ["草稿", "搜索超时，使用草稿"]
+    assert "search_results" not in update
+    assert llm.prompts == []
+
+
+def test_failed_refinement_keeps_the_draft(anytime):
+    run, llm, path = anytime
+    llm.response = "没有章节标题的回答"
+
+    update = run(draft=0.0, search=0.0)
+
+    assert path.read_text(encoding="utf-8") == DRAFT
+    assert update["search_results"] == RESULTS
+
+
+def test_search_clock_counts_from_search_start(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(nodes.time, "monotonic", lambda: now[0])
+    clock = nodes._SearchClock()
+    assert clock.remaining(30) == 30
+
+    monkeypatch.setattr(nodes, "search_node", lambda state: {})
+    clock.run({})
+    now[0] += 10
+    assert clock.remaining(30) == 20
+    now[0] += 25
+    assert clock.remaining(30) == 0
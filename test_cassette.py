@@ -0,0 +1,99 @@
+"""
+测试录制与回放：回放不需要 API Key，节点调用与直接调用都按录制内容返回；
+实时回放的等待不阻塞事件循环
+"""
+import asyncio
+
+import pytest
+
+import src.utils.llm_client as llm_client_module
+from src.agent.nodes import analyze_node, analyze_node_async
+from src.mock.llm_server import MockLLMConfig, start_background_server
+from src.utils.cassette import Cassette, use_cassette
+from src.utils.llm_client import DeepseekClient, get_llm_client
+
+FORM = {"project_name": "shop", "project_type": "Web-C端", "team_size": 3, "core_features": "商品列表、下单"}
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_client_module, "_global_client", None)
+    monkeypatch.setenv("NODE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SPECULATIVE_SEARCH", "false")
+    yield
+    use_cassette(None)
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    """用 Mock LLM 服务录制一次分析节点与直接调用，返回 (cassette 路径, 录制结果)"""
+    server = start_background_server(MockLLMConfig(latency=0, tokens_per_second=0, seed=1))
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "mock")
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    cassette = Cassette(str(tmp_path / "run.jsonl.gz"), mode="record")
+    use_cassette(cassette)
+    try:
+        client = get_llm_client()
+        results = {
+            "analysis": analyze_node({"form_data": FORM}),
+            "invoke": client.invoke("hello", system_message="sys"),
+            "stream": list(client.stream("stream me")),
+        }
+    finally:
+        use_cassette(None)
+        server.shutdown()
+    monkeypatch.setattr(llm_client_module, "_global_client", None)
+    return cassette.save(), results
+
+
+def test_replay_works_without_an_api_key(recorded, monkeypatch):
+    path, results = recorded
+    monkeypatch.delenv("DEEPSEEK_API_KEY", raising=False)
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "http://127.0.0.1:9")  # 回放不得访问网络
+    use_cassette(Cassette(path, mode="replay"))
+
+    client = get_llm_client()
+    assert analyze_node({"form_data": FORM}) == results["analysis"]
+    assert client.invoke("hello", system_message="sys") == results["invoke"]
+    assert list(client.stream("stream me")) == results["stream"]
+
+    async def run():
+        client = get_llm_client()
+        return (
+            await analyze_node_async({"form_data": FORM}),
+            await client.ainvoke("hello", system_message="sys"),
+            [chunk async for chunk in client.astream("stream me")],
+        )
+
+    assert asyncio.run(run()) == (results["analysis"], results["invoke"], results["stream"])
+
+
+def test_missing_key_still_fails_outside_replay(monkeypatch):
+    monkeypatch.delenv("DEEPSEEK_API_KEY", raising=False)
+    with pytest.raises(ValueError, match="DEEPSEEK_API_KEY"):
+        DeepseekClient()
+
+
+def test_realtime_async_replay_does_not_block_the_loop(tmp_path):
+    recording = Cassette(str(tmp_path / "slow.jsonl.gz"), mode="record")
+    recording.record_llm("key", ["a", "b"], [0.0, 0.2])
+    cassette = Cassette(recording.save(), mode="replay", realtime=True)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        chunks = [chunk async for chunk in cassette.areplay_llm("key")]
+        task.cancel()
+        return chunks, ticks
+
+    chunks, ticks = asyncio.run(run())
+    assert chunks == ["a", "b"]
+    assert ticks >= 5
@@ -0,0 +1,109 @@
+"""
+测试 SQLite 检查点：写入 / 读取往返、从待执行节点恢复，以及异步接口不在事件循环线程上访问 SQLite
+"""
+import asyncio
+import operator
+import threading
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import StateGraph, END
+
+from src.utils.checkpoint import SqliteCheckpointer
+
+
+class State(TypedDict):
+    steps: Annotated[List[str], operator.add]
+
+
+def build_app(checkpointer, calls, fail_once):
+    """a -> b -> c，b 在 fail_once 非空时第一次执行抛出异常（模拟中断）"""
+
+    def node(name):
+        def run(state):
+            calls.append(name)
+            if name in fail_once:
+                fail_once.remove(name)
+                raise RuntimeError(f"{name} interrupted")
+            return {"steps": [name]}
+        return run
+
+    graph = StateGraph(State)
+    graph.add_node("a", node("a"))
+    graph.add_node("b", node("b"))
+    graph.add_node("c", node("c"))
+    graph.set_entry_point("a")
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    return SqliteCheckpointer(str(tmp_path / "checkpoints.sqlite3"))
+
+
+def config(run_id="run-1"):
+    return {"configurable": {"thread_id": run_id}, "metadata": {"workflow": "full"}}
+
+
+def test_get_tuple_returns_the_latest_checkpoint(checkpointer):
+    app = build_app(checkpointer, [], set())
+    app.invoke({"steps": []}, config(), durability="sync")
+
+    saved = checkpointer.get_tuple({"configurable": {"thread_id": "run-1"}})
+    assert saved.checkpoint["channel_values"]["steps"] == ["a", "b", "c"]
+    assert saved.metadata["workflow"] == "full"
+    assert checkpointer.get_tuple({"configurable": {"thread_id": "unknown"}}) is None
+
+
+def test_resume_continues_at_the_pending_node(checkpointer, tmp_path):
+    calls = []
+    app = build_app(checkpointer, calls, {"b"})
+    with pytest.raises(RuntimeError):
+        app.invoke({"steps": []}, config(), durability="sync")
+    assert app.get_state(config()).next == ("b",)
+
+    # 新进程：重新打开同一数据库，从 b 继续，a 不再执行
+    reopened = SqliteCheckpointer(str(tmp_path / "checkpoints.sqlite3"))
+    calls.clear()
+    final = build_app(reopened, calls, set()).invoke(None, config(), durability="sync")
+
+    assert calls == ["b", "c"]
+    assert final["steps"] == ["a", "b", "c"]
+
+
+def test_async_resume_continues_at_the_pending_node(checkpointer):
+    calls = []
+    app = build_app(checkpointer, calls, {"b"})
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await app.ainvoke({"steps": []}, config(), durability="sync")
+        calls.clear()
+        return await app.ainvoke(None, config(), durability="sync")
+
+    final = asyncio.run(run())
+    assert calls == ["b", "c"]
+    assert final["steps"] == ["a", "b", "c"]
+
+
+def test_async_methods_run_sqlite_off_the_event_loop(checkpointer, monkeypatch):
+    threads = []
+    get_tuple = checkpointer.get_tuple
+
+    def recording_get_tuple(config):
+        threads.append(threading.current_thread())
+        return get_tuple(config)
+
+    monkeypatch.setattr(checkpointer, "get_tuple", recording_get_tuple)
+    app = build_app(checkpointer, [], set())
+
+    async def run():
+        await app.ainvoke({"steps": []}, config(), durability="sync")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert threads
+    assert loop_thread not in threads
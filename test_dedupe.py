@@ -0,0 +1,83 @@
+"""
+测试搜索结果去重：URL 规范化、SimHash 近重复判定
+"""
+from src.tools.dedupe import MAX_DISTANCE, MIN_FEATURES, canonicalize_url, dedupe_results, simhash
+from src.tools.ranking import tokenize
+
+
+ARTICLE = (
+    "React and Vue compared for large single page applications: rendering performance, "
+    "bundle size, state management, ecosystem maturity, hiring and long term maintenance"
+)
+
+
+def _with_distance(value: int, bits: int) -> int:
+    """翻转最低的若干位，得到与 value 汉明距离为 bits 的指纹"""
+    return value ^ ((1 << bits) - 1)
+
+
+def test_tracking_params_are_removed():
+    assert canonicalize_url(
+        "https://www.example.com/post/?utm_source=x&id=3&fbclid=abc&a=1#top"
+    ) == "https://example.com/post?a=1&id=3"
+    assert canonicalize_url("http://m.example.com/index.html") == "https://example.com"
+
+
+def test_mirrors_map_to_origin():
+    assert canonicalize_url("https://zh-hans.react.dev/learn/") == canonicalize_url("https://react.dev/learn")
+    assert canonicalize_url("https://cn.vuejs.org/guide") == "https://vuejs.org/guide"
+    assert canonicalize_url("https://www.npmjs.org/package/vue") == "https://npmjs.com/package/vue"
+    assert canonicalize_url("https://GitHub.com/Vuejs/Core.git") == "https://github.com/vuejs/core"
+
+
+def test_same_url_is_deduplicated():
+    results = [
+        {"title": "A", "body": "", "href": "https://react.dev/learn?utm_medium=x"},
+        {"title": "B", "body": "", "href": "https://zh-hans.react.dev/learn/"},
+    ]
+    assert [r["title"] for r in dedupe_results(results)] == ["A"]
+
+
+def test_near_duplicate_within_distance_is_dropped(monkeypatch):
+    base = simhash(ARTICLE)
+    fingerprints = {"first": base, "copy": _with_distance(base, MAX_DISTANCE)}
+    monkeypatch.setattr("src.tools.dedupe.simhash", lambda text: fingerprints[text.split()[0]])
+
+    results = [
+        {"title": "first", "body": ARTICLE, "href": "https://a.com/1"},
+        {"title": "copy", "body": ARTICLE, "href": "https://b.com/2"},
+    ]
+    assert [r["title"] for r in dedupe_results(results)] == ["first"]
+
+
+def test_result_beyond_distance_is_kept(monkeypatch):
+    base = simhash(ARTICLE)
+    fingerprints = {"first": base, "other": _with_distance(base, MAX_DISTANCE + 1)}
+    monkeypatch.setattr("src.tools.dedupe.simhash", lambda text: fingerprints[text.split()[0]])
+
+    results = [
+        {"title": "first", "body": ARTICLE, "href": "https://a.com/1"},
+        {"title": "other", "body": ARTICLE, "href": "https://b.com/2"},
+    ]
+    assert [r["title"] for r in dedupe_results(results)] == ["first", "other"]
+
+
+def test_syndicated_copy_is_dropped():
+    results = [
+        {"title": "React vs Vue", "body": ARTICLE, "href": "https://a.com/1"},
+        {"title": "React vs Vue", "body": ARTICLE + ".", "href": "https://b.com/2"},
+    ]
+    assert len(dedupe_results(results)) == 1
+
+
+def test_short_texts_only_deduplicated_by_url():
+    short = "React vs Vue"
+    assert len(tokenize(short)) < MIN_FEATURES
+    assert simhash(short) is None
+
+    results = [
+        {"title": short, "body": "", "href": "https://a.com/1"},
+        {"title": short, "body": "", "href": "https://b.com/2"},
+        {"title": short, "body": "", "href": "https://www.a.com/1/"},
+    ]
+    assert [r["href"] for r in dedupe_results(results)] == ["https://a.com/1", "https://b.com/2"]
@@ -0,0 +1,70 @@
+"""
+测试表单变更对比：忽略空白差异、列表值字段的变更、受影响的分析项与章节
+（上级章节已包含时不再单独列出子章节），以及 FIELD_DEPENDENCIES 与模版一致
+"""
+from src.forms.diff import affected_analysis_items, affected_sections, diff_form_data
+from src.forms.schema import FIELD_DEFINITIONS, FIELD_DEPENDENCIES
+from src.prompts.generator import TECH_SOLUTION_TEMPLATE
+from src.tools.sections import iter_headings, section_key
+
+ANALYSIS_ITEMS = {"extracted_requirements", "tech_constraints"}
+
+BASE = {
+    "project_type": "Web-C端",
+    "frontend_count": 3,
+    "core_features": "商品列表、下单",
+    "key_features": ["SEO", "首屏秒开"],
+    "forbidden_items": "",
+}
+
+
+def test_dependencies_reference_known_fields_items_and_sections():
+    template_keys = {section_key(heading.title) for heading in iter_headings(TECH_SOLUTION_TEMPLATE)}
+
+    assert set(FIELD_DEPENDENCIES) == set(FIELD_DEFINITIONS)
+    for field, dependencies in FIELD_DEPENDENCIES.items():
+        assert set(dependencies["analysis"]) <= ANALYSIS_ITEMS, field
+        assert set(dependencies["sections"]) <= template_keys, field
+
+
+def test_changed_field_is_reported_and_whitespace_is_ignored():
+    new = {**BASE, "core_features": "  商品列表、下单 ", "forbidden_items": "包体积大"}
+
+    changes = diff_form_data(BASE, new)
+
+    assert [change.field for change in changes] == ["forbidden_items"]
+    assert changes[0].label == "禁忌与不接受项"
+    assert changes[0].describe() == "禁忌与不接受项（forbidden_items）：「空」→「包体积大」"
+
+
+def test_list_valued_field_changes_are_detected():
+    assert diff_form_data(BASE, {**BASE, "key_features": ["SEO", "首屏秒开"]}) == []
+
+    changes = diff_form_data(BASE, {**BASE, "key_features": ["SEO", "离线"]})
+
+    assert [(change.field, change.new) for change in changes] == [("key_features", ["SEO", "离线"])]
+
+
+def test_changes_follow_field_definition_order():
+    new = {**BASE, "forbidden_items": "太重", "frontend_count": 8, "project_type": "Web-B端"}
+    assert [change.field for change in diff_form_data(BASE, new)] == [
+        "project_type", "frontend_count", "forbidden_items",
+    ]
+
+
+def test_affected_analysis_items_are_deduplicated_in_order():
+    changes = diff_form_data(BASE, {**BASE, "frontend_count": 8, "core_features": "直播", "forbidden_items": "太重"})
+    assert affected_analysis_items(changes) == ["tech_constraints", "extracted_requirements"]
+    assert affected_analysis_items([]) == []
+
+
+def test_child_sections_are_skipped_when_the_parent_is_included():
+    # core_features 命中「1」，key_features 命中其子章节「1.2」
+    changes = diff_form_data(BASE, {**BASE, "core_features": "直播", "key_features": ["弱网"]})
+
+    sections = affected_sections(changes, TECH_SOLUTION_TEMPLATE)
+
+    keys = [key for key, _, _ in sections]
+    assert keys == ["1", "3.1", "3.2", "3.4", "3.6", "5.1", "6.1"]
+    assert sections[0] == ("1", "1. 业务背景和目标", 2)
+    assert ("3.1", "3.1 技术调研和选型", 3) in sections
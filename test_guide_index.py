@@ -0,0 +1,78 @@
+"""
+测试选型指南检索：固定与必选章节的标题确实存在于 selection_guide.md，
+检索在预算内总是保留概览章节，必选章节优先于相关度排序
+"""
+import pytest
+
+from src.prompts.guide_index import (
+    GUIDE_INDEX,
+    PINNED_SECTIONS,
+    required_guide_sections,
+    select_guide,
+)
+
+# 覆盖 required_guide_sections 各条规则的表单
+RULE_FORMS = [
+    {"frontend_count": 1},
+    {"frontend_count": 5},
+    {"frontend_count": 20},
+    {"core_features": "内容站，需要 SEO"},
+    {"key_features": "首屏秒开"},
+    {"project_stage": "项目新增"},
+    {"project_stage": "局部模块替换"},
+]
+
+
+def section_titles(guide: str):
+    return [line[3:].strip() for line in guide.splitlines() if line.startswith("## ")]
+
+
+def test_pinned_and_required_titles_exist_in_the_guide():
+    titles = set(PINNED_SECTIONS)
+    for form in RULE_FORMS:
+        titles.update(required_guide_sections(form))
+
+    missing = [title for title in titles if GUIDE_INDEX.find(title) is None]
+    assert not missing, f"selection_guide.md 中找不到章节: {missing}"
+    assert len(titles) == len(PINNED_SECTIONS) + 5
+
+
+@pytest.mark.parametrize("form, expected", [
+    ({"frontend_count": 2}, ["小型项目技术组合"]),
+    ({"frontend_count": "8"}, ["中小型业务技术组合"]),
+    ({"frontend_count": 30, "core_features": "SSR"}, ["中大型平台技术组合", "渲染模式对比与选择"]),
+    ({"frontend_count": "很多", "project_stage": "局部模块替换"}, ["小型项目技术组合", "迁移与演进建议"]),
+])
+def test_required_sections_follow_the_form_rules(form, expected):
+    assert required_guide_sections(form) == expected
+
+
+def test_small_budget_keeps_the_overview_and_stays_within_budget():
+    overview = GUIDE_INDEX.sections[GUIDE_INDEX.find(PINNED_SECTIONS[0])]
+
+    guide = select_guide({"core_features": "性能 首屏 稳定性"}, token_budget=overview.tokens)
+
+    assert guide.startswith(GUIDE_INDEX.heading)
+    assert section_titles(guide) == [PINNED_SECTIONS[0]]
+
+
+def test_required_sections_come_before_relevance_hits():
+    form = {"frontend_count": 20, "core_features": "性能 稳定性 监控"}
+    required = [GUIDE_INDEX.find(title) for title in list(PINNED_SECTIONS) + required_guide_sections(form)]
+    budget = sum(GUIDE_INDEX.sections[index].tokens for index in required)
+
+    titles = section_titles(select_guide(form, token_budget=budget))
+
+    assert titles == [GUIDE_INDEX.sections[index].title for index in sorted(required)]
+
+
+def test_selection_keeps_guide_order():
+    titles = section_titles(select_guide({"frontend_count": 2, "project_stage": "项目新增"}, token_budget=1000))
+    order = [GUIDE_INDEX.find(title) for title in titles]
+    assert titles[0] == PINNED_SECTIONS[0]
+    assert order == sorted(order)
+
+
+def test_zero_budget_injects_the_whole_guide():
+    titles = section_titles(select_guide({}, token_budget=0))
+    assert titles == [section.title for section in GUIDE_INDEX.sections]
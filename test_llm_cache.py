@@ -0,0 +1,71 @@
+"""
+测试 LLM 响应缓存：异步调用（ainvoke / astream）的缓存读写不在事件循环线程上执行，
+录制 cassette 时不读缓存
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.cassette import Cassette, use_cassette
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_client import DeepseekClient
+
+
+class RecordingCache(LLMCache):
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def set(self, key, chunks):
+        self.threads.append(threading.current_thread())
+        super().set(key, chunks)
+
+
+@pytest.fixture
+def client(tmp_path):
+    return DeepseekClient(api_key="test", cache=RecordingCache(str(tmp_path / "llm.sqlite3")))
+
+
+def test_cached_responses_are_read_off_the_event_loop(client):
+    client.cache.set(client._cache_key("hi", "sys"), ["hel", "lo"])
+    client.cache.threads.clear()
+
+    async def run():
+        text = await client.ainvoke("hi", system_message="sys")
+        chunks = [chunk async for chunk in client.astream("hi", system_message="sys")]
+        return text, chunks, threading.current_thread()
+
+    text, chunks, loop_thread = asyncio.run(run())
+
+    assert text == "hello"
+    assert chunks == ["hel", "lo"]
+    assert len(client.cache.threads) == 2
+    assert loop_thread not in client.cache.threads
+
+
+def test_sync_calls_use_the_cache_directly(client):
+    client.cache.set(client._cache_key("hi", None), ["hello"])
+    client.cache.threads.clear()
+
+    assert client.invoke("hi") == "hello"
+    assert client.cache.threads == [threading.current_thread()]
+
+
+def test_cache_is_bypassed_while_recording(client, tmp_path, monkeypatch):
+    client.cache.set(client._cache_key("hi", None), ["cached"])
+    monkeypatch.setattr(client, "_invoke_messages", lambda messages, tokens, operation: "live")
+    cassette = Cassette(str(tmp_path / "run.jsonl.gz"), mode="record")
+    use_cassette(cassette)
+    try:
+        assert client.invoke("hi") == "live"
+    finally:
+        use_cassette(None)
+
+    replay = Cassette(cassette.save(), mode="replay")
+    assert "".join(replay.replay_llm(client._request_key("hi", None))) == "live"
+    assert client.invoke("hi") == "cached"
@@ -0,0 +1,119 @@
+"""
+测试节点缓存：键不受字典顺序与空白影响、指纹变化使旧条目失效、按字节数的 LRU 淘汰、
+过期，以及 cassette 录制 / 回放期间绕过缓存
+"""
+import pytest
+
+import src.utils.node_cache as node_cache_module
+from src.utils.cassette import Cassette, use_cassette
+from src.utils.node_cache import NodeCache, fingerprint, get_node_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("src.utils.node_cache.time.time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return NodeCache(str(tmp_path / "node_cache.sqlite3"), ttl_seconds=100, max_bytes=0)
+
+
+FP = fingerprint("template", "deepseek-chat", 0.7, 4000)
+
+
+def test_key_is_stable_under_dict_reordering_and_whitespace():
+    a = {"project_type": "Web-C端", "features": {"core": "下单  支付", "key": ["SEO"]}}
+    b = {"features": {"key": ["SEO"], "core": " 下单 支付 "}, "project_type": "Web-C端"}
+    assert NodeCache.make_key("analyze", FP, a) == NodeCache.make_key("analyze", FP, b)
+
+
+def test_key_depends_on_node_fingerprint_and_values():
+    inputs = {"keywords": ["react", "vue"]}
+    key = NodeCache.make_key("search", FP, inputs)
+    assert key != NodeCache.make_key("analyze", FP, inputs)
+    assert key != NodeCache.make_key("search", fingerprint("template v2"), inputs)
+    assert key != NodeCache.make_key("search", FP, {"keywords": ["vue", "react"]})
+
+
+def test_fingerprint_covers_every_part():
+    assert fingerprint("a", 0.7) == fingerprint("a", 0.7)
+    assert fingerprint("a", 0.7) != fingerprint("a", 0.2)
+
+
+def test_hit_returns_value_and_counts_saved_work(cache):
+    key, value = cache.get("analyze", FP, {"x": 1})
+    assert value is None
+    cache.set("analyze", FP, key, {"needs_search": True}, {"llm_calls": 1})
+
+    assert cache.get("analyze", FP, {"x": 1}) == (key, {"needs_search": True})
+    totals = cache.stats()["totals"]
+    assert (totals["hits"], totals["misses"], totals["saved_llm_calls"]) == (1, 1, 1)
+
+
+def test_new_fingerprint_drops_older_entries_of_the_node(cache):
+    key, _ = cache.get("analyze", FP, {"x": 1})
+    cache.set("analyze", FP, key, "old")
+    other = fingerprint("template v2")
+    key, _ = cache.get("analyze", other, {"x": 2})
+    cache.set("analyze", other, key, "new")
+
+    assert cache.get("analyze", FP, {"x": 1})[1] is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    key, _ = cache.get("analyze", FP, {"x": 1})
+    cache.set("analyze", FP, key, "value")
+
+    clock.now += 100
+    assert cache.get("analyze", FP, {"x": 1})[1] == "value"
+    clock.now += 1
+    assert cache.get("analyze", FP, {"x": 1})[1] is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path, clock):
+    value = "x" * 98  # 序列化后 100 字节
+    cache = NodeCache(str(tmp_path / "node_cache.sqlite3"), max_bytes=250)
+    for name in ("a", "b"):
+        clock.now += 1
+        key, _ = cache.get("search", FP, name)
+        cache.set("search", FP, key, value)
+
+    clock.now += 1
+    assert cache.get("search", FP, "a")[1] == value  # a 比 b 更近被访问
+    clock.now += 1
+    key, _ = cache.get("search", FP, "c")
+    cache.set("search", FP, key, value)
+
+    assert cache.get("search", FP, "b")[1] is None
+    assert cache.get("search", FP, "a")[1] == value
+    assert cache.get("search", FP, "c")[1] == value
+    assert cache.stats()["bytes"] == 200
+
+
+@pytest.mark.parametrize("mode", ["record", "replay"])
+def test_cache_is_bypassed_while_a_cassette_is_active(tmp_path, monkeypatch, mode):
+    monkeypatch.setenv("NODE_CACHE_ENABLED", "true")
+    monkeypatch.setenv("NODE_CACHE_PATH", str(tmp_path / "node_cache.sqlite3"))
+    monkeypatch.setattr(node_cache_module, "_global_node_cache", None)
+    path = Cassette(str(tmp_path / "run.jsonl.gz"), mode="record").save()
+    assert get_node_cache() is not None
+
+    use_cassette(Cassette(path, mode=mode))
+    try:
+        assert get_node_cache() is None
+    finally:
+        use_cassette(None)
+    assert get_node_cache() is not None
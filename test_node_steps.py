@@ -0,0 +1,125 @@
+"""
+测试节点步骤的同步 / 异步执行：两种方式得到相同结果，调用异常送回步骤中处理，
+没有异步版本的调用在工作线程中执行；并行调用按提交顺序取结果，未取的调用被取消
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.agent.nodes import _Call, _FanOut, _arun_steps, _run_steps
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+async def afail(message):
+    raise ValueError(message)
+
+
+def double(value):
+    return value * 2
+
+
+async def adouble(value):
+    return value * 2
+
+
+def steps(log):
+    try:
+        value = yield _Call(double, adouble, (2,))
+        log.append(value)
+        try:
+            yield _Call(fail, afail, ("boom",))
+        except ValueError as e:
+            log.append(str(e))
+        thread = yield _Call(threading.current_thread, None)
+        return {"value": value, "thread": thread.name}
+    finally:
+        log.append("closed")
+
+
+def test_sync_and_async_runs_match():
+    sync_log, async_log = [], []
+
+    sync_update = _run_steps(steps(sync_log))
+    async_update = asyncio.run(_arun_steps(steps(async_log)))
+
+    assert sync_update["value"] == async_update["value"] == 4
+    assert sync_log == async_log == [4, "boom", "closed"]
+
+
+def test_blocking_calls_run_off_the_event_loop():
+    async def run():
+        update = await _arun_steps(steps([]))
+        return update, threading.current_thread().name
+
+    update, loop_thread = asyncio.run(run())
+    assert update["thread"] != loop_thread
+    assert _run_steps(steps([]))["thread"] == threading.current_thread().name
+
+
+def test_unhandled_errors_propagate_and_close_the_steps():
+    log = []
+
+    def failing_steps():
+        try:
+            yield _Call(fail, afail, ("unhandled",))
+        finally:
+            log.append("closed")
+
+    with pytest.raises(ValueError, match="unhandled"):
+        _run_steps(failing_steps())
+    with pytest.raises(ValueError, match="unhandled"):
+        asyncio.run(_arun_steps(failing_steps()))
+    assert log == ["closed", "closed"]
+
+
+def slow_double(delay, value):
+    time.sleep(delay)
+    return fail("odd") if value % 2 else value * 2
+
+
+async def aslow_double(delay, value):
+    await asyncio.sleep(delay)
+    return await afail("odd") if value % 2 else value * 2
+
+
+def fan_out_steps(calls, take, log):
+    fan_out = _FanOut(slow_double, aslow_double, calls, 2, "test")
+    results = []
+    try:
+        yield fan_out.start_call()
+        for index in range(take):
+            try:
+                results.append((yield fan_out.result_call(index)))
+            except ValueError as e:
+                results.append(str(e))
+    finally:
+        fan_out.close()
+        log.append(fan_out)
+    return {"results": results}
+
+
+def test_fan_out_returns_results_in_submission_order():
+    calls = [(0.05, 2), (0.0, 3), (0.0, 4)]
+    expected = {"results": [4, "odd", 8]}
+
+    assert _run_steps(fan_out_steps(calls, 3, [])) == expected
+    assert asyncio.run(_arun_steps(fan_out_steps(calls, 3, []))) == expected
+
+
+def test_fan_out_cancels_calls_not_taken():
+    calls = [(0.0, 2), (0.0, 2), (1.0, 2)]
+    log = []
+    assert _run_steps(fan_out_steps(calls, 1, log)) == {"results": [4]}
+    assert log[0]._pending[-1].cancelled()
+
+    async def run():
+        update = await _arun_steps(fan_out_steps(calls, 1, log))
+        await asyncio.sleep(0)  # 让被取消的任务处理取消
+        return update, log[1]._pending[-1].cancelled()
+
+    assert asyncio.run(run()) == ({"results": [4]}, True)
@@ -0,0 +1,65 @@
+"""
+测试提示词预算分配与按 token 截断
+"""
+from src.prompts.budget import PART_MINIMUM, allocate_prompt_budget, prompt_token_target
+from src.utils.tokens import count_tokens, truncate_to_tokens
+
+
+DESIRED = {"guide": 1000, "evidence": 250, "template": 2800, "form": 400}
+
+
+def test_everything_fits():
+    budget = allocate_prompt_budget("test", fixed=500, desired=DESIRED, target=10000)
+    assert budget.parts == DESIRED
+    assert budget.total == 500 + sum(DESIRED.values())
+
+
+def test_minimums_are_granted_in_priority_order():
+    minimums = PART_MINIMUM["form"] + PART_MINIMUM["template"]
+    budget = allocate_prompt_budget("test", fixed=500, desired=DESIRED, target=500 + minimums + 100)
+    assert budget.get("form") == PART_MINIMUM["form"]
+    assert budget.get("template") == PART_MINIMUM["template"]
+    assert budget.get("evidence") == 100
+    assert budget.get("guide") == 0
+
+
+def test_lower_priority_parts_are_squeezed_first():
+    all_minimums = sum(PART_MINIMUM[name] for name in DESIRED)
+    budget = allocate_prompt_budget("test", fixed=500, desired=DESIRED, target=500 + all_minimums + 1000)
+    assert budget.get("form") == DESIRED["form"]
+    assert budget.get("template") > PART_MINIMUM["template"]
+    assert budget.get("evidence") == PART_MINIMUM["evidence"]
+    assert budget.get("guide") == PART_MINIMUM["guide"]
+    assert budget.total == budget.target
+
+
+def test_target_below_fixed_leaves_nothing():
+    budget = allocate_prompt_budget("test", fixed=3000, desired=DESIRED, target=2000)
+    assert all(tokens == 0 for tokens in budget.parts.values())
+
+
+def test_small_parts_keep_their_size():
+    budget = allocate_prompt_budget("test", fixed=0, desired={"guide": 40, "form": 10}, target=100)
+    assert budget.parts == {"form": 10, "guide": 40}
+
+
+def test_target_is_window_minus_max_tokens(monkeypatch):
+    monkeypatch.setenv("LLM_CONTEXT_WINDOW", "10000")
+    monkeypatch.delenv("PROMPT_TOKEN_BUDGET", raising=False)
+    assert prompt_token_target(4000) == 6000
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "3000")
+    assert prompt_token_target(4000) == 3000
+
+
+def test_truncation_stays_within_limit_including_suffix():
+    text = "前端技术栈选型 React Vue Svelte\n" * 200
+    for limit in (1, 5, 37, 200, 999):
+        cut = truncate_to_tokens(text, limit)
+        assert count_tokens(cut) <= limit
+        if cut:
+            assert cut.endswith("…")
+
+
+def test_truncation_keeps_short_text_and_handles_zero():
+    assert truncate_to_tokens("short", 100) == "short"
+    assert truncate_to_tokens("short", 0) == ""
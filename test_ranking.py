@@ -0,0 +1,56 @@
+"""
+测试搜索结果排序：中英文分词、来源权威度、BM25 排序与 token 预算选取
+"""
+from src.tools.ranking import BM25, authority_score, rank_results, select_within_budget, tokenize
+
+
+def test_cjk_runs_become_bigrams():
+    assert tokenize("虚拟列表") == ["虚拟", "拟列", "列表"]
+    assert tokenize("用 React 做首屏") == ["用", "react", "做首", "首屏"]
+
+
+def test_latin_words_are_lowercased_without_stopwords():
+    assert tokenize("The Vue.js and Next.js SSR") == ["vue.js", "next.js", "ssr"]
+
+
+def test_authority_matches_parent_domains_only():
+    assert authority_score("https://docs.github.com/en") == authority_score("https://github.com")
+    assert authority_score("https://notgithub.com/repo") == 0.0
+    assert authority_score("react.dev/learn") == 1.0
+    assert authority_score("") == 0.0
+
+
+def test_bm25_prefers_matching_documents():
+    scores = BM25([tokenize("虚拟列表 性能"), tokenize("表单 校验")]).scores(tokenize("虚拟列表"))
+    assert scores[0] > scores[1] == 0.0
+
+
+def test_rank_keeps_original_order_on_ties():
+    results = [
+        {"title": f"same {i}", "body": "unrelated text", "href": f"https://example{i}.com"}
+        for i in range(5)
+    ]
+    ranked = rank_results(results, ["虚拟列表"])
+    assert [r["title"] for _, r in ranked] == [r["title"] for r in results]
+
+
+def test_rank_blends_relevance_and_authority():
+    results = [
+        {"title": "博客", "body": "随便聊聊", "href": "https://csdn.net/a"},
+        {"title": "虚拟列表", "body": "虚拟列表 性能优化", "href": "https://csdn.net/b"},
+        {"title": "Guide", "body": "虚拟列表", "href": "https://react.dev/learn"},
+    ]
+    ranked = [r["href"] for _, r in rank_results(results, ["虚拟列表 性能"])]
+    assert ranked[-1] == "https://csdn.net/a"
+
+
+def test_budget_skips_and_continues():
+    results = [{"cost": 5}, {"cost": 50}, {"cost": 3}, {"cost": 4}]
+    selected = select_within_budget(results, lambda r: r["cost"], token_budget=10)
+    assert [r["cost"] for r in selected] == [5, 3]
+
+
+def test_budget_zero_is_unlimited_and_max_items_applies():
+    results = [{"cost": 100}] * 4
+    assert len(select_within_budget(results, lambda r: r["cost"], 0)) == 4
+    assert len(select_within_budget(results, lambda r: r["cost"], 0, max_items=2)) == 2
@@ -0,0 +1,63 @@
+"""
+测试限流器：未配置 RPM 时不限速，429 后按观测速率自适应降速并逐步恢复；
+共享状态在异步调用中不占用事件循环线程
+"""
+import asyncio
+import threading
+
+from src.utils.rate_limiter import RateLimiter
+
+
+def test_unlimited_until_rate_limited():
+    limiter = RateLimiter("test")
+    for _ in range(200):
+        assert limiter._try_acquire(0) == 0.0
+
+
+def test_learns_half_the_observed_rate_after_429():
+    limiter = RateLimiter("test")
+    for _ in range(30):
+        limiter.acquire()
+    limiter.on_rate_limited(retry_after=0)
+
+    state = limiter.stats()
+    assert 0 < state["learned_rpm"] <= state["learned_ceiling"] / 2
+    assert state["learned_ceiling"] >= 30
+
+
+def test_learned_rate_recovers_and_is_dropped():
+    limiter = RateLimiter("test", recovery_step=0.5)
+    for _ in range(10):
+        limiter.acquire()
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.stats()["learned_rpm"] > 0
+
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.stats()["learned_rpm"] == 0.0
+
+
+def test_configured_rpm_still_throttles():
+    limiter = RateLimiter("test", rpm=6, burst_seconds=10)
+    assert limiter._try_acquire(0) == 0.0
+    assert limiter._try_acquire(0) > 0
+
+
+def test_shared_state_is_updated_off_the_event_loop(tmp_path):
+    limiter = RateLimiter("test", shared_path=str(tmp_path / "rate.sqlite3"))
+    threads = []
+    transact = limiter._store.transact
+
+    def recording(fn):
+        threads.append(threading.current_thread())
+        return transact(fn)
+
+    limiter._store.transact = recording
+
+    async def run():
+        await limiter.aacquire()
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert limiter.shared
+    assert threads and loop_thread not in threads
@@ -0,0 +1,48 @@
+"""
+测试重试策略的单次调用时限：进行中的尝试同样受剩余时限约束
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.utils.resilience import DeadlineExceededError, RetryPolicy, acall_with_retry, call_with_retry
+
+
+def test_attempt_timeout_is_capped_by_deadline():
+    policy = RetryPolicy(deadline=2.0)
+    started = time.monotonic()
+    assert policy.attempt_timeout(started, 120) <= 2.0
+    assert policy.attempt_timeout(started, 0.5) == 0.5
+    assert RetryPolicy(deadline=0).attempt_timeout(started, 120) == 120
+
+    with pytest.raises(DeadlineExceededError):
+        policy.attempt_timeout(started - 3.0, 120)
+
+
+def test_sync_call_raises_deadline_error():
+    policy = RetryPolicy(max_retries=3, base_delay=0.01, deadline=0.2)
+    timeouts = []
+
+    def attempt(timeout):
+        timeouts.append(timeout)
+        time.sleep(timeout)
+        raise TimeoutError("request timed out")
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        call_with_retry(attempt, policy, timeout=120)
+    assert time.monotonic() - started < 0.5
+    assert timeouts[0] <= 0.2
+
+
+def test_async_attempt_is_cancelled_at_deadline():
+    policy = RetryPolicy(max_retries=3, base_delay=0.01, deadline=0.2)
+
+    async def attempt(timeout):
+        await asyncio.sleep(5)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(acall_with_retry(attempt, policy, timeout=120))
+    assert time.monotonic() - started < 0.5
@@ -0,0 +1,95 @@
+"""
+测试修订节点（edit 流程）：同步与异步只重新分析受影响的分析项、只修订受影响的章节，
+重新分析失败时沿用上一版本的分析结果
+"""
+import asyncio
+import json
+import re
+
+import pytest
+
+import src.agent.nodes as nodes
+import src.utils.file_manager as file_manager_module
+from src.prompts.generator import SECTION_REVISION_SYSTEM_PROMPT, TECH_SOLUTION_TEMPLATE
+from src.utils.file_manager import FileManager
+
+BASE_FORM = {"project_type": "Web-C端", "frontend_count": 3, "core_features": "商品列表", "dev_preference": "React"}
+
+
+class FakeLLM:
+    """章节修订调用返回带标题的修订内容，其余（重新分析）调用返回分析 JSON"""
+
+    model = "fake"
+    temperature = 0.7
+    max_tokens = 4000
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        self.calls = []
+
+    def invoke(self, prompt, system_message=None):
+        if system_message and system_message.startswith(SECTION_REVISION_SYSTEM_PROMPT[:30]):
+            title = re.search(r"中的「(.+?)」章节", prompt).group(1)
+            self.calls.append(title)
+            return f"### {title}\n\n修订后：{title}\n"
+        self.calls.append("analyze")
+        if isinstance(self.analysis, Exception):
+            raise self.analysis
+        return json.dumps(self.analysis, ensure_ascii=False)
+
+    async def ainvoke(self, prompt, system_message=None):
+        return self.invoke(prompt, system_message)
+
+
+@pytest.fixture
+def revise(monkeypatch, tmp_path):
+    monkeypatch.setenv("NODE_CACHE_ENABLED", "false")
+    monkeypatch.setattr(file_manager_module, "_global_file_manager", FileManager(str(tmp_path / "outputs")))
+    base_document = tmp_path / "base.md"
+    base_document.write_text(TECH_SOLUTION_TEMPLATE, encoding="utf-8")
+
+    def run(llm, form_data, is_async=False):
+        monkeypatch.setattr(nodes, "get_llm_client", lambda: llm)
+        state = {
+            "form_data": form_data,
+            "base_form_data": BASE_FORM,
+            "base_document": str(base_document),
+            "project_type": "Web-C端",
+            "extracted_requirements": ["旧需求"],
+            "tech_constraints": ["旧约束"],
+        }
+        if is_async:
+            return asyncio.run(nodes.revise_node_async(state))
+        return nodes.revise_node(state)
+
+    return run
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_only_affected_items_and_sections_are_revised(revise, is_async):
+    llm = FakeLLM({"extracted_requirements": ["新需求"], "tech_constraints": ["新约束"]})
+
+    update = revise(llm, {**BASE_FORM, "dev_preference": "Vue"}, is_async)
+
+    assert update["tech_constraints"] == ["新约束"]
+    assert "extracted_requirements" not in update
+    assert update["revised_sections"] == ["3.1", "3.2"]
+    assert llm.calls[0] == "analyze" and sorted(llm.calls[1:]) == ["3.1 技术调研和选型", "3.2 架构设计"]
+
+    with open(update["document_path"], encoding="utf-8") as f:
+        document = f.read()
+    assert "修订后：3.1 技术调研和选型" in document
+    assert "修订后：3.2 架构设计" in document
+    assert "### 3.3 接口字段/数据协议等变更" in document
+    assert "修改表单: 开发偏好；修订章节: 3.1、3.2" in document
+    assert update["messages"] == ["修改表单: 开发偏好；修订章节: 3.1、3.2"]
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_failed_reanalysis_keeps_the_previous_analysis(revise, is_async):
+    llm = FakeLLM(RuntimeError("analysis down"))
+
+    update = revise(llm, {**BASE_FORM, "dev_preference": "Vue"}, is_async)
+
+    assert "tech_constraints" not in update
+    assert update["revised_sections"] == ["3.1", "3.2"]
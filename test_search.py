@@ -0,0 +1,81 @@
+"""
+测试搜索工具的线程池与会话复用：多次并发搜索共用同一组工作线程（及其 DDGS 会话），
+短生命周期线程结束时释放会话
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import src.tools.search as search_module
+from src.tools.search import DuckDuckGoBackend, TechSearchTool
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.threads = []
+
+    def __call__(self, query, max_results, region, timeout):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.01)
+        return [{"title": query, "body": "", "href": f"https://example.com/{query}"}]
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setenv("SEARCH_CACHE_ENABLED", "false")
+
+
+def make_tool(backend):
+    return TechSearchTool(delay=0, concurrency=4, backend=backend)
+
+
+def test_search_multiple_reuses_the_shared_pool():
+    backend = RecordingBackend()
+    tool = make_tool(backend)
+    queries = ["a", "b", "c", "d"]
+
+    first = tool.search_multiple(queries)
+    time.sleep(0.05)  # 让工作线程回到空闲状态
+    first_threads = set(backend.threads)
+    backend.threads.clear()
+    second = tool.search_multiple(queries)
+
+    assert [r["title"] for r in first] == queries
+    assert [r["title"] for r in second] == queries
+    assert all(name.startswith("search") for name in first_threads)
+    assert set(backend.threads) <= first_threads
+
+
+def test_asearch_multiple_runs_on_the_shared_pool():
+    backend = RecordingBackend()
+    tool = make_tool(backend)
+
+    results = asyncio.run(tool.asearch_multiple(["a", "b", "c"]))
+
+    assert [r["title"] for r in results] == ["a", "b", "c"]
+    assert all(name.startswith("search") for name in backend.threads)
+
+
+def test_release_session_closes_the_thread_session(monkeypatch):
+    closed = []
+
+    class FakeDDGS:
+        def __init__(self, timeout=None):
+            pass
+
+        def __exit__(self, *args):
+            closed.append(self)
+
+    monkeypatch.setattr(search_module, "DDGS", FakeDDGS)
+    backend = DuckDuckGoBackend()
+    session = backend._get_session(10)
+    assert backend._get_session(10) is session
+
+    backend.release_session()
+    assert closed == [session]
+    assert backend._get_session(10) is not session
+    backend.release_session()
+    backend.release_session()
+    assert len(closed) == 2
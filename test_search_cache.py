@@ -0,0 +1,85 @@
+"""
+测试搜索结果缓存：查询词规范化与新鲜 / 过期可用 / 失效的时间边界
+"""
+import pytest
+
+from src.utils.search_cache import SearchCache, normalize_query
+
+
+RESULTS = [{"title": "React", "body": "", "href": "https://react.dev"}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("src.utils.search_cache.time.time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return SearchCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, stale_seconds=50)
+
+
+def test_word_order_case_and_punctuation_are_ignored():
+    assert normalize_query("React vs Vue") == normalize_query("vue VS react,")
+    assert normalize_query("  React   (vs)  Vue ") == "react vs vue"
+
+
+def test_year_tokens_are_dropped():
+    assert normalize_query("React vs Vue 2025") == normalize_query("2026 React vs Vue")
+    assert normalize_query("Vue 3 migration") != normalize_query("Vue migration")
+
+
+def test_key_folds_equivalent_queries():
+    assert SearchCache.make_key("React vs Vue 2026", "wt-wt", 5) == SearchCache.make_key("vue react vs", "wt-wt", 5)
+    assert SearchCache.make_key("React vs Vue", "wt-wt", 5) != SearchCache.make_key("React vs Vue", "cn-zh", 5)
+
+
+def test_fresh_stale_and_expired_boundaries(cache, clock):
+    key = SearchCache.make_key("react", "wt-wt", 5)
+    cache.set(key, "react", RESULTS)
+
+    clock.now += 100
+    assert cache.get(key) == (RESULTS, False)
+
+    clock.now += 1
+    assert cache.get(key) == (RESULTS, True)
+
+    clock.now += 49
+    assert cache.get(key) == (RESULTS, True)
+
+    clock.now += 1
+    assert cache.get(key) == (None, False)
+    assert cache.stats()["entries"] == 0
+
+
+def test_counters(cache, clock):
+    key = SearchCache.make_key("react", "wt-wt", 5)
+    assert cache.get(key) == (None, False)
+    cache.set(key, "react", RESULTS)
+    cache.get(key)
+    clock.now += 120
+    cache.get(key)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    keys = [SearchCache.make_key(q, "wt-wt", 5) for q in ("a", "b", "c")]
+    for key in keys:
+        clock.now += 1
+        cache.set(key, "q", RESULTS)
+    assert cache.get(keys[0]) == (None, False)
+    assert cache.get(keys[2])[0] == RESULTS
@@ -0,0 +1,129 @@
+"""
+测试预搜索：由表单与 package.json 推断查询、与分析结果对账时的配额分配，
+以及分析判定无需搜索时取消预搜索
+"""
+import json
+from concurrent.futures import Future
+
+from src.agent.nodes import _settle_speculation
+from src.agent.speculation import (
+    SpeculativeQuery,
+    SpeculativeSearch,
+    derive_speculative_queries,
+    start_speculation,
+    take_speculation,
+)
+
+
+class FakeTool:
+    """submit 返回由测试控制的 Future（pending=True 时保持未完成）"""
+
+    def __init__(self, pending=False):
+        self.pending = pending
+        self.futures = {}
+
+    def submit(self, query, max_results=None):
+        future = Future()
+        if not self.pending:
+            future.set_result([{"title": query, "body": "", "href": ""}])
+        self.futures[query] = future
+        return future
+
+
+def queries_of(form_data, limit=4):
+    return [q.query for q in derive_speculative_queries(form_data, limit=limit)]
+
+
+def test_queries_follow_feature_order_with_the_package_json_framework():
+    form = {
+        "core_features": "商品图表看板、瀑布流首页",
+        "package_json": json.dumps({"dependencies": {"react": "^18", "next": "^14"}}),
+        "existing_stack": "Vue 3",
+    }
+    assert queries_of(form) == [
+        "Next.js chart library comparison",
+        "Next.js masonry library comparison",
+    ]
+
+
+def test_framework_from_existing_stack_matches_whole_words_only():
+    assert queries_of({"key_features": "拖拽排序", "existing_stack": "React 18"}) == [
+        "React drag and drop library comparison"
+    ]
+    assert queries_of({"key_features": "拖拽排序", "existing_stack": "preact"}) == [
+        "drag and drop library comparison"
+    ]
+
+
+def test_one_query_per_topic_within_the_limit():
+    form = {"core_features": "虚拟列表、长列表、图表、地图、上传", "dev_preference": "vue"}
+    assert queries_of(form, limit=3) == [
+        "Vue virtual scroll library comparison",
+        "Vue chart library comparison",
+        "Vue map library comparison",
+    ]
+
+
+def test_fallback_query_has_no_year():
+    assert queries_of({"core_features": "登录", "existing_stack": "Svelte"}) == ["Svelte best practices"]
+    assert queries_of({"core_features": "登录"}) == []
+
+
+def make_speculation(tool=None):
+    queries = [
+        SpeculativeQuery("React chart library comparison", ["chart", "图表"]),
+        SpeculativeQuery("React map library comparison", ["map", "地图"]),
+        SpeculativeQuery("React i18n library comparison", ["i18n", "国际化"]),
+    ]
+    return SpeculativeSearch(tool or FakeTool(), queries)
+
+
+def test_reconcile_reuses_relevant_queries_within_the_budget():
+    speculation = make_speculation()
+    keywords = ["react chart library comparison", "echarts vs recharts", "leaflet vs openlayers"]
+
+    reused, remaining = speculation.reconcile(keywords, ["需要国际化"], budget=3)
+
+    # 图表与国际化仍然相关（map 未出现），复用的查询占用配额
+    assert reused == ["React chart library comparison", "React i18n library comparison"]
+    assert remaining == ["echarts vs recharts"]
+
+
+def test_reconcile_never_exceeds_the_budget():
+    speculation = make_speculation()
+    reused, remaining = speculation.reconcile(["chart", "map", "i18n"], [], budget=2)
+    assert len(reused) == 2
+    assert remaining == []
+
+
+def test_collect_returns_reused_results_and_cancels_the_rest():
+    tool = FakeTool(pending=True)
+    speculation = make_speculation(tool)
+    tool.futures["React chart library comparison"].set_result([{"title": "chart"}])
+
+    results = speculation.collect(["React chart library comparison"], timeout=1)
+
+    assert results == [{"title": "chart"}]
+    assert tool.futures["React map library comparison"].cancelled()
+
+
+def test_speculation_is_cancelled_when_no_search_is_needed():
+    tool = FakeTool(pending=True)
+    speculation_id, _ = start_speculation({"core_features": "图表"}, tool)
+
+    _settle_speculation({"speculation_id": speculation_id}, {"needs_search": False})
+
+    assert all(future.cancelled() for future in tool.futures.values())
+    assert take_speculation(speculation_id) is None
+
+
+def test_speculation_is_kept_when_search_is_needed():
+    tool = FakeTool(pending=True)
+    speculation_id, _ = start_speculation({"core_features": "图表"}, tool)
+
+    _settle_speculation({"speculation_id": speculation_id}, {"needs_search": True})
+
+    speculation = take_speculation(speculation_id)
+    assert speculation is not None
+    assert not any(future.cancelled() for future in tool.futures.values())
+    speculation.cancel()
@@ -0,0 +1,121 @@
+"""
+测试文档结构校验：缺失章节、方案计数与修复章节的拼接位置
+"""
+from src.tools.validator import count_options, splice_section, validate_document
+
+
+TEMPLATE = """# 前端技术方案
+
+## 1. 项目背景
+
+## 2. 需求分析
+
+## 3. 技术方案
+
+### 3.1 技术调研和选型
+
+### 3.2 架构设计
+
+## 4. 排期（可选）
+
+## 5. 风险评估
+"""
+
+RESEARCH = """### 3.1 技术调研和选型
+
+| 方案 | 容器 | 开发模式 |
+| --- | --- | --- |
+| Next.js | Web | SSR |
+| Vite + React | Web | CSR |
+
+明确建议：采用 Next.js。
+"""
+
+
+def _document(*sections: str) -> str:
+    return "# 前端技术方案\n\n" + "\n".join(sections)
+
+
+def test_valid_document_has_no_issues():
+    markdown = _document("## 1. 项目背景\n", "## 2. 需求分析\n", "## 3. 技术方案\n", RESEARCH, "## 5. 风险评估\n")
+    assert validate_document(markdown, TEMPLATE) == []
+
+
+def test_missing_chapter_suppresses_its_subsections():
+    markdown = _document("## 1. 项目背景\n", "## 2. 需求分析\n", "## 5. 风险评估\n")
+    issues = validate_document(markdown, TEMPLATE)
+    assert [(issue.section, issue.missing) for issue in issues] == [("3", True)]
+
+
+def test_optional_chapter_is_not_required():
+    markdown = _document("## 1. 项目背景\n", "## 2. 需求分析\n", "## 3. 技术方案\n", RESEARCH, "## 5. 风险评估\n")
+    assert "## 4." not in markdown
+    assert not any(issue.section == "4" for issue in validate_document(markdown, TEMPLATE))
+
+
+def test_research_section_problems():
+    research = "### 3.1 技术调研和选型\n\n只考虑了 Next.js。\n"
+    markdown = _document("## 1. 项目背景\n", "## 2. 需求分析\n", "## 3. 技术方案\n", research, "## 5. 风险评估\n")
+    issues = validate_document(markdown, TEMPLATE)
+    assert len(issues) == 1 and issues[0].section == "3.1"
+    assert len(issues[0].problems) == 2
+
+
+def test_options_counted_from_table_rows():
+    assert count_options(RESEARCH) == 2
+
+
+def test_options_counted_from_headings():
+    section = """### 3.1 技术调研和选型
+
+#### 方案一：Next.js
+
+#### 方案二：Nuxt
+
+#### 方案三：Astro
+
+#### 对比结论
+"""
+    assert count_options(section) == 3
+
+
+def test_table_without_separator_is_not_counted():
+    assert count_options("### 3.1\n\n| a | b |\n| c | d |\n") == 0
+
+
+def test_present_section_is_replaced():
+    markdown = _document("## 1. 项目背景\n\n旧内容\n", "## 2. 需求分析\n")
+    result = splice_section(markdown, "1", "## 1. 项目背景\n\n新内容\n", TEMPLATE)
+    assert "新内容" in result and "旧内容" not in result
+    assert result.index("## 1.") < result.index("## 2.")
+
+
+def test_absent_section_is_inserted_in_template_order():
+    markdown = _document("## 1. 项目背景\n", "## 3. 技术方案\n", "## 5. 风险评估\n")
+    result = splice_section(markdown, "2", "## 2. 需求分析\n\n补充\n", TEMPLATE)
+    assert result.index("## 1.") < result.index("## 2.") < result.index("## 3.")
+
+
+def test_absent_last_section_is_appended():
+    markdown = _document("## 1. 项目背景\n")
+    result = splice_section(markdown, "5", "## 5. 风险评估\n", TEMPLATE)
+    assert result.rstrip().endswith("## 5. 风险评估")
+
+
+def fail_llm():
+    raise AssertionError("降级文档不应触发修复调用")
+
+
+def test_fallback_document_is_not_repaired(tmp_path, monkeypatch):
+    from src.agent import nodes
+
+    state = {"form_data": {"project_name": "shop", "project_type": "Web-C端"}}
+    path = tmp_path / "doc.md.part"
+    path.write_text(nodes._generate_fallback_document(state), encoding="utf-8")
+    monkeypatch.setattr(nodes, "get_llm_client", fail_llm)
+
+    update = nodes.validate_node({**state, "document_path": str(path), "generation_fallback": True})
+
+    assert update["repaired_sections"] == []
+    assert any("未修复" in message for message in update["messages"])
+    assert nodes._planned_repairs({"generation_fallback": False}, ["issue"]) == ["issue"]